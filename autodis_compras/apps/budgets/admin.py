@@ -5,7 +5,7 @@ Configuración del panel de administración para presupuestos.
 from django.contrib import admin
 from django.db.models import Sum
 from django.utils.html import format_html
-from .models import Category, Item, Budget, BudgetHistory
+from .models import Category, Item, Budget, BudgetHistory, BudgetTransfer
 
 
 @admin.register(Category)
@@ -64,10 +64,25 @@ class BudgetAdmin(admin.ModelAdmin):
 
 @admin.register(BudgetHistory)
 class BudgetHistoryAdmin(admin.ModelAdmin):
-    list_display = ['budget', 'previous_amount', 'new_amount', 'changed_by', 'created_at']
+    list_display = ['budget', 'previous_amount', 'new_amount', 'changed_by', 'transfer', 'created_at']
     list_filter = ['budget__year', 'budget__month', 'changed_by']
     search_fields = ['budget__cost_center__code', 'budget__category__name']
-    readonly_fields = ['budget', 'previous_amount', 'new_amount', 'changed_by', 'created_at']
+    readonly_fields = ['budget', 'previous_amount', 'new_amount', 'changed_by', 'transfer', 'created_at']
+    date_hierarchy = 'created_at'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(BudgetTransfer)
+class BudgetTransferAdmin(admin.ModelAdmin):
+    list_display = ['source', 'target', 'amount', 'created_by', 'created_at']
+    list_filter = ['source__year', 'source__month', 'created_by']
+    search_fields = ['source__cost_center__code', 'target__cost_center__code', 'batch']
+    readonly_fields = ['batch', 'source', 'target', 'amount', 'reason', 'created_by', 'created_at']
     date_hierarchy = 'created_at'
 
     def has_add_permission(self, request):
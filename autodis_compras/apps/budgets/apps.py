@@ -5,3 +5,6 @@ class BudgetsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'autodis_compras.apps.budgets'
     verbose_name = 'Presupuestos'
+
+    def ready(self):
+        import autodis_compras.apps.budgets.signals  # noqa: F401
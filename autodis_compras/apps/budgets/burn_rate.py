@@ -0,0 +1,103 @@
+"""
+Ritmo de gasto (burn rate) y proyección de cierre de mes por presupuesto.
+Para cada presupuesto del mes se calcula el gasto aprobado a la fecha, el
+gasto diario promedio de los días transcurridos y las solicitudes aún en
+aprobación (pipeline). El cierre proyectado es el gasto a la fecha más el
+ritmo diario por los días restantes más el pipeline. Todo se obtiene con una
+consulta de presupuestos y una de solicitudes agrupadas por celda.
+"""
+
+import calendar
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from autodis_compras.periods import month_range, range_filter
+from .models import Budget
+
+ZERO = Decimal('0.00')
+
+OK = 'OK'
+EN_RIESGO = 'EN_RIESGO'
+EXCEDIDO = 'EXCEDIDO'
+
+
+def _elapsed_days(year, month, today):
+    """Días transcurridos del mes (incluyendo hoy) y días totales del mes."""
+    days_in_month = calendar.monthrange(year, month)[1]
+    if (today.year, today.month) > (year, month):
+        return days_in_month, days_in_month
+    if (today.year, today.month) < (year, month):
+        return 0, days_in_month
+    return today.day, days_in_month
+
+
+def _status(projected, amount):
+    if amount <= 0:
+        return EXCEDIDO if projected > 0 else OK
+    if projected > amount:
+        return EXCEDIDO
+    if projected >= amount * Decimal(str(settings.BUDGET_BURN_RISK_RATIO)):
+        return EN_RIESGO
+    return OK
+
+
+def compute_burn_rate(year=None, month=None, today=None, **filters):
+    """
+    Proyección de cierre para todos los presupuestos del mes (por defecto el
+    actual). `filters` se aplica a Budget (p. ej. cost_center_id=...).
+    """
+    from autodis_compras.apps.requests.models import PurchaseRequest
+    from autodis_compras.apps.reports.rollup import APPROVED_STATUSES
+
+    today = today or timezone.localdate()
+    year = int(year or today.year)
+    month = int(month or today.month)
+    elapsed, days_in_month = _elapsed_days(year, month, today)
+
+    budgets = list(Budget.objects.filter(year=year, month=month, **filters).values(
+        'id', 'cost_center_id', 'cost_center__code', 'category_id', 'category__name', 'amount',
+    ).order_by('cost_center__code', 'category__name'))
+    if not budgets:
+        return []
+
+    pipeline_statuses = [PurchaseRequest.PENDIENTE_GERENTE, PurchaseRequest.APROBADA_POR_GERENTE]
+    spend = PurchaseRequest.objects.filter(
+        cost_center_id__in={b['cost_center_id'] for b in budgets},
+        category_id__in={b['category_id'] for b in budgets},
+        status__in=APPROVED_STATUSES + pipeline_statuses,
+        **range_filter(*month_range(year, month)),
+    ).values('cost_center_id', 'category_id').annotate(
+        spent=Coalesce(Sum('estimated_amount', filter=Q(status__in=APPROVED_STATUSES)), ZERO),
+        pipeline=Coalesce(Sum('estimated_amount', filter=Q(status__in=pipeline_statuses)), ZERO),
+    ).order_by()
+    spend = {(row['cost_center_id'], row['category_id']): row for row in spend}
+
+    results = []
+    for budget in budgets:
+        row = spend.get((budget['cost_center_id'], budget['category_id']), {})
+        spent = row.get('spent', ZERO)
+        pipeline = row.get('pipeline', ZERO)
+        daily_rate = (spent / elapsed).quantize(Decimal('0.01')) if elapsed else ZERO
+        projected = spent + daily_rate * (days_in_month - elapsed) + pipeline
+        amount = budget['amount']
+        results.append({
+            'budget': budget['id'],
+            'cost_center': budget['cost_center_id'],
+            'cost_center_code': budget['cost_center__code'],
+            'category': budget['category_id'],
+            'category_name': budget['category__name'],
+            'year': year,
+            'month': month,
+            'amount': amount,
+            'spent': spent,
+            'pipeline': pipeline,
+            'daily_rate': daily_rate,
+            'projected': projected,
+            'projected_percentage': round(projected / amount * 100, 1) if amount else None,
+            'status': _status(projected, amount),
+        })
+    return results
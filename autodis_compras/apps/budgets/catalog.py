@@ -0,0 +1,82 @@
+"""
+Catálogo de categorías e items en memoria del proceso.
+Cada worker guarda una copia del catálogo completo (12 categorías y ~228
+items) junto con la versión con la que la cargó. La versión vive en la
+caché compartida de Django y se incrementa en cada alta, cambio o baja de
+una categoría o item (ver signals.py), así que cada consulta cuesta una
+lectura de caché y la copia se recarga en todos los workers solo cuando el
+catálogo cambió.
+
+Las instancias son compartidas entre peticiones: son de solo lectura.
+"""
+
+import threading
+import time
+
+from django.core.cache import cache
+
+from .models import Category, Item
+
+VERSION_KEY = 'catalog:version'
+
+_lock = threading.Lock()
+_snapshot = None
+
+
+class _Snapshot:
+    def __init__(self, version):
+        self.version = version
+        self.categories = {category.pk: category for category in Category.objects.all()}
+        self.items = {}
+        for item in Item.objects.all():
+            # Se comparte la categoría del catálogo en lugar de consultarla por item
+            item.category = self.categories[item.category_id]
+            self.items[item.pk] = item
+        self.categories_by_code = {category.code: category for category in self.categories.values()}
+
+
+def _new_version():
+    # Si la llave se pierde (reinicio o desalojo) la versión nueva no debe
+    # coincidir con la que un worker ya tenga cargada
+    return time.time_ns()
+
+
+def catalog_version():
+    return cache.get_or_set(VERSION_KEY, _new_version, None)
+
+
+def _current():
+    global _snapshot
+    version = catalog_version()
+    snapshot = _snapshot
+    if snapshot is None or snapshot.version != version:
+        with _lock:
+            snapshot = _snapshot
+            if snapshot is None or snapshot.version != version:
+                snapshot = _snapshot = _Snapshot(version)
+    return snapshot
+
+
+def get_item(pk):
+    """Item por id, o None si no existe."""
+    return _current().items.get(pk)
+
+
+def get_category(pk):
+    """Categoría por id, o None si no existe."""
+    return _current().categories.get(pk)
+
+
+def categories_by_code():
+    """Diccionario código -> categoría."""
+    return _current().categories_by_code
+
+
+def invalidate_catalog():
+    """Incrementa la versión del catálogo; cada worker lo recarga en su siguiente consulta."""
+    global _snapshot
+    _snapshot = None
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, _new_version(), None)
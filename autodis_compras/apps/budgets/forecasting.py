@@ -0,0 +1,188 @@
+"""
+Proyección de presupuestos a partir del gasto histórico.
+El gasto de varios años se lee en una sola consulta agrupada sobre el resumen
+mensual (MonthlySpend) y se carga en una matriz NumPy de forma
+(series, años, 12), donde cada serie es un par centro de costos / categoría.
+Los métodos calculan los 12 meses proyectados de todas las series a la vez.
+"""
+
+from decimal import Decimal
+
+import numpy as np
+from django.db.models import Avg, Sum
+
+from .models import Budget
+
+AVERAGE = 'average'
+SEASONAL_NAIVE = 'seasonal_naive'
+MOVING_AVERAGE = 'moving_average'
+GROWTH_ADJUSTED = 'growth_adjusted'
+
+METHODS = [AVERAGE, SEASONAL_NAIVE, MOVING_AVERAGE, GROWTH_ADJUSTED]
+
+DEFAULT_HISTORY_YEARS = 3
+MAX_HISTORY_YEARS = 10
+
+# Límites del crecimiento anual para que un año atípico no dispare la proyección
+MIN_GROWTH = -0.5
+MAX_GROWTH = 1.0
+
+
+class Forecast:
+    """Proyección de 12 meses para un conjunto de series centro de costos / categoría."""
+
+    def __init__(self, series, values):
+        self.series = series
+        self.values = values
+
+    def __len__(self):
+        return len(self.series)
+
+    def amount(self, index, month):
+        return Decimal(f'{self.values[index, month - 1]:.2f}')
+
+    def grid(self, months=range(1, 13)):
+        """Tabla de vista previa: una fila por serie con los montos de cada mes."""
+        rows = []
+        for index, serie in enumerate(self.series):
+            amounts = [self.amount(index, month) for month in months]
+            rows.append({
+                **serie,
+                'months': dict(zip(months, amounts)),
+                'total': sum(amounts, Decimal('0.00')),
+            })
+        return rows
+
+
+def spend_matrix(last_year, history_years):
+    """
+    Gasto aprobado por serie y mes de los `history_years` años que terminan en
+    `last_year`. Devuelve (series, matriz) con la matriz de forma
+    (series, años, 12); los meses sin gasto valen cero.
+    """
+    from autodis_compras.apps.reports.models import MonthlySpend
+    from autodis_compras.apps.reports.rollup import APPROVED_STATUSES
+
+    first_year = last_year - history_years + 1
+    rows = list(MonthlySpend.objects.filter(
+        year__gte=first_year, year__lte=last_year, status__in=APPROVED_STATUSES,
+    ).values(
+        'cost_center_id', 'cost_center__code', 'category_id', 'category__name', 'year', 'month',
+    ).annotate(total=Sum('estimated_total')).order_by('cost_center__code', 'category__name'))
+
+    index = {}
+    series = []
+    for row in rows:
+        key = (row['cost_center_id'], row['category_id'])
+        if key not in index:
+            index[key] = len(series)
+            series.append({
+                'cost_center': row['cost_center_id'],
+                'cost_center_code': row['cost_center__code'],
+                'category': row['category_id'],
+                'category_name': row['category__name'],
+            })
+
+    matrix = np.zeros((len(series), history_years, 12))
+    if rows:
+        positions = np.array([index[(row['cost_center_id'], row['category_id'])] for row in rows])
+        years = np.array([row['year'] - first_year for row in rows])
+        months = np.array([row['month'] - 1 for row in rows])
+        totals = np.array([float(row['total']) for row in rows])
+        np.add.at(matrix, (positions, years, months), totals)
+    return series, matrix
+
+
+def seasonal_naive(matrix):
+    """Cada mes proyectado es igual al mismo mes del último año."""
+    return matrix[:, -1, :]
+
+
+def moving_average(matrix):
+    """Cada mes proyectado es el promedio del mismo mes en los años de historia."""
+    return matrix.mean(axis=1)
+
+
+def growth_adjusted(matrix):
+    """
+    Perfil estacional del último año escalado por el crecimiento anual entre
+    los dos últimos años de cada serie (acotado entre MIN_GROWTH y MAX_GROWTH).
+    Sin gasto en el penúltimo año el crecimiento es cero.
+    """
+    last = matrix[:, -1, :]
+    if matrix.shape[1] < 2:
+        return last
+    last_total = last.sum(axis=1)
+    previous_total = matrix[:, -2, :].sum(axis=1)
+    growth = np.divide(
+        last_total - previous_total, previous_total,
+        out=np.zeros_like(last_total), where=previous_total > 0,
+    )
+    growth = np.clip(growth, MIN_GROWTH, MAX_GROWTH)
+    return last * (1 + growth)[:, np.newaxis]
+
+
+SPEND_METHODS = {
+    SEASONAL_NAIVE: seasonal_naive,
+    MOVING_AVERAGE: moving_average,
+    GROWTH_ADJUSTED: growth_adjusted,
+}
+
+
+def budget_average(source_year):
+    """Método original: promedio plano de los presupuestos del año origen."""
+    rows = Budget.objects.filter(year=source_year).values(
+        'cost_center_id', 'cost_center__code', 'category_id', 'category__name',
+    ).annotate(avg_amount=Avg('amount')).order_by('cost_center__code', 'category__name')
+
+    series = []
+    averages = []
+    for row in rows:
+        averages.append(float(row.pop('avg_amount')))
+        series.append({
+            'cost_center': row['cost_center_id'],
+            'cost_center_code': row['cost_center__code'],
+            'category': row['category_id'],
+            'category_name': row['category__name'],
+        })
+    return Forecast(series, np.repeat(np.array(averages).reshape(-1, 1), 12, axis=1))
+
+
+def forecast(source_year, method=AVERAGE, history_years=DEFAULT_HISTORY_YEARS):
+    """Proyección de 12 meses a partir de la historia que termina en `source_year`."""
+    if method == AVERAGE:
+        return budget_average(source_year)
+    if method == GROWTH_ADJUSTED:
+        history_years = max(history_years, 2)
+    series, matrix = spend_matrix(source_year, history_years)
+    return Forecast(series, SPEND_METHODS[method](matrix))
+
+
+def create_budgets(result, target_year, months=range(1, 13)):
+    """
+    Crea los presupuestos proyectados que aún no existen con bulk_create.
+    Devuelve (creados, omitidos).
+    """
+    existing = set(Budget.objects.filter(year=target_year, month__in=list(months)).values_list(
+        'cost_center_id', 'category_id', 'month',
+    ))
+    budgets = []
+    skipped = 0
+    for index, serie in enumerate(result.series):
+        for month in months:
+            if (serie['cost_center'], serie['category'], month) in existing:
+                skipped += 1
+                continue
+            budgets.append(Budget(
+                cost_center_id=serie['cost_center'],
+                category_id=serie['category'],
+                year=target_year,
+                month=month,
+                amount=result.amount(index, month),
+            ))
+    Budget.objects.bulk_create(budgets, batch_size=1000)
+    if budgets:
+        # bulk_create no envía post_save: se invalidan aquí los reportes en caché
+        from autodis_compras.apps.reports.cache import invalidate_reports
+        invalidate_reports()
+    return len(budgets), skipped
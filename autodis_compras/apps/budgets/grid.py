@@ -0,0 +1,140 @@
+"""
+Editor anual de presupuestos en forma de matriz.
+La lectura devuelve un año completo como matriz centro de costos ×
+categoría × mes en tres consultas. La escritura recibe solo las celdas
+modificadas y las aplica en una transacción con bulk_update / bulk_create
+y un solo bulk_create de historial; los meses cerrados se validan con una
+sola consulta antes de escribir.
+"""
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from autodis_compras.apps.users.models import CostCenter
+from autodis_compras.concurrency import ConcurrentUpdateError
+from .models import Category, Budget, BudgetHistory
+
+
+class GridError(Exception):
+    """Error de validación de los cambios de la matriz; el mensaje es para el usuario."""
+
+
+def budget_grid(year):
+    """
+    Matriz de presupuestos del año. `amounts[i][j][m]` es el monto del centro
+    de costos i, categoría j y mes m + 1, o None si no hay presupuesto.
+    """
+    cost_centers = list(CostCenter.objects.filter(
+        Q(is_active=True) | Q(budgets__year=year),
+    ).distinct().order_by('code').values('id', 'code', 'name'))
+    categories = list(Category.objects.filter(
+        Q(is_active=True) | Q(budgets__year=year),
+    ).distinct().order_by('name').values('id', 'code', 'name'))
+
+    cc_index = {cc['id']: i for i, cc in enumerate(cost_centers)}
+    cat_index = {cat['id']: j for j, cat in enumerate(categories)}
+    amounts = [[[None] * 12 for _ in categories] for _ in cost_centers]
+    closed_months = set()
+
+    for cost_center_id, category_id, month, amount, is_closed in Budget.objects.filter(year=year).values_list(
+        'cost_center_id', 'category_id', 'month', 'amount', 'is_closed',
+    ):
+        amounts[cc_index[cost_center_id]][cat_index[category_id]][month - 1] = amount
+        if is_closed:
+            closed_months.add(month)
+
+    return {
+        'year': year,
+        'cost_centers': cost_centers,
+        'categories': categories,
+        'closed_months': sorted(closed_months),
+        'amounts': amounts,
+    }
+
+
+def apply_grid_changes(year, cells, user, reason=''):
+    """
+    Aplica las celdas modificadas (cost_center, category, month, amount).
+    Devuelve un diccionario con el número de presupuestos creados, actualizados
+    y sin cambios, o lanza GridError sin escribir nada (ConcurrentUpdateError
+    si otro guardado creó las mismas celdas al mismo tiempo).
+    """
+    keys = [(cell['cost_center'], cell['category'], cell['month']) for cell in cells]
+    if len(keys) != len(set(keys)):
+        raise GridError('Una celda no puede repetirse en los cambios.')
+
+    months = {month for _, _, month in keys}
+    cost_center_ids = {cc for cc, _, _ in keys}
+    category_ids = {cat for _, cat, _ in keys}
+
+    missing = cost_center_ids - set(CostCenter.objects.filter(pk__in=cost_center_ids).values_list('pk', flat=True))
+    if missing:
+        raise GridError(f'Centros de costos no encontrados: {", ".join(str(pk) for pk in sorted(missing))}.')
+    missing = category_ids - set(Category.objects.filter(pk__in=category_ids).values_list('pk', flat=True))
+    if missing:
+        raise GridError(f'Categorias no encontradas: {", ".join(str(pk) for pk in sorted(missing))}.')
+
+    try:
+        result = _save_cells(year, cells, keys, months, cost_center_ids, category_ids, user, reason)
+    except IntegrityError:
+        # Otro guardado creó la misma celda entre la lectura y el bulk_create
+        raise ConcurrentUpdateError(
+            'Otro usuario creó presupuestos de estas celdas al mismo tiempo. Recargue e intente de nuevo.'
+        )
+
+    if result['created'] or result['updated']:
+        # bulk_create / bulk_update no envían post_save: se invalidan aquí los reportes en caché
+        from autodis_compras.apps.reports.cache import invalidate_reports
+        invalidate_reports()
+
+    return result
+
+
+def _save_cells(year, cells, keys, months, cost_center_ids, category_ids, user, reason):
+    with transaction.atomic():
+        closed = sorted(set(Budget.objects.filter(
+            year=year, month__in=months, is_closed=True,
+        ).values_list('month', flat=True)))
+        if closed:
+            raise GridError(f'No se pueden modificar meses cerrados: {", ".join(str(m) for m in closed)}.')
+
+        existing = {
+            (budget.cost_center_id, budget.category_id, budget.month): budget
+            for budget in Budget.objects.select_for_update().filter(
+                year=year, month__in=months,
+                cost_center_id__in=cost_center_ids, category_id__in=category_ids,
+            )
+        }
+
+        now = timezone.now()
+        to_create = []
+        to_update = []
+        history = []
+        for cell, key in zip(cells, keys):
+            budget = existing.get(key)
+            if budget is None:
+                to_create.append(Budget(
+                    cost_center_id=key[0], category_id=key[1], year=year, month=key[2], amount=cell['amount'],
+                ))
+                continue
+            if budget.amount == cell['amount']:
+                continue
+            history.append(BudgetHistory(
+                budget=budget, previous_amount=budget.amount, new_amount=cell['amount'],
+                changed_by=user, reason=reason,
+            ))
+            budget.amount = cell['amount']
+            budget.updated_at = now
+            budget.version += 1
+            to_update.append(budget)
+
+        Budget.objects.bulk_create(to_create, batch_size=1000)
+        Budget.objects.bulk_update(to_update, ['amount', 'updated_at', 'version'], batch_size=1000)
+        BudgetHistory.objects.bulk_create(history, batch_size=1000)
+
+    return {
+        'created': len(to_create),
+        'updated': len(to_update),
+        'unchanged': len(cells) - len(to_create) - len(to_update),
+    }
@@ -0,0 +1,93 @@
+# Generated by Django 4.2.9 on 2026-10-19 09:44
+
+from decimal import Decimal
+from django.conf import settings
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("budgets", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BudgetTransfer",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("batch", models.UUIDField(db_index=True, verbose_name="Lote")),
+                (
+                    "amount",
+                    models.DecimalField(
+                        decimal_places=2,
+                        max_digits=12,
+                        validators=[
+                            django.core.validators.MinValueValidator(Decimal("0.01"))
+                        ],
+                        verbose_name="Monto",
+                    ),
+                ),
+                ("reason", models.TextField(blank=True, verbose_name="Razón")),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Creado"),
+                ),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="budget_transfers",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Realizada por",
+                    ),
+                ),
+                (
+                    "source",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="transfers_out",
+                        to="budgets.budget",
+                        verbose_name="Presupuesto origen",
+                    ),
+                ),
+                (
+                    "target",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="transfers_in",
+                        to="budgets.budget",
+                        verbose_name="Presupuesto destino",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Transferencia de Presupuesto",
+                "verbose_name_plural": "Transferencias de Presupuesto",
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.AddField(
+            model_name="budgethistory",
+            name="transfer",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="history",
+                to="budgets.budgettransfer",
+                verbose_name="Transferencia",
+            ),
+        ),
+    ]
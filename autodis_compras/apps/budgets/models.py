@@ -6,6 +6,8 @@ from django.db import models
 from django.core.validators import MinValueValidator
 from decimal import Decimal
 from autodis_compras.apps.users.models import CostCenter
+from autodis_compras.concurrency import VersionedModel
+from autodis_compras.periods import month_range, range_filter
 
 
 class Category(models.Model):
@@ -83,10 +85,11 @@ class Item(models.Model):
         return f"{self.category.name} - {self.name}"
 
 
-class Budget(models.Model):
+class Budget(VersionedModel):
     """
     Presupuestos mensuales por centro de costos y categoría.
     Control de 3 niveles: Centro de Costos, Categoría, Mes.
+    Usa control de concurrencia optimista por versión.
     """
     cost_center = models.ForeignKey(CostCenter, on_delete=models.PROTECT, related_name='budgets', verbose_name='Centro de Costos')
     category = models.ForeignKey(Category, on_delete=models.PROTECT, related_name='budgets', verbose_name='Categoría')
@@ -117,8 +120,7 @@ class Budget(models.Model):
         spent = PurchaseRequest.objects.filter(
             cost_center=self.cost_center,
             category=self.category,
-            created_at__year=self.year,
-            created_at__month=self.month,
+            **range_filter(*month_range(self.year, self.month)),
             status__in=[
                 PurchaseRequest.APROBADA_POR_GERENTE,
                 PurchaseRequest.APROBADA,
@@ -154,6 +156,7 @@ class BudgetHistory(models.Model):
     new_amount = models.DecimalField('Nuevo Monto', max_digits=12, decimal_places=2)
     changed_by = models.ForeignKey('users.User', on_delete=models.PROTECT, verbose_name='Modificado por')
     reason = models.TextField('Razón del cambio', blank=True)
+    transfer = models.ForeignKey('BudgetTransfer', on_delete=models.PROTECT, related_name='history', verbose_name='Transferencia', null=True, blank=True)
     created_at = models.DateTimeField('Creado', auto_now_add=True)
 
     class Meta:
@@ -163,3 +166,26 @@ class BudgetHistory(models.Model):
 
     def __str__(self):
         return f"{self.budget} - Cambio: ${self.previous_amount} -> ${self.new_amount}"
+
+
+class BudgetTransfer(models.Model):
+    """
+    Transferencia de monto disponible de un presupuesto a otro.
+    Cada transferencia genera dos registros de historial (origen y destino)
+    ligados a ella; las transferencias de un mismo lote comparten batch.
+    """
+    batch = models.UUIDField('Lote', db_index=True)
+    source = models.ForeignKey(Budget, on_delete=models.PROTECT, related_name='transfers_out', verbose_name='Presupuesto origen')
+    target = models.ForeignKey(Budget, on_delete=models.PROTECT, related_name='transfers_in', verbose_name='Presupuesto destino')
+    amount = models.DecimalField('Monto', max_digits=12, decimal_places=2, validators=[MinValueValidator(Decimal('0.01'))])
+    reason = models.TextField('Razón', blank=True)
+    created_by = models.ForeignKey('users.User', on_delete=models.PROTECT, related_name='budget_transfers', verbose_name='Realizada por')
+    created_at = models.DateTimeField('Creado', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Transferencia de Presupuesto'
+        verbose_name_plural = 'Transferencias de Presupuesto'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.source} -> {self.target}: ${self.amount:,.2f}"
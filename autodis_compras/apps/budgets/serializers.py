@@ -2,8 +2,35 @@
 Serializers para el módulo de presupuestos.
 """
 
+from decimal import Decimal
 from rest_framework import serializers
-from .models import Category, Item, Budget, BudgetHistory
+from . import catalog
+from .models import Category, Item, Budget, BudgetHistory, BudgetTransfer
+
+
+class CatalogRelatedField(serializers.PrimaryKeyRelatedField):
+    """Relación por id que se valida contra el catálogo en memoria, sin consultar la base."""
+    lookup = None
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        obj = type(self).lookup(pk)
+        if obj is None:
+            self.fail('does_not_exist', pk_value=data)
+        return obj
+
+
+class CatalogCategoryField(CatalogRelatedField):
+    lookup = staticmethod(catalog.get_category)
+
+
+class CatalogItemField(CatalogRelatedField):
+    lookup = staticmethod(catalog.get_item)
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -45,9 +72,9 @@ class BudgetSerializer(serializers.ModelSerializer):
             'id', 'cost_center', 'cost_center_name', 'category', 'category_name',
             'year', 'month', 'amount', 'is_closed',
             'spent_amount', 'available_amount', 'utilization_percentage', 'is_exceeded',
-            'created_at', 'updated_at',
+            'version', 'created_at', 'updated_at',
         ]
-        read_only_fields = ['created_at', 'updated_at']
+        read_only_fields = ['version', 'created_at', 'updated_at']
 
 
 class BudgetHistorySerializer(serializers.ModelSerializer):
@@ -57,6 +84,42 @@ class BudgetHistorySerializer(serializers.ModelSerializer):
         model = BudgetHistory
         fields = [
             'id', 'budget', 'previous_amount', 'new_amount',
-            'changed_by', 'changed_by_name', 'reason', 'created_at',
+            'changed_by', 'changed_by_name', 'reason', 'transfer', 'created_at',
         ]
         read_only_fields = ['created_at']
+
+
+class BudgetTransferSerializer(serializers.ModelSerializer):
+    source_name = serializers.CharField(source='source.__str__', read_only=True)
+    target_name = serializers.CharField(source='target.__str__', read_only=True)
+    created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
+
+    class Meta:
+        model = BudgetTransfer
+        fields = [
+            'id', 'batch', 'source', 'source_name', 'target', 'target_name',
+            'amount', 'reason', 'created_by', 'created_by_name', 'created_at',
+        ]
+        read_only_fields = fields
+
+
+class BudgetTransferInputSerializer(serializers.Serializer):
+    """Una transferencia del lote: presupuesto origen, destino y monto."""
+    source = serializers.IntegerField()
+    target = serializers.IntegerField()
+    amount = serializers.DecimalField(max_digits=12, decimal_places=2, min_value=Decimal('0.01'))
+    reason = serializers.CharField(required=False, allow_blank=True, default='')
+
+
+class BudgetGridCellSerializer(serializers.Serializer):
+    cost_center = serializers.IntegerField()
+    category = serializers.IntegerField()
+    month = serializers.IntegerField(min_value=1, max_value=12)
+    amount = serializers.DecimalField(max_digits=12, decimal_places=2, min_value=Decimal('0.00'))
+
+
+class BudgetGridSerializer(serializers.Serializer):
+    """Cambios de la matriz anual: solo las celdas modificadas."""
+    year = serializers.IntegerField(min_value=2000, max_value=2100)
+    reason = serializers.CharField(required=False, allow_blank=True, default='')
+    cells = BudgetGridCellSerializer(many=True, allow_empty=False)
@@ -0,0 +1,27 @@
+"""
+Signals para invalidar el catálogo en memoria y las respuestas de catálogo en
+caché cuando cambia una categoría o un item.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from autodis_compras.cache import invalidate_on
+from .catalog import invalidate_catalog
+from .models import Category, Item
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Item)
+@receiver(post_delete, sender=Item)
+def on_catalog_changed(sender, instance, **kwargs):
+    """Invalida el catálogo al guardar y otra vez al confirmar la transacción."""
+    invalidate_catalog()
+    # Un worker que recargue antes del commit leería el catálogo anterior con la versión nueva
+    transaction.on_commit(invalidate_catalog)
+
+
+invalidate_on(Category, 'catalog')
+invalidate_on(Item, 'catalog')
@@ -0,0 +1,78 @@
+"""
+Resumen de presupuesto y gasto por nivel jerárquico (centro de costos, área
+o ubicación). El presupuesto sale de una consulta agrupada sobre Budget y el
+gasto de otra sobre el resumen mensual MonthlySpend, ambas agrupadas a
+través de CostCenter, por lo que los totales coinciden en todos los niveles.
+"""
+
+from decimal import Decimal
+
+from django.db.models import Sum
+
+from autodis_compras.periods import Period
+from .models import Budget
+
+ZERO = Decimal('0.00')
+
+COST_CENTER = 'cost_center'
+AREA = 'area'
+LOCATION = 'location'
+
+LEVELS = {
+    COST_CENTER: ('cost_center_id', 'cost_center__code'),
+    AREA: ('cost_center__area_id', 'cost_center__area__name'),
+    LOCATION: ('cost_center__location_id', 'cost_center__location__name'),
+}
+
+
+def spent_statuses():
+    """Estados que cuentan como gasto, igual que Budget.get_spent_amount."""
+    from autodis_compras.apps.requests.models import PurchaseRequest
+    from autodis_compras.apps.reports.rollup import APPROVED_STATUSES
+    return [PurchaseRequest.APROBADA_POR_GERENTE] + APPROVED_STATUSES
+
+
+def budget_summary(level, year, month=None):
+    """Presupuesto, gasto y disponible por nivel para un año o un mes."""
+    from autodis_compras.apps.reports.models import MonthlySpend
+
+    id_field, name_field = LEVELS[level]
+    period = Period.for_month(year, month) if month else Period.for_year(year)
+
+    rows = {}
+
+    def entry(row):
+        key = row[id_field]
+        if key not in rows:
+            rows[key] = {'id': key, 'name': row[name_field], 'budget': ZERO, 'spent': ZERO}
+        return rows[key]
+
+    budgets = Budget.objects.filter(period.month_q()).values(id_field, name_field).annotate(
+        total=Sum('amount'),
+    ).order_by()
+    for row in budgets:
+        entry(row)['budget'] = row['total']
+
+    spend = MonthlySpend.objects.filter(period.month_q(), status__in=spent_statuses()).values(
+        id_field, name_field,
+    ).annotate(total=Sum('estimated_total')).order_by()
+    for row in spend:
+        entry(row)['spent'] = row['total']
+
+    results = sorted(rows.values(), key=lambda row: str(row['name']))
+    for row in results:
+        row['available'] = row['budget'] - row['spent']
+        row['utilization_percentage'] = (
+            round(row['spent'] / row['budget'] * 100, 1) if row['budget'] else None
+        )
+
+    total_budget = sum((row['budget'] for row in results), ZERO)
+    total_spent = sum((row['spent'] for row in results), ZERO)
+    return {
+        'results': results,
+        'totals': {
+            'budget': total_budget,
+            'spent': total_spent,
+            'available': total_budget - total_spent,
+        },
+    }
@@ -0,0 +1,57 @@
+"""
+Tareas Celery del modulo de presupuestos.
+"""
+
+import logging
+from celery import shared_task
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def alert_budget_overspend():
+    """
+    Alerta nocturna: notifica a Finanzas y Direccion General los presupuestos
+    del mes en curso cuyo cierre proyectado excede el monto asignado.
+    """
+    from autodis_compras.apps.budgets.burn_rate import compute_burn_rate, EXCEDIDO
+    from autodis_compras.apps.notifications.models import EmailNotification
+    from autodis_compras.apps.notifications.tasks import send_notification_email
+    from autodis_compras.apps.users.models import User
+    from autodis_compras.routers import read_from
+
+    # El cálculo solo lee: se hace en la base de reportes
+    with read_from(settings.REPORTS_DB_ALIAS):
+        exceeded = [row for row in compute_burn_rate() if row['status'] == EXCEDIDO]
+    if not exceeded:
+        return 'Sin presupuestos en riesgo de exceso'
+
+    year, month = exceeded[0]['year'], exceeded[0]['month']
+    lines = [
+        f'- {row["cost_center_code"]} / {row["category_name"]}: '
+        f'presupuesto ${row["amount"]:,.2f}, gastado ${row["spent"]:,.2f}, '
+        f'en aprobacion ${row["pipeline"]:,.2f}, proyectado ${row["projected"]:,.2f} MXN'
+        for row in exceeded
+    ]
+    subject = f'Presupuestos con exceso proyectado {year}/{month:02d}: {len(exceeded)}'
+    message = (
+        f'Los siguientes presupuestos excederan su monto al cierre del mes '
+        f'al ritmo de gasto actual:\n\n' + '\n'.join(lines) + '\n'
+    )
+
+    recipients = User.objects.filter(
+        role__in=[User.FINANZAS, User.DIRECCION_GENERAL],
+        is_active=True,
+    )
+    for recipient in recipients:
+        notification = EmailNotification.objects.create(
+            notification_type=EmailNotification.PRESUPUESTO_EXCEDIDO,
+            recipient=recipient,
+            subject=subject,
+            message=message,
+        )
+        send_notification_email.delay(notification.id)
+
+    logger.info(f'Alerta de exceso proyectado: {len(exceeded)} presupuestos')
+    return f'{len(exceeded)} presupuestos con exceso proyectado'
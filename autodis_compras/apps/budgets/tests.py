@@ -2,13 +2,21 @@
 Tests para el módulo de presupuestos.
 """
 
+import datetime
 from decimal import Decimal
+from django.core.cache import cache
+from django.db import connection, transaction
 from django.test import TestCase
+from django.utils import timezone
 from rest_framework.test import APIClient
 from rest_framework import status
 
 from autodis_compras.apps.users.models import Area, Location, CostCenter, User
-from .models import Category, Item, Budget, BudgetHistory
+from autodis_compras.concurrency import ConcurrentUpdateError
+from .models import Category, Item, Budget, BudgetHistory, BudgetTransfer
+from . import catalog, forecasting
+from .burn_rate import compute_burn_rate, OK, EN_RIESGO, EXCEDIDO
+from .tasks import alert_budget_overspend
 
 
 class BudgetBaseTestCase(TestCase):
@@ -261,3 +269,457 @@ class BudgetAPITests(BudgetBaseTestCase):
         response = self.client.get('/api/budgets/budget-history/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['count'], 1)
+
+
+class ForecastingTests(BudgetBaseTestCase):
+    """Tests de la proyección de presupuestos desde el gasto histórico."""
+
+    def setUp(self):
+        from autodis_compras.apps.reports.models import MonthlySpend
+        self.client = APIClient()
+        self.finance_user = self._create_user(
+            'fin@forecast.com', User.FINANZAS,
+            area=self.area_fin, cost_center=self.cost_center_fin,
+        )
+        # 2024: 100 en enero y 300 en diciembre; 2025: 150 y 450 (+50%)
+        for year, january, december in [(2024, '100.00', '300.00'), (2025, '150.00', '450.00')]:
+            for month, amount in [(1, january), (12, december)]:
+                MonthlySpend.objects.create(
+                    year=year, month=month, cost_center=self.cost_center, category=self.category,
+                    requester=self.finance_user, status='APROBADA', request_count=1,
+                    estimated_total=Decimal(amount),
+                )
+
+    def _values(self, method, history_years=2):
+        result = forecasting.forecast(2025, method, history_years)
+        self.assertEqual(len(result), 1)
+        return result.amount(0, 1), result.amount(0, 6), result.amount(0, 12)
+
+    def test_seasonal_naive(self):
+        self.assertEqual(self._values(forecasting.SEASONAL_NAIVE), (Decimal('150.00'), Decimal('0.00'), Decimal('450.00')))
+
+    def test_moving_average(self):
+        self.assertEqual(self._values(forecasting.MOVING_AVERAGE), (Decimal('125.00'), Decimal('0.00'), Decimal('375.00')))
+
+    def test_growth_adjusted(self):
+        self.assertEqual(self._values(forecasting.GROWTH_ADJUSTED), (Decimal('225.00'), Decimal('0.00'), Decimal('675.00')))
+
+    def test_preview_does_not_create(self):
+        self.client.force_authenticate(user=self.finance_user)
+        response = self.client.post('/api/budgets/budgets/project_from_previous_year/', {
+            'source_year': 2025, 'target_year': 2026, 'method': 'seasonal_naive', 'preview': 'true',
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['total'], Decimal('600.00'))
+        self.assertFalse(Budget.objects.filter(year=2026).exists())
+
+    def test_create_skips_existing(self):
+        Budget.objects.create(cost_center=self.cost_center, category=self.category, year=2026, month=1, amount=Decimal('1.00'))
+        self.client.force_authenticate(user=self.finance_user)
+        response = self.client.post('/api/budgets/budgets/project_from_previous_year/', {
+            'source_year': 2025, 'target_year': 2026, 'method': 'moving_average', 'history_years': 2,
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['created'], response.data['skipped']), (11, 1))
+        self.assertEqual(Budget.objects.get(year=2026, month=12).amount, Decimal('375.00'))
+
+    def test_average_keeps_previous_behavior(self):
+        Budget.objects.create(cost_center=self.cost_center, category=self.category, year=2025, month=1, amount=Decimal('100.00'))
+        Budget.objects.create(cost_center=self.cost_center, category=self.category, year=2025, month=2, amount=Decimal('200.00'))
+        self.client.force_authenticate(user=self.finance_user)
+        response = self.client.post('/api/budgets/budgets/project_from_previous_year/', {
+            'source_year': 2025, 'target_year': 2026, 'target_month': 3,
+        })
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(Budget.objects.get(year=2026, month=3).amount, Decimal('150.00'))
+
+    def test_invalid_method(self):
+        self.client.force_authenticate(user=self.finance_user)
+        response = self.client.post('/api/budgets/budgets/project_from_previous_year/', {
+            'source_year': 2025, 'target_year': 2026, 'method': 'arima',
+        })
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class BurnRateTests(BudgetBaseTestCase):
+    """Tests de la proyección de cierre de mes por presupuesto."""
+
+    def setUp(self):
+        from autodis_compras.apps.requests.models import PurchaseRequest
+        self.client = APIClient()
+        self.finance_user = self._create_user(
+            'fin@burn.com', User.FINANZAS,
+            area=self.area_fin, cost_center=self.cost_center_fin,
+        )
+        self.employee = self._create_user('emp@burn.com', User.EMPLEADO)
+        self.budget = Budget.objects.create(
+            cost_center=self.cost_center, category=self.category,
+            year=2026, month=3, amount=Decimal('1000.00'),
+        )
+        Budget.objects.create(
+            cost_center=self.cost_center, category=self.category2,
+            year=2026, month=3, amount=Decimal('1000.00'),
+        )
+        for amount, request_status in [('400.00', PurchaseRequest.APROBADA), ('100.00', PurchaseRequest.APROBADA_POR_GERENTE)]:
+            PurchaseRequest.objects.create(
+                requester=self.employee, cost_center=self.cost_center, category=self.category,
+                description='Compra', estimated_amount=Decimal(amount),
+                required_date=datetime.date(2026, 3, 20), justification='Test', status=request_status,
+            )
+        PurchaseRequest.objects.update(created_at=timezone.make_aware(datetime.datetime(2026, 3, 5, 12)))
+
+    def test_projection_from_daily_rate_and_pipeline(self):
+        with self.assertNumQueries(2):
+            results = compute_burn_rate(2026, 3, today=datetime.date(2026, 3, 10))
+        row = next(r for r in results if r['budget'] == self.budget.pk)
+        self.assertEqual(row['spent'], Decimal('400.00'))
+        self.assertEqual(row['pipeline'], Decimal('100.00'))
+        self.assertEqual(row['daily_rate'], Decimal('40.00'))
+        # 400 + 40 x 21 dias restantes + 100 en aprobacion
+        self.assertEqual(row['projected'], Decimal('1340.00'))
+        self.assertEqual(row['status'], EXCEDIDO)
+        other = next(r for r in results if r['budget'] != self.budget.pk)
+        self.assertEqual((other['projected'], other['status']), (Decimal('0.00'), OK))
+
+    def test_closed_month_projects_actual_spend(self):
+        row = compute_burn_rate(2026, 3, today=datetime.date(2026, 4, 2), category_id=self.category.pk)[0]
+        self.assertEqual(row['projected'], Decimal('500.00'))
+        self.assertEqual(row['status'], OK)
+        self.budget.amount = Decimal('520.00')
+        self.budget.save()
+        row = compute_burn_rate(2026, 3, today=datetime.date(2026, 4, 2), category_id=self.category.pk)[0]
+        self.assertEqual(row['status'], EN_RIESGO)
+
+    def test_endpoint_at_risk(self):
+        Budget.objects.filter(pk=self.budget.pk).update(amount=Decimal('520.00'))
+        self.client.force_authenticate(user=self.finance_user)
+        response = self.client.get('/api/budgets/budgets/burn_rate/', {'year': 2026, 'month': 3, 'at_risk': 'true'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['budget'] for row in response.data], [self.budget.pk])
+        response = self.client.get('/api/budgets/budgets/burn_rate/', {'year': 2026})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_nightly_alert_notifies_finance(self):
+        from autodis_compras.apps.notifications.models import EmailNotification
+        from autodis_compras.apps.requests.models import PurchaseRequest
+        today = timezone.localdate()
+        Budget.objects.create(
+            cost_center=self.cost_center, category=self.category2,
+            year=today.year, month=today.month, amount=Decimal('1.00'),
+        )
+        PurchaseRequest.objects.filter(status=PurchaseRequest.APROBADA).update(
+            category=self.category2, created_at=timezone.now(),
+        )
+        alert_budget_overspend()
+        notification = EmailNotification.objects.get(notification_type=EmailNotification.PRESUPUESTO_EXCEDIDO)
+        self.assertEqual(notification.recipient, self.finance_user)
+        self.assertIn('CC-OPS-GDL', notification.message)
+
+
+class LevelSummaryTests(BudgetBaseTestCase):
+    """Tests del resumen de presupuesto por centro de costos, área y ubicación."""
+
+    def setUp(self):
+        from django.core.cache import cache
+        from autodis_compras.apps.reports.models import MonthlySpend
+        cache.clear()
+        self.client = APIClient()
+        self.finance_user = self._create_user(
+            'fin@levels.com', User.FINANZAS,
+            area=self.area_fin, cost_center=self.cost_center_fin,
+        )
+        self.client.force_authenticate(user=self.finance_user)
+        for cost_center, amount in [(self.cost_center, '1000.00'), (self.cost_center_fin, '500.00')]:
+            Budget.objects.create(cost_center=cost_center, category=self.category, year=2026, month=1, amount=Decimal(amount))
+        Budget.objects.create(cost_center=self.cost_center, category=self.category2, year=2026, month=2, amount=Decimal('200.00'))
+        for status_code, amount in [('APROBADA', '300.00'), ('APROBADA_POR_GERENTE', '50.00'), ('PENDIENTE_GERENTE', '999.00')]:
+            MonthlySpend.objects.create(
+                year=2026, month=1, cost_center=self.cost_center, category=self.category,
+                requester=self.finance_user, status=status_code, request_count=1,
+                estimated_total=Decimal(amount),
+            )
+
+    def _get(self, **params):
+        return self.client.get('/api/budgets/budgets/summary/', {'year': 2026, **params})
+
+    def test_area_level(self):
+        response = self._get(level='area')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = {row['name']: row for row in response.data['results']}
+        self.assertEqual(rows[Area.OPERACIONES]['budget'], Decimal('1200.00'))
+        self.assertEqual(rows[Area.OPERACIONES]['spent'], Decimal('350.00'))
+        self.assertEqual(rows[Area.FINANZAS]['available'], Decimal('500.00'))
+
+    def test_totals_consistent_across_levels(self):
+        totals = [self._get(level=level, month=1).data['totals'] for level in ('cost_center', 'area', 'location')]
+        self.assertEqual(totals[0], totals[1])
+        self.assertEqual(totals[1], totals[2])
+        self.assertEqual(totals[0]['budget'], Decimal('1500.00'))
+
+    def test_level_summary_cached(self):
+        self._get(level='location')
+        with self.assertNumQueries(0):
+            self._get(level='location')
+
+    def test_invalid_level(self):
+        self.assertEqual(self._get(level='region').status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class BudgetTransferTests(BudgetBaseTestCase):
+    """Tests de transferencias de presupuesto."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.finance_user = self._create_user(
+            'fin@transfer.com', User.FINANZAS,
+            area=self.area_fin, cost_center=self.cost_center_fin,
+        )
+        self.client.force_authenticate(user=self.finance_user)
+        self.source = Budget.objects.create(
+            cost_center=self.cost_center, category=self.category, year=2026, month=5, amount=Decimal('1000.00'),
+        )
+        self.target = Budget.objects.create(
+            cost_center=self.cost_center, category=self.category2, year=2026, month=5, amount=Decimal('100.00'),
+        )
+        self.other = Budget.objects.create(
+            cost_center=self.cost_center_fin, category=self.category, year=2026, month=5, amount=Decimal('0.00'),
+        )
+
+    def _transfer(self, data):
+        return self.client.post('/api/budgets/budgets/transfer/', data, format='json')
+
+    def test_single_transfer_writes_linked_history(self):
+        response = self._transfer({'source': self.source.pk, 'target': self.target.pk, 'amount': '250.00', 'reason': 'Ajuste'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.source.refresh_from_db()
+        self.target.refresh_from_db()
+        self.assertEqual((self.source.amount, self.target.amount), (Decimal('750.00'), Decimal('350.00')))
+        transfer = BudgetTransfer.objects.get()
+        history = {h.budget_id: (h.previous_amount, h.new_amount) for h in transfer.history.all()}
+        self.assertEqual(history, {
+            self.source.pk: (Decimal('1000.00'), Decimal('750.00')),
+            self.target.pk: (Decimal('100.00'), Decimal('350.00')),
+        })
+
+    def test_batch_is_atomic(self):
+        response = self._transfer({'transfers': [
+            {'source': self.source.pk, 'target': self.target.pk, 'amount': '600.00'},
+            {'source': self.source.pk, 'target': self.other.pk, 'amount': '600.00'},
+        ]})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.source.refresh_from_db()
+        self.assertEqual(self.source.amount, Decimal('1000.00'))
+        self.assertFalse(BudgetTransfer.objects.exists())
+        self.assertFalse(BudgetHistory.objects.exists())
+
+    def test_batch_chains_transfers(self):
+        response = self._transfer({'transfers': [
+            {'source': self.source.pk, 'target': self.target.pk, 'amount': '500.00'},
+            {'source': self.target.pk, 'target': self.other.pk, 'amount': '550.00'},
+        ]})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len({row['batch'] for row in response.data}), 1)
+        self.other.refresh_from_db()
+        self.assertEqual(self.other.amount, Decimal('550.00'))
+
+    def test_closed_budget_rejected(self):
+        Budget.objects.filter(pk=self.target.pk).update(is_closed=True)
+        response = self._transfer({'source': self.source.pk, 'target': self.target.pk, 'amount': '10.00'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_employee_denied(self):
+        employee = self._create_user('emp@transfer.com', User.EMPLEADO)
+        self.client.force_authenticate(user=employee)
+        response = self._transfer({'source': self.source.pk, 'target': self.target.pk, 'amount': '10.00'})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class BudgetGridTests(BudgetBaseTestCase):
+    """Tests del editor anual de presupuestos."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.finance_user = self._create_user(
+            'fin@grid.com', User.FINANZAS,
+            area=self.area_fin, cost_center=self.cost_center_fin,
+        )
+        self.client.force_authenticate(user=self.finance_user)
+        self.budget = Budget.objects.create(
+            cost_center=self.cost_center, category=self.category, year=2026, month=2, amount=Decimal('100.00'),
+        )
+
+    def test_get_grid(self):
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/budgets/budgets/grid/', {'year': 2026})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([cc['code'] for cc in response.data['cost_centers']], ['CC-FIN-GDL', 'CC-OPS-GDL'])
+        self.assertEqual([cat['name'] for cat in response.data['categories']], ['Limpieza', 'Papelería'])
+        self.assertEqual(response.data['amounts'][1][1][1], Decimal('100.00'))
+        self.assertIsNone(response.data['amounts'][1][1][0])
+
+    def test_save_diff(self):
+        response = self.client.post('/api/budgets/budgets/grid/', {'year': 2026, 'reason': 'Plan anual', 'cells': [
+            {'cost_center': self.cost_center.pk, 'category': self.category.pk, 'month': 2, 'amount': '150.00'},
+            {'cost_center': self.cost_center.pk, 'category': self.category2.pk, 'month': 2, 'amount': '80.00'},
+            {'cost_center': self.cost_center_fin.pk, 'category': self.category.pk, 'month': 3, 'amount': '0.00'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['created'], response.data['updated']), (2, 1))
+        self.budget.refresh_from_db()
+        self.assertEqual(self.budget.amount, Decimal('150.00'))
+        history = BudgetHistory.objects.get()
+        self.assertEqual((history.previous_amount, history.new_amount, history.reason), (Decimal('100.00'), Decimal('150.00'), 'Plan anual'))
+
+    def test_closed_month_rejected(self):
+        Budget.objects.filter(pk=self.budget.pk).update(is_closed=True)
+        response = self.client.post('/api/budgets/budgets/grid/', {'year': 2026, 'cells': [
+            {'cost_center': self.cost_center_fin.pk, 'category': self.category2.pk, 'month': 2, 'amount': '10.00'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Budget.objects.count(), 1)
+
+    def test_concurrent_create_conflict(self):
+        # Otro guardado inserta la misma celda justo antes del bulk_create
+        inserted = []
+
+        def create_first(execute, sql, params, many, context):
+            if sql.startswith('INSERT INTO "budgets_budget"') and not inserted:
+                inserted.append(True)
+                Budget.objects.create(
+                    cost_center=self.cost_center, category=self.category, year=2026, month=5, amount=Decimal('1.00'),
+                )
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(create_first):
+            response = self.client.post('/api/budgets/budgets/grid/', {'year': 2026, 'cells': [
+                {'cost_center': self.cost_center.pk, 'category': self.category.pk, 'month': 5, 'amount': '10.00'},
+            ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(Budget.objects.filter(month=5).exists())
+
+    def test_unknown_cost_center_rejected(self):
+        response = self.client.post('/api/budgets/budgets/grid/', {'year': 2026, 'cells': [
+            {'cost_center': 9999, 'category': self.category.pk, 'month': 1, 'amount': '10.00'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class BudgetConcurrencyTests(BudgetBaseTestCase):
+    """Tests del control de concurrencia optimista en presupuestos."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.finance_user = self._create_user(
+            'fin@lock.com', User.FINANZAS,
+            area=self.area_fin, cost_center=self.cost_center_fin,
+        )
+        self.client.force_authenticate(user=self.finance_user)
+        self.budget = Budget.objects.create(
+            cost_center=self.cost_center, category=self.category, year=2026, month=4, amount=Decimal('100.00'),
+        )
+        self.url = f'/api/budgets/budgets/{self.budget.pk}/'
+
+    def test_save_increments_version(self):
+        self.budget.amount = Decimal('120.00')
+        self.budget.save()
+        self.budget.refresh_from_db()
+        self.assertEqual(self.budget.version, 2)
+
+    def test_stale_instance_rejected(self):
+        stale = Budget.objects.get(pk=self.budget.pk)
+        self.budget.amount = Decimal('120.00')
+        self.budget.save()
+        stale.amount = Decimal('90.00')
+        with self.assertRaises(ConcurrentUpdateError), transaction.atomic():
+            stale.save()
+        self.budget.refresh_from_db()
+        self.assertEqual(self.budget.amount, Decimal('120.00'))
+
+    def test_retrieve_returns_etag(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response['ETag'], f'"{self.budget.pk}-1"')
+        self.assertEqual(response.data['version'], 1)
+
+    def test_if_match_current_version(self):
+        response = self.client.patch(self.url, {'amount': '150.00'}, HTTP_IF_MATCH=f'"{self.budget.pk}-1"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['ETag'], f'"{self.budget.pk}-2"')
+        self.assertEqual(BudgetHistory.objects.get(budget=self.budget).previous_amount, Decimal('100.00'))
+
+    def test_if_match_stale_version(self):
+        Budget.objects.get(pk=self.budget.pk).save()
+        response = self.client.patch(self.url, {'amount': '150.00'}, HTTP_IF_MATCH=f'"{self.budget.pk}-1"')
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.budget.refresh_from_db()
+        self.assertEqual(self.budget.amount, Decimal('100.00'))
+        self.assertFalse(BudgetHistory.objects.filter(budget=self.budget).exists())
+
+    def test_if_match_weak_etag_rejected(self):
+        response = self.client.patch(self.url, {'amount': '150.00'}, HTTP_IF_MATCH=f'W/"{self.budget.pk}-1"')
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.budget.refresh_from_db()
+        self.assertEqual(self.budget.amount, Decimal('100.00'))
+
+    def test_bulk_writes_increment_version(self):
+        self.client.post('/api/budgets/budgets/grid/', {'year': 2026, 'cells': [
+            {'cost_center': self.cost_center.pk, 'category': self.category.pk, 'month': 4, 'amount': '200.00'},
+        ]}, format='json')
+        self.client.post('/api/budgets/budgets/close_month/', {'year': 2026, 'month': 4})
+        self.budget.refresh_from_db()
+        self.assertEqual(self.budget.version, 3)
+
+
+class CatalogConditionalTests(BudgetBaseTestCase):
+    """Tests de GET condicional en categorías e items."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self._create_user('emp@etag.com', User.EMPLEADO))
+        self.item = Item.objects.create(category=self.category, code='PAP-001', name='Hojas', unit='Paquete')
+
+    def test_etag_changes_on_delete(self):
+        etag = self.client.get('/api/budgets/categories/')['ETag']
+        self.category2.delete()
+        response = self.client.get('/api/budgets/categories/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_item_detail_not_modified(self):
+        url = f'/api/budgets/items/{self.item.pk}/'
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        self.category.name = 'Papelería y oficina'
+        self.category.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.data['category_name'], 'Papelería y oficina')
+
+
+class CatalogCacheTests(BudgetBaseTestCase):
+    """Tests del catálogo en memoria."""
+
+    def setUp(self):
+        self.item = Item.objects.create(category=self.category, code='PAP-001', name='Hojas', unit='Paquete')
+
+    def test_lookups_without_queries(self):
+        catalog.get_item(self.item.pk)
+        with self.assertNumQueries(0):
+            item = catalog.get_item(self.item.pk)
+            self.assertEqual(item.category.name, 'Papelería')
+            self.assertEqual(catalog.categories_by_code()[Category.LIMPIEZA], self.category2)
+        self.assertIsNone(catalog.get_item(self.item.pk + 1000))
+
+    def test_reloads_on_change(self):
+        self.assertEqual(catalog.get_item(self.item.pk).name, 'Hojas')
+        self.item.name = 'Hojas carta'
+        self.item.save()
+        self.assertEqual(catalog.get_item(self.item.pk).name, 'Hojas carta')
+        self.item.delete()
+        self.assertIsNone(catalog.get_item(self.item.pk))
+
+    def test_reloads_on_version_bump_from_other_worker(self):
+        catalog.get_item(self.item.pk)
+        Item.objects.filter(pk=self.item.pk).update(name='Hojas oficio')
+        self.assertEqual(catalog.get_item(self.item.pk).name, 'Hojas')
+        cache.incr(catalog.VERSION_KEY)
+        self.assertEqual(catalog.get_item(self.item.pk).name, 'Hojas oficio')
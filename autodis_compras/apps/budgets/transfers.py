@@ -0,0 +1,95 @@
+"""
+Transferencias de monto disponible entre presupuestos.
+Un lote de transferencias se aplica en una sola transacción: los
+presupuestos involucrados se bloquean con SELECT ... FOR UPDATE en orden de
+id (evita interbloqueos entre lotes concurrentes), se valida el disponible
+contra el gasto actual y se escriben los montos, las transferencias y dos
+registros de historial ligados por transferencia.
+"""
+
+import uuid
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Budget, BudgetHistory, BudgetTransfer
+
+
+class TransferError(Exception):
+    """Error de validación de una transferencia; el mensaje es para el usuario."""
+
+
+def transfer_budgets(transfers, user):
+    """
+    Aplica un lote de transferencias. `transfers` es una lista de
+    diccionarios con source, target (ids), amount y reason opcional.
+    Devuelve las BudgetTransfer creadas o lanza TransferError sin aplicar nada.
+    """
+    if not transfers:
+        raise TransferError('Debe indicar al menos una transferencia.')
+
+    batch = uuid.uuid4()
+    with transaction.atomic():
+        ids = {t['source'] for t in transfers} | {t['target'] for t in transfers}
+        budgets = {
+            budget.pk: budget
+            for budget in Budget.objects.select_for_update().filter(pk__in=ids).order_by('pk')
+        }
+        missing = ids - set(budgets)
+        if missing:
+            raise TransferError(f'Presupuestos no encontrados: {", ".join(str(pk) for pk in sorted(missing))}.')
+
+        available = {}
+        created = []
+        history = []
+        for index, data in enumerate(transfers, start=1):
+            source, target = budgets[data['source']], budgets[data['target']]
+            amount = Decimal(data['amount'])
+            if source.pk == target.pk:
+                raise TransferError(f'Transferencia {index}: el origen y el destino son el mismo presupuesto.')
+            if amount <= 0:
+                raise TransferError(f'Transferencia {index}: el monto debe ser mayor a cero.')
+            if source.is_closed or target.is_closed:
+                raise TransferError(f'Transferencia {index}: no se puede transferir desde o hacia un mes cerrado.')
+            if source.pk not in available:
+                available[source.pk] = source.get_available_amount()
+            if amount > available[source.pk]:
+                raise TransferError(
+                    f'Transferencia {index}: el disponible de {source.cost_center.code} / '
+                    f'{source.category.name} es ${available[source.pk]:,.2f}.'
+                )
+
+            available[source.pk] -= amount
+            if target.pk in available:
+                available[target.pk] += amount
+            source.amount -= amount
+            target.amount += amount
+
+            transfer = BudgetTransfer(
+                batch=batch, source=source, target=target, amount=amount,
+                reason=data.get('reason', ''), created_by=user,
+            )
+            created.append(transfer)
+            reason = data.get('reason') or 'Transferencia de presupuesto'
+            history.append((transfer, source, source.amount + amount, source.amount, reason))
+            history.append((transfer, target, target.amount - amount, target.amount, reason))
+
+        now = timezone.now()
+        for budget in budgets.values():
+            budget.updated_at = now
+            budget.version += 1
+        Budget.objects.bulk_update(budgets.values(), ['amount', 'updated_at', 'version'])
+        BudgetTransfer.objects.bulk_create(created)
+        BudgetHistory.objects.bulk_create([
+            BudgetHistory(
+                budget=budget, previous_amount=previous_amount, new_amount=new_amount,
+                changed_by=user, reason=reason, transfer=transfer,
+            )
+            for transfer, budget, previous_amount, new_amount, reason in history
+        ])
+
+    # bulk_update no envía post_save: se invalidan aquí los reportes en caché
+    from autodis_compras.apps.reports.cache import invalidate_reports
+    invalidate_reports()
+    return created
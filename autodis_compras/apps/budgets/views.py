@@ -3,7 +3,7 @@ ViewSets para el modulo de presupuestos.
 """
 
 from decimal import Decimal
-from django.db.models import Avg
+from django.db.models import F
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.exceptions import PermissionDenied
@@ -14,10 +14,19 @@ from rest_framework.filters import SearchFilter, OrderingFilter
 from drf_spectacular.utils import extend_schema, extend_schema_view
 
 from .models import Category, Item, Budget, BudgetHistory
+from . import catalog, forecasting
+from .burn_rate import compute_burn_rate, OK
+from .summary import LEVELS, budget_summary
+from .transfers import TransferError, transfer_budgets
+from .grid import GridError, apply_grid_changes, budget_grid
+from autodis_compras.apps.reports.cache import cached_report
 from .serializers import (
     CategorySerializer, ItemSerializer, BudgetSerializer, BudgetHistorySerializer,
+    BudgetTransferSerializer, BudgetTransferInputSerializer, BudgetGridSerializer,
 )
 from autodis_compras.apps.users.models import CostCenter
+from autodis_compras.concurrency import OptimisticLockMixin
+from autodis_compras.conditional import ConditionalCatalogMixin
 
 
 class IsFinanceOrDirector(permissions.BasePermission):
@@ -31,7 +40,7 @@ class IsFinanceOrDirector(permissions.BasePermission):
 @extend_schema_view(list=extend_schema(tags=['Categorías']), retrieve=extend_schema(tags=['Categorías']),
                      create=extend_schema(tags=['Categorías']), update=extend_schema(tags=['Categorías']),
                      partial_update=extend_schema(tags=['Categorías']), destroy=extend_schema(tags=['Categorías']))
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(ConditionalCatalogMixin, viewsets.ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [permissions.IsAuthenticated, IsFinanceOrDirector]
@@ -43,9 +52,10 @@ class CategoryViewSet(viewsets.ModelViewSet):
 @extend_schema_view(list=extend_schema(tags=['Items']), retrieve=extend_schema(tags=['Items']),
                      create=extend_schema(tags=['Items']), update=extend_schema(tags=['Items']),
                      partial_update=extend_schema(tags=['Items']), destroy=extend_schema(tags=['Items']))
-class ItemViewSet(viewsets.ModelViewSet):
+class ItemViewSet(ConditionalCatalogMixin, viewsets.ModelViewSet):
     queryset = Item.objects.select_related('category').all()
     serializer_class = ItemSerializer
+    conditional_models = [Item, Category]
     permission_classes = [permissions.IsAuthenticated, IsFinanceOrDirector]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ['category', 'is_active']
@@ -57,12 +67,14 @@ class ItemViewSet(viewsets.ModelViewSet):
     list=extend_schema(tags=['Presupuestos']), retrieve=extend_schema(tags=['Presupuestos']),
     create=extend_schema(tags=['Presupuestos']), update=extend_schema(tags=['Presupuestos']),
     partial_update=extend_schema(tags=['Presupuestos']), destroy=extend_schema(tags=['Presupuestos']),
-    summary=extend_schema(tags=['Presupuestos']), copy_month=extend_schema(tags=['Presupuestos']),
+    summary=extend_schema(tags=['Presupuestos']), burn_rate=extend_schema(tags=['Presupuestos']),
+    copy_month=extend_schema(tags=['Presupuestos']), transfer=extend_schema(tags=['Presupuestos']),
+    grid=extend_schema(tags=['Presupuestos']),
     project_from_previous_year=extend_schema(tags=['Presupuestos']),
     close_month=extend_schema(tags=['Presupuestos']), reopen_month=extend_schema(tags=['Presupuestos']),
     import_excel=extend_schema(tags=['Presupuestos']),
 )
-class BudgetViewSet(viewsets.ModelViewSet):
+class BudgetViewSet(OptimisticLockMixin, viewsets.ModelViewSet):
     queryset = Budget.objects.select_related('cost_center', 'category').all()
     serializer_class = BudgetSerializer
     permission_classes = [permissions.IsAuthenticated, IsFinanceOrDirector]
@@ -74,10 +86,12 @@ class BudgetViewSet(viewsets.ModelViewSet):
         serializer.save()
 
     def perform_update(self, serializer):
-        budget = self.get_object()
+        budget = serializer.instance
         if budget.is_closed:
             raise PermissionDenied('No se puede modificar un mes cerrado.')
         old_amount = budget.amount
+        # El UPDATE se condiciona a la versión leída: si otro usuario guardó antes
+        # se lanza ConcurrentUpdateError (409) y el historial no registra un monto viejo
         instance = serializer.save()
         new_amount = instance.amount
         if old_amount != new_amount:
@@ -91,9 +105,16 @@ class BudgetViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'])
     def summary(self, request):
-        """Resumen de presupuestos por anio/mes."""
+        """
+        Resumen de presupuestos por anio/mes.
+        Con level=cost_center|area|location devuelve presupuesto, gasto y
+        disponible agrupados por ese nivel (requiere year).
+        """
         year = request.query_params.get('year')
         month = request.query_params.get('month')
+        level = request.query_params.get('level')
+        if level:
+            return self._level_summary(level, year, month)
         qs = self.get_queryset()
         if year:
             qs = qs.filter(year=year)
@@ -102,6 +123,108 @@ class BudgetViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(qs, many=True)
         return Response(serializer.data)
 
+    def _level_summary(self, level, year, month):
+        if level not in LEVELS:
+            return Response(
+                {'error': f'level debe ser uno de: {", ".join(LEVELS)}.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            year = int(year)
+            month = int(month) if month else None
+            if month is not None and not 1 <= month <= 12:
+                raise ValueError
+        except (TypeError, ValueError):
+            return Response(
+                {'error': 'Se requiere year y, opcionalmente, month (1-12).'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        params = {'level': level, 'year': year, 'month': month}
+        result = cached_report('budget-summary', params, lambda: budget_summary(level, year, month))
+        return Response({'filters': params, **result})
+
+    @action(detail=False, methods=['get'])
+    def burn_rate(self, request):
+        """
+        Ritmo de gasto y cierre proyectado de cada presupuesto del mes
+        (default el actual). Con at_risk=true solo devuelve los que estan en
+        riesgo o excedidos.
+        """
+        year = request.query_params.get('year')
+        month = request.query_params.get('month')
+        at_risk = request.query_params.get('at_risk', '').lower() in ('1', 'true')
+
+        filters = {}
+        for param in ('cost_center', 'category'):
+            if request.query_params.get(param):
+                filters[f'{param}_id'] = request.query_params[param]
+        if bool(year) != bool(month):
+            return Response(
+                {'error': 'Se requieren year y month juntos.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            results = compute_burn_rate(year, month, **filters)
+        except ValueError:
+            return Response(
+                {'error': 'year, month, cost_center y category deben ser numeros enteros validos.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if at_risk:
+            results = [row for row in results if row['status'] != OK]
+        return Response(results)
+
+    @action(detail=False, methods=['get', 'post'])
+    def grid(self, request):
+        """
+        Matriz anual de presupuestos (centro de costos x categoria x mes).
+        GET ?year= devuelve la matriz; POST recibe year, reason y solo las
+        celdas modificadas y las guarda en una sola transaccion.
+        """
+        if request.method == 'GET':
+            try:
+                year = int(request.query_params.get('year'))
+            except (TypeError, ValueError):
+                return Response(
+                    {'error': 'Se requiere year.'},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            return Response(budget_grid(year))
+
+        serializer = BudgetGridSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        try:
+            result = apply_grid_changes(data['year'], data['cells'], request.user, data['reason'])
+        except GridError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'message': f'Guardados {result["created"] + result["updated"]} presupuestos para {data["year"]}.',
+            **result,
+        })
+
+    @action(detail=False, methods=['post'])
+    def transfer(self, request):
+        """
+        Transfiere monto disponible entre presupuestos de forma atomica.
+        Acepta una transferencia (source, target, amount, reason) o un lote
+        en transfers; si alguna falla no se aplica ninguna.
+        """
+        many = 'transfers' in request.data
+        serializer = BudgetTransferInputSerializer(
+            data=request.data['transfers'] if many else request.data, many=many,
+        )
+        serializer.is_valid(raise_exception=True)
+        transfers = serializer.validated_data if many else [serializer.validated_data]
+        try:
+            created = transfer_budgets(transfers, request.user)
+        except TransferError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            BudgetTransferSerializer(created, many=True).data,
+            status=status.HTTP_201_CREATED,
+        )
+
     @action(detail=False, methods=['post'])
     def copy_month(self, request):
         """Copia presupuestos de un mes origen a un mes destino."""
@@ -146,48 +269,66 @@ class BudgetViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['post'])
     def project_from_previous_year(self, request):
-        """Proyecta presupuestos para un anio basado en el promedio del anio anterior."""
+        """
+        Proyecta presupuestos para un anio a partir del anio origen.
+        method: average (promedio de presupuestos, default), seasonal_naive,
+        moving_average o growth_adjusted (sobre el gasto real de history_years
+        anios). Con preview=true devuelve la tabla proyectada sin crear nada.
+        """
         source_year = request.data.get('source_year')
         target_year = request.data.get('target_year')
         target_month = request.data.get('target_month')
+        method = request.data.get('method') or forecasting.AVERAGE
+        history_years = request.data.get('history_years') or forecasting.DEFAULT_HISTORY_YEARS
+        preview = str(request.data.get('preview', '')).lower() in ('1', 'true')
 
         if not all([source_year, target_year]):
             return Response(
                 {'error': 'Se requieren source_year y target_year.'},
                 status=status.HTTP_400_BAD_REQUEST,
             )
+        if method not in forecasting.METHODS:
+            return Response(
+                {'error': f'method debe ser uno de: {", ".join(forecasting.METHODS)}.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            source_year = int(source_year)
+            target_year = int(target_year)
+            history_years = int(history_years)
+            months = [int(target_month)] if target_month else list(range(1, 13))
+        except (TypeError, ValueError):
+            return Response(
+                {'error': 'source_year, target_year, target_month e history_years deben ser numeros enteros.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if not 1 <= history_years <= forecasting.MAX_HISTORY_YEARS or not all(1 <= m <= 12 for m in months):
+            return Response(
+                {'error': f'history_years debe estar entre 1 y {forecasting.MAX_HISTORY_YEARS} y target_month entre 1 y 12.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-        source_year = int(source_year)
-        target_year = int(target_year)
-
-        averages = Budget.objects.filter(year=source_year).values(
-            'cost_center', 'category'
-        ).annotate(avg_amount=Avg('amount'))
-
-        if not averages:
+        result = forecasting.forecast(source_year, method, history_years)
+        if not len(result):
+            source = 'presupuestos' if method == forecasting.AVERAGE else 'gasto aprobado'
             return Response(
-                {'error': f'No hay presupuestos en el anio {source_year}.'},
+                {'error': f'No hay {source} en el anio {source_year}.'},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        created_count = 0
-        months = [int(target_month)] if target_month else range(1, 13)
-
-        for avg in averages:
-            for month in months:
-                _, created = Budget.objects.get_or_create(
-                    cost_center_id=avg['cost_center'],
-                    category_id=avg['category'],
-                    year=target_year,
-                    month=month,
-                    defaults={'amount': avg['avg_amount'].quantize(Decimal('0.01'))},
-                )
-                if created:
-                    created_count += 1
+        if preview:
+            return Response({
+                'method': method,
+                'target_year': target_year,
+                'results': result.grid(months),
+            })
 
+        created_count, skipped_count = forecasting.create_budgets(result, target_year, months)
         return Response({
             'message': f'Proyectados {created_count} presupuestos para {target_year}.',
+            'method': method,
             'created': created_count,
+            'skipped': skipped_count,
         })
 
     @action(detail=False, methods=['post'])
@@ -204,7 +345,7 @@ class BudgetViewSet(viewsets.ModelViewSet):
 
         updated = Budget.objects.filter(
             year=year, month=month, is_closed=False
-        ).update(is_closed=True)
+        ).update(is_closed=True, version=F('version') + 1)
 
         return Response({
             'message': f'Cerrados {updated} presupuestos para {year}/{int(month):02d}.',
@@ -231,7 +372,7 @@ class BudgetViewSet(viewsets.ModelViewSet):
 
         updated = Budget.objects.filter(
             year=year, month=month, is_closed=True
-        ).update(is_closed=False)
+        ).update(is_closed=False, version=F('version') + 1)
 
         return Response({
             'message': f'Reabiertos {updated} presupuestos para {year}/{int(month):02d}.',
@@ -274,7 +415,7 @@ class BudgetViewSet(viewsets.ModelViewSet):
             )
 
         cost_centers = {cc.code: cc for cc in CostCenter.objects.all()}
-        categories = {cat.code: cat for cat in Category.objects.all()}
+        categories = catalog.categories_by_code()
 
         created_count = 0
         updated_count = 0
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.9 on 2026-10-19 09:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="emailnotification",
+            name="notification_type",
+            field=models.CharField(
+                choices=[
+                    ("SOLICITUD_CREADA", "Solicitud creada"),
+                    ("APROBADA_GERENTE", "Aprobada por gerente"),
+                    ("APROBADA_FINAL", "Aprobación final"),
+                    ("RECHAZADA", "Rechazada"),
+                    ("COMENTARIO", "Comentario agregado"),
+                    ("FUERA_OFICINA", "Fuera de oficina activado"),
+                    ("PRESUPUESTO_EXCEDIDO", "Exceso de presupuesto proyectado"),
+                ],
+                max_length=30,
+                verbose_name="Tipo",
+            ),
+        ),
+    ]
@@ -17,6 +17,7 @@ class EmailNotification(models.Model):
     RECHAZADA = 'RECHAZADA'
     COMENTARIO = 'COMENTARIO'
     FUERA_OFICINA = 'FUERA_OFICINA'
+    PRESUPUESTO_EXCEDIDO = 'PRESUPUESTO_EXCEDIDO'
 
     TYPE_CHOICES = [
         (SOLICITUD_CREADA, 'Solicitud creada'),
@@ -25,6 +26,7 @@ class EmailNotification(models.Model):
         (RECHAZADA, 'Rechazada'),
         (COMENTARIO, 'Comentario agregado'),
         (FUERA_OFICINA, 'Fuera de oficina activado'),
+        (PRESUPUESTO_EXCEDIDO, 'Exceso de presupuesto proyectado'),
     ]
 
     notification_type = models.CharField('Tipo', max_length=30, choices=TYPE_CHOICES)
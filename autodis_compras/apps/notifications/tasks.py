@@ -61,27 +61,24 @@ def notify_request_created(request_id):
     """Notifica al gerente del area que se creo una nueva solicitud."""
     from autodis_compras.apps.requests.models import PurchaseRequest
     from autodis_compras.apps.notifications.models import EmailNotification
+    from autodis_compras.apps.users.delegation import effective_approvers
     from autodis_compras.apps.users.models import User
 
     try:
         purchase_request = PurchaseRequest.objects.select_related(
-            'requester', 'requester__area', 'category', 'cost_center'
+            'requester', 'category', 'cost_center'
         ).get(id=request_id)
 
         requester = purchase_request.requester
-        area = requester.area
 
-        # Buscar gerente del area
-        manager = User.objects.filter(
-            area=area,
-            role=User.GERENTE,
+        # Gerente del area o su delegado vigente (ver users/delegation.py)
+        recipients = list(User.objects.filter(
+            pk__in=effective_approvers(purchase_request.area_id),
             is_active=True,
-        ).first()
+        ))
 
-        # Si gerente esta fuera de oficina o no existe, notificar a Finanzas/DG
-        if manager and not manager.is_out_of_office:
-            recipients = [manager]
-        else:
+        # Si el gerente esta fuera de oficina sin delegado o no existe, notificar a Finanzas/DG
+        if not recipients:
             recipients = list(User.objects.filter(
                 role__in=[User.FINANZAS, User.DIRECCION_GENERAL],
                 is_active=True,
@@ -127,7 +124,7 @@ def notify_manager_approved(request_id):
 
     try:
         purchase_request = PurchaseRequest.objects.select_related(
-            'requester', 'requester__area', 'category', 'manager_approved_by'
+            'requester', 'area', 'category', 'manager_approved_by'
         ).get(id=request_id)
 
         recipients = User.objects.filter(
@@ -148,7 +145,7 @@ def notify_manager_approved(request_id):
                 f'La siguiente solicitud ha sido aprobada por el gerente y requiere su aprobacion final.\n\n'
                 f'Numero: {purchase_request.request_number}\n'
                 f'Solicitante: {purchase_request.requester.get_full_name()}\n'
-                f'Area: {purchase_request.requester.area.get_name_display()}\n'
+                f'Area: {purchase_request.area.get_name_display()}\n'
                 f'Aprobado por: {purchase_request.manager_approved_by.get_full_name()}\n'
                 f'Categoria: {purchase_request.category.name}\n'
                 f'Descripcion: {purchase_request.description}\n'
@@ -178,7 +175,7 @@ def notify_final_approved(request_id):
 
     try:
         purchase_request = PurchaseRequest.objects.select_related(
-            'requester', 'requester__area', 'category', 'final_approved_by'
+            'requester', 'category', 'final_approved_by'
         ).get(id=request_id)
 
         # Notificar al solicitante
@@ -186,7 +183,7 @@ def notify_final_approved(request_id):
 
         # Notificar al gerente del area
         manager = User.objects.filter(
-            area=purchase_request.requester.area,
+            area_id=purchase_request.area_id,
             role=User.GERENTE,
             is_active=True,
         ).first()
@@ -225,13 +222,13 @@ def notify_rejected(request_id):
 
     try:
         purchase_request = PurchaseRequest.objects.select_related(
-            'requester', 'requester__area', 'rejected_by'
+            'requester', 'rejected_by'
         ).get(id=request_id)
 
         recipients = [purchase_request.requester]
 
         manager = User.objects.filter(
-            area=purchase_request.requester.area,
+            area_id=purchase_request.area_id,
             role=User.GERENTE,
             is_active=True,
         ).first()
@@ -270,7 +267,7 @@ def notify_comment_added(comment_id):
 
     try:
         comment = RequestComment.objects.select_related(
-            'request', 'request__requester', 'request__requester__area', 'user'
+            'request', 'request__requester', 'user'
         ).get(id=comment_id)
 
         purchase_request = comment.request
@@ -282,7 +279,7 @@ def notify_comment_added(comment_id):
 
         # Gerente del area
         manager = User.objects.filter(
-            area=purchase_request.requester.area,
+            area_id=purchase_request.area_id,
             role=User.GERENTE,
             is_active=True,
         ).first()
@@ -329,6 +326,13 @@ def notify_out_of_office(user_id):
 
     try:
         manager = User.objects.select_related('area').get(id=user_id)
+        delegation = manager.delegations_given.select_related('delegate').filter(
+            start_date__lte=timezone.localdate(), end_date__gte=timezone.localdate(),
+        ).first()
+        if delegation:
+            routing = f'a {delegation.delegate.get_full_name()}, su delegado,'
+        else:
+            routing = 'directamente a Finanzas y Direccion General'
 
         recipients = User.objects.filter(
             role__in=[User.FINANZAS, User.DIRECCION_GENERAL],
@@ -340,8 +344,7 @@ def notify_out_of_office(user_id):
             message = (
                 f'{manager.get_full_name()} ha activado el modo "Fuera de Oficina".\n\n'
                 f'Area: {manager.area.get_name_display()}\n\n'
-                f'Las solicitudes de su area seran enviadas directamente '
-                f'a Finanzas y Direccion General para aprobacion.\n'
+                f'Las solicitudes de su area seran enviadas {routing} para aprobacion.\n'
             )
 
             notification = EmailNotification.objects.create(
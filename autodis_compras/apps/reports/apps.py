@@ -5,3 +5,6 @@ class ReportsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'autodis_compras.apps.reports'
     verbose_name = 'Reportes'
+
+    def ready(self):
+        import autodis_compras.apps.reports.signals  # noqa: F401
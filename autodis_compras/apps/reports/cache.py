@@ -0,0 +1,29 @@
+"""
+Caché de resultados de reportes.
+Los reportes usan el espacio de nombres 'reports' de la caché compartida
+(autodis_compras.cache); se invalida completo cada vez que cambia una
+solicitud, una línea o un presupuesto. La llave incluye la base de la que
+se leyó el reporte (ver autodis_compras/routers.py).
+"""
+
+from django.conf import settings
+
+from autodis_compras import cache as api_cache
+from autodis_compras.routers import cacheable_reads, current_read_alias
+
+NAMESPACE = 'reports'
+
+
+def cached_report(name, params, builder, timeout=None):
+    """Devuelve el resultado en caché del reporte o lo calcula con builder()."""
+    if not cacheable_reads():
+        return builder()
+    return api_cache.get_or_compute(
+        NAMESPACE, (name, params, current_read_alias()), builder,
+        settings.REPORTS_CACHE_TIMEOUT if timeout is None else timeout,
+    )
+
+
+def invalidate_reports():
+    """Invalida todos los reportes en caché."""
+    api_cache.invalidate(NAMESPACE)
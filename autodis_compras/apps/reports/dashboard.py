@@ -0,0 +1,78 @@
+"""
+Resumen del dashboard con caché por alcance.
+Los contadores se calculan en una sola consulta de agregación condicional
+sobre MonthlySpend y se guardan en caché por alcance (global, área o
+usuario) y por la base de la que se leyeron (ver autodis_compras/routers.py).
+Los cambios de estado de una solicitud invalidan las entradas afectadas.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from autodis_compras.apps.requests.models import PurchaseRequest
+from autodis_compras.routers import cacheable_reads, current_read_alias
+from .models import MonthlySpend
+from .rollup import APPROVED_STATUSES, ZERO
+
+
+def dashboard_scope(user):
+    """Alcance del dashboard para el usuario: ('global',), ('area', id) o ('user', id)."""
+    if user.is_finance() or user.is_general_director():
+        return ('global',)
+    if user.is_manager():
+        return ('area', user.area_id)
+    return ('user', user.pk)
+
+
+def dashboard_cache_key(scope, alias=DEFAULT_DB_ALIAS):
+    return f'reports:dashboard:{alias}:' + ':'.join(str(part) for part in scope)
+
+
+def _compute_summary(scope):
+    qs = MonthlySpend.objects.all()
+    if scope[0] == 'area':
+        qs = qs.filter(requester__area_id=scope[1])
+    elif scope[0] == 'user':
+        qs = qs.filter(requester_id=scope[1])
+
+    now = timezone.localtime()
+    this_month = Q(year=now.year, month=now.month)
+
+    def count(condition):
+        return Coalesce(Sum('request_count', filter=condition), 0)
+
+    return qs.aggregate(
+        pending_manager_approval=count(Q(status=PurchaseRequest.PENDIENTE_GERENTE)),
+        pending_finance_approval=count(Q(status=PurchaseRequest.APROBADA_POR_GERENTE)),
+        in_process=count(Q(status=PurchaseRequest.EN_PROCESO)),
+        completed_this_month=count(Q(status=PurchaseRequest.COMPLETADA) & this_month),
+        monthly_spend=Coalesce(
+            Sum('estimated_total', filter=Q(status__in=APPROVED_STATUSES) & this_month), ZERO,
+        ),
+    )
+
+
+def get_dashboard_summary(user):
+    """Devuelve el resumen del dashboard para el usuario (una consulta por fallo de caché)."""
+    scope = dashboard_scope(user)
+    if not cacheable_reads():
+        return _compute_summary(scope)
+    key = dashboard_cache_key(scope, current_read_alias())
+    summary = cache.get(key)
+    if summary is None:
+        summary = _compute_summary(scope)
+        cache.set(key, summary, settings.DASHBOARD_CACHE_TIMEOUT)
+    return summary
+
+
+def invalidate_dashboard(requester_id, area_id):
+    """Invalida los resúmenes en caché afectados por una solicitud, leídos de cualquier base."""
+    cache.delete_many([
+        dashboard_cache_key(scope, alias)
+        for alias in {DEFAULT_DB_ALIAS, settings.REPORTS_DB_ALIAS}
+        for scope in (('global',), ('area', area_id), ('user', requester_id))
+    ])
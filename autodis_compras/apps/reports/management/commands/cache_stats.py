@@ -0,0 +1,18 @@
+"""
+Comando para mostrar los aciertos y fallos de la caché compartida por espacio de nombres.
+"""
+
+from django.core.management.base import BaseCommand
+
+from autodis_compras.cache import cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Muestra aciertos, fallos y tasa de aciertos de la caché por espacio de nombres'
+
+    def handle(self, *args, **options):
+        for namespace, stats in cache_stats().items():
+            rate = f'{stats["hit_rate"]:.1%}' if stats['hit_rate'] is not None else '-'
+            self.stdout.write(
+                f'{namespace}: {stats["hits"]} aciertos, {stats["misses"]} fallos, tasa {rate}'
+            )
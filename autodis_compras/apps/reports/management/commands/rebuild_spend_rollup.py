@@ -0,0 +1,25 @@
+"""
+Comando para reconstruir la tabla resumen de gasto mensual (MonthlySpend).
+"""
+
+from django.core.management.base import BaseCommand
+
+from autodis_compras.apps.reports.rollup import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye el resumen mensual de gasto desde las solicitudes de compra'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--year',
+            type=int,
+            help='Reconstruir solo el año indicado',
+        )
+
+    def handle(self, *args, **options):
+        year = options.get('year')
+        scope = f'el año {year}' if year else 'todos los años'
+        self.stdout.write(f'Reconstruyendo resumen mensual para {scope}...')
+        created = rebuild(year=year)
+        self.stdout.write(self.style.SUCCESS(f'Resumen reconstruido: {created} filas.'))
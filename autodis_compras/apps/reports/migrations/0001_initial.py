@@ -0,0 +1,173 @@
+# Generated by Django 4.2.9 on 2026-10-19 09:31
+
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce, ExtractMonth, ExtractYear
+
+
+def populate_monthly_spend(apps, schema_editor):
+    PurchaseRequest = apps.get_model("requests", "PurchaseRequest")
+    MonthlySpend = apps.get_model("reports", "MonthlySpend")
+    db_alias = schema_editor.connection.alias
+    rows = (
+        PurchaseRequest.objects.using(db_alias)
+        .annotate(
+            rollup_year=ExtractYear("created_at"),
+            rollup_month=ExtractMonth("created_at"),
+        )
+        .order_by()
+        .values(
+            "rollup_year",
+            "rollup_month",
+            "cost_center_id",
+            "category_id",
+            "requester_id",
+            "status",
+        )
+        .annotate(
+            request_count=Count("id"),
+            estimated_total=Coalesce(Sum("estimated_amount"), Decimal("0.00")),
+            actual_total=Coalesce(Sum("actual_amount"), Decimal("0.00")),
+        )
+    )
+    MonthlySpend.objects.using(db_alias).bulk_create(
+        [
+            MonthlySpend(
+                year=row.pop("rollup_year"), month=row.pop("rollup_month"), **row
+            )
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("users", "0001_initial"),
+        ("budgets", "0002_initial"),
+        ("requests", "0002_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MonthlySpend",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("year", models.IntegerField(verbose_name="Año")),
+                ("month", models.IntegerField(verbose_name="Mes")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("BORRADOR", "Borrador"),
+                            ("PENDIENTE_GERENTE", "Pendiente aprobación gerente"),
+                            ("APROBADA_POR_GERENTE", "Aprobada por gerente"),
+                            ("APROBADA", "Aprobada"),
+                            ("EN_PROCESO", "En proceso de compra"),
+                            ("COMPRADA", "Comprada"),
+                            ("COMPLETADA", "Completada"),
+                            ("RECHAZADA_GERENTE", "Rechazada por gerente"),
+                            (
+                                "RECHAZADA_FINANZAS",
+                                "Rechazada por Finanzas/Dir. General",
+                            ),
+                            ("CANCELADA", "Cancelada"),
+                        ],
+                        max_length=30,
+                        verbose_name="Estado",
+                    ),
+                ),
+                (
+                    "request_count",
+                    models.PositiveIntegerField(default=0, verbose_name="Solicitudes"),
+                ),
+                (
+                    "estimated_total",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=Decimal("0.00"),
+                        max_digits=14,
+                        verbose_name="Monto estimado",
+                    ),
+                ),
+                (
+                    "actual_total",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=Decimal("0.00"),
+                        max_digits=14,
+                        verbose_name="Monto real",
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Actualizado"),
+                ),
+                (
+                    "category",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="monthly_spend",
+                        to="budgets.category",
+                        verbose_name="Categoría",
+                    ),
+                ),
+                (
+                    "cost_center",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="monthly_spend",
+                        to="users.costcenter",
+                        verbose_name="Centro de Costos",
+                    ),
+                ),
+                (
+                    "requester",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="monthly_spend",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Solicitante",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Gasto Mensual",
+                "verbose_name_plural": "Gastos Mensuales",
+                "ordering": ["-year", "-month"],
+                "indexes": [
+                    models.Index(
+                        fields=["year", "month", "status"],
+                        name="reports_mon_year_180887_idx",
+                    ),
+                    models.Index(
+                        fields=["cost_center", "category", "year", "month"],
+                        name="reports_mon_cost_ce_16f908_idx",
+                    ),
+                    models.Index(
+                        fields=["requester", "status"],
+                        name="reports_mon_request_c5a1db_idx",
+                    ),
+                ],
+                "unique_together": {
+                    ("year", "month", "cost_center", "category", "requester", "status")
+                },
+            },
+        ),
+        migrations.RunPython(populate_monthly_spend, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,45 @@
 """
 Modelos para reportes y análisis.
-No se requieren modelos adicionales, los reportes se generan dinámicamente
-desde los datos de Purchase Requests y Budgets.
+Los reportes leen de una tabla resumen mensual (MonthlySpend) que se
+mantiene al día con cada cambio en las solicitudes de compra.
 """
 
-# Los reportes se implementarán como vistas y servicios que consultan
-# los modelos existentes (PurchaseRequest, Budget, etc.)
+from decimal import Decimal
+from django.db import models
+from autodis_compras.apps.users.models import User, CostCenter
+from autodis_compras.apps.budgets.models import Category
+from autodis_compras.apps.requests.models import PurchaseRequest
+
+
+class MonthlySpend(models.Model):
+    """
+    Resumen mensual de solicitudes de compra.
+    Una fila por año, mes, centro de costos, categoría, solicitante y estado
+    con el número de solicitudes y los montos estimado y real acumulados.
+    Se refresca por celda en cada cambio de una solicitud y se reconstruye
+    completo con el comando rebuild_spend_rollup.
+    """
+    year = models.IntegerField('Año')
+    month = models.IntegerField('Mes')
+    cost_center = models.ForeignKey(CostCenter, on_delete=models.CASCADE, related_name='monthly_spend', verbose_name='Centro de Costos')
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='monthly_spend', verbose_name='Categoría')
+    requester = models.ForeignKey(User, on_delete=models.CASCADE, related_name='monthly_spend', verbose_name='Solicitante')
+    status = models.CharField('Estado', max_length=30, choices=PurchaseRequest.STATUS_CHOICES)
+    request_count = models.PositiveIntegerField('Solicitudes', default=0)
+    estimated_total = models.DecimalField('Monto estimado', max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    actual_total = models.DecimalField('Monto real', max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    updated_at = models.DateTimeField('Actualizado', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Gasto Mensual'
+        verbose_name_plural = 'Gastos Mensuales'
+        ordering = ['-year', '-month']
+        unique_together = [['year', 'month', 'cost_center', 'category', 'requester', 'status']]
+        indexes = [
+            models.Index(fields=['year', 'month', 'status']),
+            models.Index(fields=['cost_center', 'category', 'year', 'month']),
+            models.Index(fields=['requester', 'status']),
+        ]
+
+    def __str__(self):
+        return f"{self.year}/{self.month:02d} {self.cost_center_id}-{self.category_id} {self.status}: {self.request_count}"
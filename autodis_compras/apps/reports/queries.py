@@ -0,0 +1,286 @@
+"""
+Consultas de gasto por periodo para los reportes.
+Cuando el periodo abarca meses completos se consulta el resumen mensual
+(MonthlySpend); si corta meses se consulta PurchaseRequest con el rango de
+fechas. En ambos casos los campos de agrupación (cost_center, category,
+requester, status y sus relaciones) y las medidas se llaman igual.
+"""
+
+import datetime
+
+from django.db.models import Count, DecimalField, F, IntegerField, Sum, ExpressionWrapper
+from django.db.models.functions import Coalesce, NullIf, Trunc
+from django.utils import timezone
+
+from autodis_compras.apps.requests.models import PurchaseRequest, RequestLine
+from autodis_compras.apps.budgets.models import Budget
+from autodis_compras.periods import Period, bucket_label, bucket_start
+from .models import MonthlySpend
+from .rollup import APPROVED_STATUSES, ZERO
+
+BUCKETS = [Period.MONTH, Period.QUARTER, Period.YEAR]
+
+
+class SpendQuery:
+    """Consulta de gasto para un periodo sobre el resumen o las solicitudes."""
+
+    def __init__(self, period, statuses=APPROVED_STATUSES, bucket=None, raw=False):
+        self.period = period
+        # El resumen es mensual: no sirve para periodos que cortan meses ni para semanas
+        self.use_rollup = not raw and period.is_month_aligned and bucket != Period.WEEK
+        if self.use_rollup:
+            self.queryset = MonthlySpend.objects.filter(period.month_q(), status__in=statuses)
+            self.measures = {
+                'total': Sum('estimated_total'),
+                'count': Sum('request_count'),
+                'total_actual': Sum('actual_total'),
+            }
+        else:
+            self.queryset = PurchaseRequest.objects.filter(status__in=statuses, **period.range_filter())
+            self.measures = {
+                'total': Sum('estimated_amount'),
+                'count': Count('id'),
+                'total_actual': Sum('actual_amount'),
+            }
+
+    def filter(self, *args, **kwargs):
+        self.queryset = self.queryset.filter(*args, **kwargs)
+        return self
+
+    def for_scope(self, scope):
+        """
+        Limita la consulta al alcance del usuario (ver dashboard_scope). El
+        resumen no guarda el área de la solicitud, así que ahí se filtra por
+        el área del solicitante, igual que el dashboard.
+        """
+        if scope[0] == 'area':
+            return self.filter(**{'requester__area_id' if self.use_rollup else 'area_id': scope[1]})
+        if scope[0] == 'user':
+            return self.filter(requester_id=scope[1])
+        return self
+
+    def grouped(self, *fields):
+        """Total y número de solicitudes agrupados por los campos indicados."""
+        return list(self.queryset.values(*fields).annotate(
+            total=self.measures['total'], count=self.measures['count'],
+        ).order_by('-total'))
+
+    def totals(self):
+        return self.queryset.aggregate(
+            total_estimated=self.measures['total'],
+            total_actual=self.measures['total_actual'],
+            total_count=Coalesce(self.measures['count'], 0),
+        )
+
+    def _bucket_fields(self, bucket):
+        """Anota el queryset con las columnas del bucket y devuelve sus nombres."""
+        if not self.use_rollup:
+            qs = self.queryset.annotate(bucket=Trunc('created_at', bucket))
+            return qs, ['bucket']
+        if bucket == Period.YEAR:
+            return self.queryset, ['year']
+        if bucket == Period.QUARTER:
+            qs = self.queryset.annotate(
+                bucket_quarter=ExpressionWrapper((F('month') + 2) / 3, output_field=IntegerField()),
+            )
+            return qs, ['year', 'bucket_quarter']
+        return self.queryset, ['year', 'month']
+
+    def _row_start(self, row, bucket):
+        if 'bucket' in row:
+            return bucket_start(timezone.localtime(row.pop('bucket')).date(), bucket)
+        year = row.pop('year')
+        month = row.pop('month', 1)
+        quarter = row.pop('bucket_quarter', None)
+        if quarter:
+            month = quarter * 3 - 2
+        return bucket_start(Period.for_month(year, month).start_date, bucket)
+
+    def by_bucket(self, bucket, *fields):
+        """Total y número de solicitudes por bucket de tiempo en una sola consulta."""
+        qs, bucket_fields = self._bucket_fields(bucket)
+        rows = qs.values(*bucket_fields, *fields).annotate(
+            total=self.measures['total'], count=self.measures['count'],
+        ).order_by(*bucket_fields, *fields)
+
+        result = []
+        for row in rows:
+            start = self._row_start(row, bucket)
+            result.append({'period': bucket_label(start, bucket), 'start': start, **row})
+        return result
+
+
+TREND_BUCKETS = [Period.WEEK, Period.MONTH, Period.QUARTER]
+
+TREND_DIMENSIONS = {
+    'category': ('category_id', 'category__name'),
+    'cost_center': ('cost_center_id', 'cost_center__code'),
+    'area': ('cost_center__area_id', 'cost_center__area__name'),
+    'location': ('cost_center__location_id', 'cost_center__location__name'),
+}
+
+
+def build_trend(period, bucket, dimension=None):
+    """
+    Serie de tiempo de gasto, número de solicitudes y presupuesto por bucket,
+    opcionalmente desglosada por una dimensión. El gasto sale de una sola
+    consulta agrupada y el presupuesto de otra; el presupuesto es mensual, por
+    lo que en buckets semanales se devuelve como None.
+    """
+    fields = TREND_DIMENSIONS[dimension] if dimension else ()
+    id_field = fields[0] if fields else None
+
+    series = {}
+
+    def entry(start, row):
+        key = (start, row.get(id_field) if id_field else None)
+        if key not in series:
+            series[key] = {
+                'period': bucket_label(start, bucket),
+                'start': start,
+                **({'dimension': row[fields[0]], 'dimension_name': row[fields[1]]} if fields else {}),
+                'spend': ZERO,
+                'count': 0,
+                'budget': None if bucket == Period.WEEK else ZERO,
+            }
+        return series[key]
+
+    for row in SpendQuery(period, bucket=bucket).by_bucket(bucket, *fields):
+        item = entry(row['start'], row)
+        item['spend'] = row['total'] or ZERO
+        item['count'] = row['count'] or 0
+
+    if bucket != Period.WEEK:
+        budgets = Budget.objects.filter(period.month_q()).values('year', 'month', *fields).annotate(
+            amount=Sum('amount'),
+        ).order_by()
+        for row in budgets:
+            start = bucket_start(datetime.date(row['year'], row['month'], 1), bucket)
+            entry(start, row)['budget'] += row['amount']
+
+    return sorted(series.values(), key=lambda item: (item['start'], str(item.get('dimension_name') or '')))
+
+
+PIVOT_DIMENSIONS = {
+    'area': ('cost_center__area_id', 'cost_center__area__name'),
+    'location': ('cost_center__location_id', 'cost_center__location__name'),
+    'cost_center': ('cost_center_id', 'cost_center__code'),
+    'category': ('category_id', 'category__name'),
+    'item': ('lines__item_id', 'lines__item__name'),
+    'requester': ('requester_id', 'requester__email'),
+    'supplier': ('actual_supplier',),
+    'status': ('status',),
+    'month': (),
+}
+
+# Dimensiones que no existen en el resumen mensual
+RAW_PIVOT_DIMENSIONS = {'item', 'supplier'}
+
+PIVOT_MEASURES = ['count', 'sum_estimated', 'sum_actual', 'variance', 'quantity']
+
+# Medidas que solo tienen sentido agrupando por item
+ITEM_PIVOT_MEASURES = {'quantity'}
+
+
+def _line_measures():
+    """
+    Medidas por línea para agrupar por item: cada solicitud aparece una vez
+    por item, así que sus montos no se repiten en cada item. El monto real
+    (que es de la solicitud) se reparte según el peso de la línea en el
+    monto estimado.
+    """
+    line_actual = ExpressionWrapper(
+        F('lines__total') * F('actual_amount') / NullIf(F('estimated_amount'), ZERO),
+        output_field=DecimalField(max_digits=14, decimal_places=2),
+    )
+    return {
+        'total': Sum('lines__total'),
+        'count': Count('id'),
+        'total_actual': Sum(line_actual),
+        'quantity': Sum('lines__quantity'),
+    }
+
+
+def build_pivot(period, dimensions, measures, statuses=APPROVED_STATUSES, scope=None):
+    """
+    Tabla dinámica de solicitudes agrupada por las dimensiones indicadas con
+    las medidas pedidas, en una sola consulta values().annotate(). `scope` es
+    el alcance por rol de dashboard_scope().
+    """
+    raw = bool(RAW_PIVOT_DIMENSIONS & set(dimensions))
+    query = SpendQuery(period, statuses=statuses, raw=raw)
+    if 'item' in dimensions:
+        query.measures = _line_measures()
+    if scope:
+        query.for_scope(scope)
+
+    qs = query.queryset
+    fields = []
+    if 'month' in dimensions:
+        qs, month_fields = query._bucket_fields(Period.MONTH)
+        fields.extend(month_fields)
+    for dimension in dimensions:
+        fields.extend(PIVOT_DIMENSIONS[dimension])
+
+    total_actual = Coalesce(query.measures['total_actual'], ZERO)
+    total_estimated = Coalesce(query.measures['total'], ZERO)
+    available = {
+        'count': Coalesce(query.measures['count'], 0),
+        'sum_estimated': total_estimated,
+        'sum_actual': total_actual,
+        'variance': total_actual - total_estimated,
+    }
+    if 'quantity' in query.measures:
+        available['quantity'] = Coalesce(query.measures['quantity'], ZERO)
+    annotations = {measure: available[measure] for measure in measures}
+
+    rows = qs.values(*fields).annotate(**annotations).order_by(*fields)
+
+    result = []
+    for row in rows:
+        item = {}
+        if 'month' in dimensions:
+            item['month'] = bucket_label(query._row_start(row, Period.MONTH), Period.MONTH)
+        for dimension in dimensions:
+            dimension_fields = PIVOT_DIMENSIONS[dimension]
+            if not dimension_fields:
+                continue
+            item[dimension] = row[dimension_fields[0]]
+            if len(dimension_fields) > 1:
+                item[f'{dimension}_name'] = row[dimension_fields[1]]
+        for measure in measures:
+            item[measure] = row[measure]
+        result.append(item)
+    return result
+
+
+ITEM_SPEND_FIELDS = ['item_id', 'item__code', 'item__name', 'item__category_id', 'item__category__name']
+
+
+def build_item_spend(period, bucket=None, statuses=APPROVED_STATUSES, **filters):
+    """
+    Gasto por item desde las líneas de solicitud: cantidad, monto y número de
+    solicitudes, opcionalmente por bucket de tiempo. Cada línea pertenece a
+    una sola solicitud, así que los montos no se duplican al agrupar.
+    """
+    qs = RequestLine.objects.filter(
+        request__status__in=statuses, **period.range_filter('request__created_at'), **filters,
+    )
+    fields = list(ITEM_SPEND_FIELDS)
+    ordering = ['-total', 'item_id']
+    if bucket:
+        qs = qs.annotate(bucket=Trunc('request__created_at', bucket))
+        fields.insert(0, 'bucket')
+        ordering.insert(0, 'bucket')
+
+    rows = qs.values(*fields).annotate(
+        quantity=Sum('quantity'), total=Sum('total'), requests=Count('request_id'),
+    ).order_by(*ordering)
+
+    result = []
+    for row in rows:
+        if bucket:
+            start = bucket_start(timezone.localtime(row.pop('bucket')).date(), bucket)
+            row = {'period': bucket_label(start, bucket), 'start': start, **row}
+        result.append(row)
+    return result
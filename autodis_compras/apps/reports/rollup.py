@@ -0,0 +1,121 @@
+"""
+Mantenimiento de la tabla resumen MonthlySpend.
+Cada celda (año, mes, centro de costos, categoría, solicitante) se recalcula
+desde PurchaseRequest cuando cambia alguna de sus solicitudes, de modo que el
+resumen no acumula errores aunque se editen montos o estados.
+"""
+
+import hashlib
+from decimal import Decimal
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce, ExtractMonth, ExtractYear
+from django.utils import timezone
+
+from autodis_compras.apps.requests.models import PurchaseRequest
+from autodis_compras.periods import month_range, range_filter, year_range
+from .models import MonthlySpend
+
+ZERO = Decimal('0.00')
+
+APPROVED_STATUSES = [
+    PurchaseRequest.APROBADA,
+    PurchaseRequest.EN_PROCESO,
+    PurchaseRequest.COMPRADA,
+    PurchaseRequest.COMPLETADA,
+]
+
+
+def rollup_key(purchase_request):
+    """Llave de la celda del resumen a la que pertenece una solicitud."""
+    if purchase_request.created_at is None:
+        return None
+    created = timezone.localtime(purchase_request.created_at)
+    return (
+        created.year, created.month,
+        purchase_request.cost_center_id,
+        purchase_request.category_id,
+        purchase_request.requester_id,
+    )
+
+
+def _measures():
+    return {
+        'request_count': Count('id'),
+        'estimated_total': Coalesce(Sum('estimated_amount'), ZERO),
+        'actual_total': Coalesce(Sum('actual_amount'), ZERO),
+    }
+
+
+def _lock_cell(year, month, cost_center_id, category_id, requester_id):
+    """
+    Bloqueo de la celda hasta el fin de la transacción. En PostgreSQL es un
+    advisory lock sobre un hash estable de la llave, que existe aunque la
+    celda todavía no tenga filas; SQLite ya serializa las escrituras.
+    """
+    if connection.vendor != 'postgresql':
+        return
+    digest = hashlib.sha1(f'monthly-spend:{year}:{month}:{cost_center_id}:{category_id}:{requester_id}'.encode())
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_advisory_xact_lock(%s)', [int.from_bytes(digest.digest()[:8], 'big', signed=True)])
+
+
+def refresh_cell(year, month, cost_center_id, category_id, requester_id):
+    """
+    Recalcula las filas de una celda del resumen (todas sus estados).
+    La celda se bloquea antes de leer las solicitudes, así dos transacciones
+    que refrescan la misma celda se esperan y la segunda lee los datos de la
+    primera; las filas se escriben con upsert.
+    """
+    cell = {
+        'year': year, 'month': month,
+        'cost_center_id': cost_center_id,
+        'category_id': category_id,
+        'requester_id': requester_id,
+    }
+    with transaction.atomic():
+        _lock_cell(year, month, cost_center_id, category_id, requester_id)
+        rows = list(PurchaseRequest.objects.filter(
+            cost_center_id=cost_center_id,
+            category_id=category_id,
+            requester_id=requester_id,
+            **range_filter(*month_range(year, month)),
+        ).order_by().values('status').annotate(**_measures()))
+
+        MonthlySpend.objects.filter(**cell).exclude(status__in=[row['status'] for row in rows]).delete()
+        MonthlySpend.objects.bulk_create(
+            [MonthlySpend(**cell, **row) for row in rows],
+            update_conflicts=True,
+            unique_fields=['year', 'month', 'cost_center', 'category', 'requester', 'status'],
+            update_fields=['request_count', 'estimated_total', 'actual_total', 'updated_at'],
+        )
+
+
+def rebuild(year=None):
+    """Reconstruye el resumen completo (o de un año) en una sola agregación."""
+    qs = PurchaseRequest.objects.all()
+    if year:
+        qs = qs.filter(**range_filter(*year_range(year)))
+    qs = qs.annotate(
+        rollup_year=ExtractYear('created_at'),
+        rollup_month=ExtractMonth('created_at'),
+    )
+
+    rows = qs.order_by().values(
+        'rollup_year', 'rollup_month', 'cost_center_id', 'category_id', 'requester_id', 'status',
+    ).annotate(**_measures())
+
+    with transaction.atomic():
+        existing = MonthlySpend.objects.all()
+        if year:
+            existing = existing.filter(year=year)
+        existing.delete()
+        created = MonthlySpend.objects.bulk_create([
+            MonthlySpend(
+                year=row.pop('rollup_year'),
+                month=row.pop('rollup_month'),
+                **row,
+            )
+            for row in rows
+        ], batch_size=1000)
+    return len(created)
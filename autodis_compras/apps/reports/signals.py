@@ -0,0 +1,62 @@
+"""
+Signals para mantener al día la tabla resumen MonthlySpend.
+Cada alta, cambio o baja de una solicitud refresca la celda anterior y la
+nueva del resumen (al confirmar la transacción, para leer solo datos
+confirmados) e invalida el dashboard. Los reportes en caché se
+invalidan al cambiar una solicitud, una línea o un presupuesto.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+
+from autodis_compras.apps.requests.models import PurchaseRequest, RequestLine
+from autodis_compras.apps.budgets.models import Budget
+from .rollup import rollup_key, refresh_cell
+from .dashboard import invalidate_dashboard
+from autodis_compras.cache import invalidate_on
+from .cache import NAMESPACE
+
+ROLLUP_FIELDS = {'created_at', 'cost_center_id', 'category_id', 'requester_id'}
+
+
+def _invalidate_dashboard(instance):
+    # Al guardar y otra vez al confirmar (después del refresco del resumen),
+    # igual que cache.invalidate_on: un worker que recalcule entre ambos
+    # momentos guardaría datos sin confirmar.
+    requester_id, area_id = instance.requester_id, instance.area_id
+    invalidate_dashboard(requester_id, area_id)
+    transaction.on_commit(lambda: invalidate_dashboard(requester_id, area_id))
+
+
+@receiver(post_init, sender=PurchaseRequest)
+def remember_rollup_key(sender, instance, **kwargs):
+    """Guarda la celda original para refrescarla si la solicitud cambia de celda."""
+    if ROLLUP_FIELDS & instance.get_deferred_fields():
+        instance._rollup_key = None
+        return
+    instance._rollup_key = rollup_key(instance)
+
+
+@receiver(post_save, sender=PurchaseRequest)
+def on_request_saved(sender, instance, **kwargs):
+    """Refresca el resumen mensual cuando se guarda una solicitud."""
+    new_key = rollup_key(instance)
+    old_key = getattr(instance, '_rollup_key', None)
+    for key in {old_key, new_key} - {None}:
+        transaction.on_commit(lambda key=key: refresh_cell(*key))
+    instance._rollup_key = new_key
+    _invalidate_dashboard(instance)
+
+
+@receiver(post_delete, sender=PurchaseRequest)
+def on_request_deleted(sender, instance, **kwargs):
+    """Refresca el resumen mensual cuando se elimina una solicitud."""
+    key = rollup_key(instance)
+    if key:
+        transaction.on_commit(lambda: refresh_cell(*key))
+    _invalidate_dashboard(instance)
+
+
+for model in (PurchaseRequest, RequestLine, Budget):
+    invalidate_on(model, NAMESPACE)
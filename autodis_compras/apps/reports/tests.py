@@ -3,14 +3,30 @@ Tests para el módulo de reportes.
 """
 
 import datetime
+import io
 from decimal import Decimal
-from django.test import TestCase
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from unittest import skipUnless
+from django.db import connection, connections
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from rest_framework.test import APIClient
 from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
 
 from autodis_compras.apps.users.models import Area, Location, CostCenter, User
 from autodis_compras.apps.budgets.models import Category, Item, Budget
-from autodis_compras.apps.requests.models import PurchaseRequest
+from autodis_compras.apps.requests.models import PurchaseRequest, RequestLine
+from autodis_compras import cache as api_cache
+from autodis_compras import metrics
+from autodis_compras.routers import RECENT_WRITES_KEY, mark_primary_reads, read_from
+from autodis_compras.periods import Period, month_range, year_range, range_filter
+from .models import MonthlySpend
+from .dashboard import dashboard_cache_key
+from .rollup import rebuild, refresh_cell, rollup_key
 
 
 class ReportBaseTestCase(TestCase):
@@ -40,16 +56,30 @@ class ReportBaseTestCase(TestCase):
         )
 
     def _create_approved_request(self, requester, amount='5000.00'):
-        pr = PurchaseRequest.objects.create(
-            requester=requester, cost_center=requester.cost_center,
-            category=self.category, description='Compra de prueba',
-            estimated_amount=Decimal(amount),
-            required_date=datetime.date(2026, 3, 15),
-            justification='Test', status=PurchaseRequest.APROBADA,
-        )
-        pr.items.add(self.item)
+        # El resumen mensual se refresca al confirmar la transacción
+        with self.captureOnCommitCallbacks(execute=True):
+            pr = PurchaseRequest.objects.create(
+                requester=requester, cost_center=requester.cost_center,
+                category=self.category, description='Compra de prueba',
+                estimated_amount=Decimal(amount),
+                required_date=datetime.date(2026, 3, 15),
+                justification='Test', status=PurchaseRequest.APROBADA,
+            )
+            RequestLine.objects.create(request=pr, item=self.item, unit_price=Decimal(amount))
         return pr
 
+    def _create_dated_requests(self, requester):
+        """Solicitudes aprobadas el 20/01, 05/02 y 02/04 de 2026 por 100, 200 y 400."""
+        requests = [
+            (datetime.date(2026, 1, 20), self._create_approved_request(requester, amount='100.00')),
+            (datetime.date(2026, 2, 5), self._create_approved_request(requester, amount='200.00')),
+            (datetime.date(2026, 4, 2), self._create_approved_request(requester, amount='400.00')),
+        ]
+        for day, pr in requests:
+            created = timezone.make_aware(datetime.datetime.combine(day, datetime.time(12)))
+            PurchaseRequest.objects.filter(pk=pr.pk).update(created_at=created)
+        call_command('rebuild_spend_rollup', stdout=io.StringIO())
+
 
 class ExpensesByPeriodTests(ReportBaseTestCase):
 
@@ -167,6 +197,7 @@ class TopSuppliersTests(ReportBaseTestCase):
 class DashboardTests(ReportBaseTestCase):
 
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
         self.employee = self._create_user('emp@dash.com', User.EMPLEADO)
         self.finance = self._create_user(
@@ -187,6 +218,629 @@ class DashboardTests(ReportBaseTestCase):
         response = self.client.get('/api/reports/dashboard/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    async def test_dashboard_under_asgi(self):
+        token = AccessToken.for_user(self.finance)
+        response = await self.async_client.get(
+            '/api/reports/dashboard/', headers={'Authorization': f'Bearer {token}'},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Decimal(response.json()['monthly_spend']), Decimal('5000.00'))
+        self.assertEqual(response.json()['inbox']['total'], 1)
+        response = await self.async_client.get('/api/reports/dashboard/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
     def test_unauthenticated_denied(self):
         response = self.client.get('/api/reports/dashboard/')
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_single_query_then_cached(self):
+        self.client.force_authenticate(user=self.finance)
+        # Resumen y conteos de la bandeja, más el ruteo de aprobaciones del día (2)
+        with self.assertNumQueries(4):
+            response = self.client.get('/api/reports/dashboard/')
+        self.assertEqual(response.data['monthly_spend'], Decimal('5000.00'))
+        with self.assertNumQueries(0):
+            self.client.get('/api/reports/dashboard/')
+
+    def test_transition_invalidates_cache(self):
+        self.client.force_authenticate(user=self.employee)
+        response = self.client.get('/api/reports/dashboard/')
+        self.assertEqual(response.data['in_process'], 0)
+        pr = PurchaseRequest.objects.get(requester=self.employee)
+        pr.status = PurchaseRequest.EN_PROCESO
+        with self.captureOnCommitCallbacks(execute=True):
+            pr.save()
+        response = self.client.get('/api/reports/dashboard/')
+        self.assertEqual(response.data['in_process'], 1)
+
+    def test_invalidated_again_on_commit(self):
+        self.client.force_authenticate(user=self.employee)
+        pr = PurchaseRequest.objects.get(requester=self.employee)
+        pr.status = PurchaseRequest.EN_PROCESO
+        with self.captureOnCommitCallbacks(execute=True):
+            pr.save()
+            # Otro worker recalcula antes de que la transacción se confirme
+            self.client.get('/api/reports/dashboard/')
+            self.assertIsNotNone(cache.get(dashboard_cache_key(('user', self.employee.pk))))
+        self.assertIsNone(cache.get(dashboard_cache_key(('user', self.employee.pk))))
+
+
+@override_settings(REPORTS_DB_ALIAS='replica')
+class ReportsReplicaTests(ReportBaseTestCase):
+    """Los reportes leen de la réplica (una segunda base SQLite vacía) salvo justo después de un cambio propio."""
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.employee = self._create_user('emp@replica.com', User.EMPLEADO)
+        self.finance = self._create_user(
+            'fin@replica.com', User.FINANZAS, area=self.area_fin, cost_center=self.cost_center_fin,
+        )
+        self._create_approved_request(self.employee)
+
+    def test_reports_read_from_replica(self):
+        self.client.force_authenticate(user=self.finance)
+        with CaptureQueriesContext(connections['replica']) as replica_queries:
+            response = self.client.get('/api/reports/dashboard/')
+        self.assertEqual(response.data['monthly_spend'], Decimal('0'))
+        self.assertTrue(replica_queries.captured_queries)
+        response = self.client.get('/api/reports/pivot/', {'rows': 'category'})
+        self.assertEqual(response.data['results'], [])
+
+    def test_own_change_reads_primary(self):
+        # El empleado acaba de crear su solicitud
+        self.client.force_authenticate(user=self.employee)
+        with CaptureQueriesContext(connections['replica']) as replica_queries:
+            response = self.client.get('/api/reports/dashboard/')
+        self.assertEqual(response.data['monthly_spend'], Decimal('5000.00'))
+        self.assertEqual(replica_queries.captured_queries, [])
+
+    def test_writes_and_other_reads_use_primary(self):
+        self.assertEqual(PurchaseRequest.objects.count(), 1)
+        with read_from('replica'):
+            self.assertEqual(PurchaseRequest.objects.count(), 0)
+        self.assertEqual(PurchaseRequest.objects.count(), 1)
+
+    def test_sticky_user_skips_replica_cache(self):
+        # Ya pasó la ventana de la escritura: el dashboard leído de la réplica se guarda en caché
+        cache.delete(RECENT_WRITES_KEY)
+        self.client.force_authenticate(user=self.finance)
+        self.assertEqual(self.client.get('/api/reports/dashboard/').data['monthly_spend'], Decimal('0'))
+        self.assertIsNotNone(cache.get(dashboard_cache_key(('global',), 'replica')))
+
+        other = self._create_user('fin2@replica.com', User.FINANZAS, area=self.area_fin)
+        mark_primary_reads(other.pk)
+        self.client.force_authenticate(user=other)
+        response = self.client.get('/api/reports/dashboard/')
+        self.assertEqual(response.data['monthly_spend'], Decimal('5000.00'))
+
+    def test_replica_reads_not_cached_after_write(self):
+        self.client.force_authenticate(user=self.finance)
+        self.client.get('/api/reports/dashboard/')
+        self.client.get('/api/reports/pivot/', {'rows': 'category'})
+        self.assertIsNone(cache.get(dashboard_cache_key(('global',), 'replica')))
+        self.assertEqual(api_cache.cache_stats(['reports'])['reports']['misses'], 0)
+
+
+class MonthlySpendRollupTests(ReportBaseTestCase):
+
+    def setUp(self):
+        self.employee = self._create_user('emp@rollup.com', User.EMPLEADO)
+
+    def _rollup(self, status_value):
+        return MonthlySpend.objects.get(requester=self.employee, status=status_value)
+
+    def test_create_adds_row(self):
+        self._create_approved_request(self.employee, amount='1500.00')
+        self._create_approved_request(self.employee, amount='500.00')
+        row = self._rollup(PurchaseRequest.APROBADA)
+        self.assertEqual(row.request_count, 2)
+        self.assertEqual(row.estimated_total, Decimal('2000.00'))
+
+    def test_transition_moves_between_status_rows(self):
+        pr = self._create_approved_request(self.employee, amount='1500.00')
+        pr.status = PurchaseRequest.COMPRADA
+        pr.actual_amount = Decimal('1400.00')
+        with self.captureOnCommitCallbacks(execute=True):
+            pr.save()
+        self.assertFalse(MonthlySpend.objects.filter(status=PurchaseRequest.APROBADA).exists())
+        row = self._rollup(PurchaseRequest.COMPRADA)
+        self.assertEqual(row.request_count, 1)
+        self.assertEqual(row.actual_total, Decimal('1400.00'))
+
+    def test_delete_removes_row(self):
+        pr = self._create_approved_request(self.employee)
+        with self.captureOnCommitCallbacks(execute=True):
+            pr.delete()
+        self.assertFalse(MonthlySpend.objects.exists())
+
+    def test_rebuild_command_matches_incremental(self):
+        self._create_approved_request(self.employee, amount='1500.00')
+        pr = self._create_approved_request(self.employee, amount='700.00')
+        pr.status = PurchaseRequest.CANCELADA
+        with self.captureOnCommitCallbacks(execute=True):
+            pr.save()
+        incremental = sorted(MonthlySpend.objects.values_list(
+            'year', 'month', 'status', 'request_count', 'estimated_total',
+        ))
+        MonthlySpend.objects.all().delete()
+        call_command('rebuild_spend_rollup', stdout=io.StringIO())
+        rebuilt = sorted(MonthlySpend.objects.values_list(
+            'year', 'month', 'status', 'request_count', 'estimated_total',
+        ))
+        self.assertEqual(incremental, rebuilt)
+
+    def test_refresh_updates_existing_cell(self):
+        # Otra transacción ya escribió la celda: el refresco actualiza en lugar de chocar
+        pr = self._create_approved_request(self.employee, amount='1500.00')
+        MonthlySpend.objects.filter(requester=self.employee).update(request_count=9)
+        refresh_cell(*rollup_key(pr))
+        self.assertEqual(self._rollup(PurchaseRequest.APROBADA).request_count, 1)
+
+    @skipUnless(connection.vendor == 'postgresql', 'advisory locks solo en PostgreSQL')
+    def test_refresh_locks_cell_before_reading(self):
+        # Una celda nueva no tiene filas que bloquear: el lock es por llave
+        pr = self._create_approved_request(self.employee)
+        with CaptureQueriesContext(connection) as queries:
+            refresh_cell(*rollup_key(pr))
+        sql = [query['sql'] for query in queries.captured_queries]
+        lock = next(i for i, statement in enumerate(sql) if 'pg_advisory_xact_lock' in statement)
+        read = next(i for i, statement in enumerate(sql) if 'requests_purchaserequest' in statement)
+        self.assertLess(lock, read)
+
+    def test_rebuild_year_uses_range(self):
+        self._create_approved_request(self.employee)
+        MonthlySpend.objects.all().delete()
+        year = timezone.localtime().year
+        self.assertEqual(rebuild(year=year), 1)
+        self.assertEqual(rebuild(year=year - 1), 0)
+        self.assertEqual(MonthlySpend.objects.count(), 1)
+
+    def test_report_reads_rollup(self):
+        self._create_approved_request(self.employee, amount='1500.00')
+        now = timezone.localtime()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.employee)
+        response = self.client.get('/api/reports/expenses-by-period/', {'year': now.year, 'month': now.month})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['totals']['total_count'], 1)
+        self.assertEqual(response.data['totals']['total_estimated'], Decimal('1500.00'))
+
+
+class PeriodRangeTests(ReportBaseTestCase):
+
+    def test_month_range_is_half_open_local(self):
+        start, end = month_range(2026, 12)
+        self.assertEqual(timezone.localtime(start), start)
+        self.assertEqual((start.year, start.month, start.day, start.hour), (2026, 12, 1, 0))
+        self.assertEqual((end.year, end.month, end.day), (2027, 1, 1))
+        self.assertTrue(timezone.is_aware(start))
+
+    def test_year_range(self):
+        start, end = year_range('2026')
+        self.assertEqual((start.year, start.month), (2026, 1))
+        self.assertEqual((end.year, end.month), (2027, 1))
+
+    def test_filter_has_no_extract(self):
+        qs = PurchaseRequest.objects.filter(
+            status__in=[PurchaseRequest.APROBADA],
+            **range_filter(*month_range(2026, 3)),
+        )
+        sql = str(qs.query).lower()
+        self.assertNotIn('extract', sql)
+        self.assertNotIn('django_datetime', sql)
+
+    def test_boundaries_use_local_time(self):
+        employee = self._create_user('emp@period.com', User.EMPLEADO)
+        pr = self._create_approved_request(employee)
+        # 23:30 del 31 de marzo en hora local ya es 1 de abril en UTC
+        local = timezone.make_aware(datetime.datetime(2026, 3, 31, 23, 30))
+        PurchaseRequest.objects.filter(pk=pr.pk).update(created_at=local)
+        march = PurchaseRequest.objects.filter(**range_filter(*month_range(2026, 3)))
+        april = PurchaseRequest.objects.filter(**range_filter(*month_range(2026, 4)))
+        self.assertEqual(list(march), [pr])
+        self.assertFalse(april.exists())
+
+
+@skipUnless(connection.vendor == 'postgresql', 'EXPLAIN de índices solo en PostgreSQL')
+class PeriodRangeExplainTests(ReportBaseTestCase):
+
+    def _plan(self, qs):
+        with connection.cursor() as cursor:
+            cursor.execute('SET enable_seqscan = off')
+            try:
+                return qs.explain()
+            finally:
+                cursor.execute('SET enable_seqscan = on')
+
+    def test_status_created_at_index(self):
+        qs = PurchaseRequest.objects.filter(
+            status=PurchaseRequest.APROBADA,
+            **range_filter(*month_range(2026, 3)),
+        )
+        plan = self._plan(qs)
+        self.assertIn('Index', plan)
+        self.assertIn('created_at', plan)
+
+    def test_budget_spent_index(self):
+        qs = PurchaseRequest.objects.filter(
+            cost_center=self.cost_center, category=self.category,
+            **range_filter(*month_range(2026, 3)),
+        )
+        plan = self._plan(qs)
+        self.assertIn('Index', plan)
+        self.assertIn('created_at', plan)
+
+
+class PeriodParamsTests(TestCase):
+
+    def test_quarter(self):
+        period = Period.from_params({'year': '2026', 'quarter': '2'})
+        self.assertEqual(period.start_date, datetime.date(2026, 4, 1))
+        self.assertEqual(period.end_date, datetime.date(2026, 7, 1))
+        self.assertEqual(period.label, '2026-T2')
+        self.assertEqual(period.months(), [(2026, 4), (2026, 5), (2026, 6)])
+
+    def test_rolling_months(self):
+        period = Period.from_params({'rolling': '12'}, today=datetime.date(2026, 3, 10))
+        self.assertEqual(period.start_date, datetime.date(2025, 4, 1))
+        self.assertEqual(period.end_date, datetime.date(2026, 4, 1))
+        self.assertTrue(period.is_month_aligned)
+
+    def test_date_range_end_inclusive(self):
+        period = Period.from_params({'start': '2026-01-15', 'end': '2026-02-10'})
+        self.assertEqual(period.end_date, datetime.date(2026, 2, 11))
+        self.assertFalse(period.is_month_aligned)
+
+    def test_invalid_params(self):
+        with self.assertRaises(ValueError):
+            Period.from_params({'year': '2026', 'month': '13'})
+        with self.assertRaises(ValueError):
+            Period.from_params({'start': '2026-02-10', 'end': '2026-01-15'})
+        self.assertIsNone(Period.from_params({}))
+
+
+class ReportPeriodTests(ReportBaseTestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.employee = self._create_user('emp@qtr.com', User.EMPLEADO)
+        self._create_dated_requests(self.employee)
+        self.client.force_authenticate(user=self.employee)
+
+    def test_quarter_with_monthly_buckets(self):
+        response = self.client.get('/api/reports/expenses-by-period/', {'year': 2026, 'quarter': 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['totals']['total_estimated'], Decimal('300.00'))
+        self.assertEqual(
+            [(row['period'], row['total']) for row in response.data['by_period']],
+            [('2026-01', Decimal('100.00')), ('2026-02', Decimal('200.00'))],
+        )
+
+    def test_year_by_quarter_bucket(self):
+        response = self.client.get('/api/reports/expenses-by-period/', {'year': 2026, 'bucket': 'quarter'})
+        self.assertEqual(
+            [(row['period'], row['total'], row['count']) for row in response.data['by_period']],
+            [('2026-T1', Decimal('300.00'), 2), ('2026-T2', Decimal('400.00'), 1)],
+        )
+
+    def test_partial_month_range_reads_requests(self):
+        response = self.client.get('/api/reports/expenses-by-period/', {
+            'start': '2026-01-25', 'end': '2026-04-30', 'bucket': 'quarter',
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['totals']['total_estimated'], Decimal('600.00'))
+        self.assertEqual(
+            [(row['period'], row['total']) for row in response.data['by_period']],
+            [('2026-T1', Decimal('200.00')), ('2026-T2', Decimal('400.00'))],
+        )
+
+    def test_invalid_bucket(self):
+        response = self.client.get('/api/reports/expenses-by-period/', {'year': 2026, 'bucket': 'decade'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_employee_report_accepts_range(self):
+        response = self.client.get('/api/reports/expenses-by-employee/', {'start': '2026-02-01', 'end': '2026-02-28'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['total'], Decimal('200.00'))
+
+
+class TrendTests(ReportBaseTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.employee = self._create_user('emp@trend.com', User.EMPLEADO)
+        self._create_dated_requests(self.employee)
+        self.client.force_authenticate(user=self.employee)
+        Budget.objects.create(
+            cost_center=self.cost_center, category=self.category,
+            year=2026, month=1, amount=Decimal('1000.00'),
+        )
+
+    def test_monthly_trend_with_budget(self):
+        response = self.client.get('/api/reports/trend/', {'year': 2026, 'quarter': 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = {row['period']: row for row in response.data['results']}
+        self.assertEqual(rows['2026-01']['spend'], Decimal('100.00'))
+        self.assertEqual(rows['2026-01']['budget'], Decimal('1000.00'))
+        self.assertEqual(rows['2026-02']['count'], 1)
+        self.assertEqual(rows['2026-02']['budget'], Decimal('0.00'))
+
+    def test_quarter_trend_by_category(self):
+        response = self.client.get('/api/reports/trend/', {
+            'year': 2026, 'bucket': 'quarter', 'dimension': 'category',
+        })
+        self.assertEqual(
+            [(row['period'], row['dimension_name'], row['spend']) for row in response.data['results']],
+            [('2026-T1', 'Papelería', Decimal('300.00')), ('2026-T2', 'Papelería', Decimal('400.00'))],
+        )
+
+    def test_weekly_trend_has_no_budget(self):
+        response = self.client.get('/api/reports/trend/', {'start': '2026-01-01', 'end': '2026-02-28', 'bucket': 'week'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNone(response.data['results'][0]['budget'])
+
+    def test_results_cached_and_invalidated(self):
+        params = {'year': 2026, 'quarter': 1}
+        self.client.get('/api/reports/trend/', params)
+        with self.assertNumQueries(0):
+            self.client.get('/api/reports/trend/', params)
+        Budget.objects.filter(month=1).get().delete()
+        response = self.client.get('/api/reports/trend/', params)
+        self.assertEqual(response.data['results'][0]['budget'], Decimal('0.00'))
+
+    def test_invalid_dimension(self):
+        response = self.client.get('/api/reports/trend/', {'year': 2026, 'dimension': 'supplier'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class PivotTests(ReportBaseTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.employee = self._create_user('emp@pivot.com', User.EMPLEADO)
+        self.finance = self._create_user('fin@pivot.com', User.FINANZAS, area=self.area_fin, cost_center=self.cost_center_fin)
+        self.fin_request = self._create_approved_request(self.finance, amount='50.00')
+        self._create_dated_requests(self.employee)
+        PurchaseRequest.objects.filter(pk=self.fin_request.pk).update(
+            created_at=timezone.make_aware(datetime.datetime(2026, 1, 10, 12)), actual_amount=Decimal('60.00'),
+        )
+        call_command('rebuild_spend_rollup', stdout=io.StringIO())
+
+    def test_area_by_month_from_rollup(self):
+        self.client.force_authenticate(user=self.finance)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/reports/pivot/', {
+                'year': 2026, 'quarter': 1, 'rows': 'area,month', 'measures': 'count,sum_actual,variance',
+            })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = [(row['area_name'], row['month'], row['count'], row['variance']) for row in response.data['results']]
+        self.assertIn((Area.FINANZAS, '2026-01', 1, Decimal('10.00')), rows)
+        self.assertIn((Area.OPERACIONES, '2026-02', 1, Decimal('-200.00')), rows)
+        self.assertEqual(len(rows), 3)
+
+    def test_item_dimension_uses_requests(self):
+        self.client.force_authenticate(user=self.finance)
+        response = self.client.get('/api/reports/pivot/', {'year': 2026, 'rows': 'item', 'measures': 'sum_estimated'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], [
+            {'item': self.item.pk, 'item_name': 'Hojas', 'sum_estimated': Decimal('750.00')},
+        ])
+
+    def test_item_dimension_splits_multi_item_request(self):
+        # Una solicitud de 50 con dos items: cada item suma solo su línea
+        toner = Item.objects.create(category=self.category, code='PAP-002', name='Toner', unit='Pieza')
+        self.fin_request.lines.update(unit_price=Decimal('20.00'), total=Decimal('20.00'))
+        RequestLine.objects.create(
+            request=self.fin_request, item=toner, quantity=Decimal('3.00'), unit_price=Decimal('10.00'),
+        )
+        self.client.force_authenticate(user=self.finance)
+        response = self.client.get('/api/reports/pivot/', {
+            'year': 2026, 'month': 1, 'rows': 'requester,item', 'measures': 'count,sum_estimated,sum_actual,quantity',
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = {
+            (row['requester'], row['item_name']): (row['count'], row['sum_estimated'], row['sum_actual'], row['quantity'])
+            for row in response.data['results']
+        }
+        self.assertEqual(rows[(self.finance.pk, 'Hojas')], (1, Decimal('20.00'), Decimal('24.00'), Decimal('1.00')))
+        self.assertEqual(rows[(self.finance.pk, 'Toner')], (1, Decimal('30.00'), Decimal('36.00'), Decimal('3.00')))
+        self.assertEqual(rows[(self.employee.pk, 'Hojas')][1], Decimal('100.00'))
+
+    def test_quantity_requires_item(self):
+        self.client.force_authenticate(user=self.finance)
+        response = self.client.get('/api/reports/pivot/', {'year': 2026, 'rows': 'area', 'measures': 'quantity'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_employee_sees_only_own_requests(self):
+        self.client.force_authenticate(user=self.employee)
+        response = self.client.get('/api/reports/pivot/', {'year': 2026, 'rows': 'requester'})
+        self.assertEqual([row['requester'] for row in response.data['results']], [self.employee.pk])
+
+    def test_manager_sees_own_area(self):
+        manager = self._create_user('mgr@pivot.com', User.GERENTE)
+        self.client.force_authenticate(user=manager)
+        # Periodo por defecto (12 meses, desde el resumen) y uno que corta meses (desde solicitudes)
+        for params in ({'rows': 'area'}, {'start': '2026-01-15', 'end': '2026-04-30', 'rows': 'area'}):
+            response = self.client.get('/api/reports/pivot/', params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(
+                [(row['area'], row['count']) for row in response.data['results']], [(self.area.pk, 3)],
+            )
+        response = self.client.get('/api/reports/pivot/', {'rows': 'item'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['sum_estimated'], Decimal('700.00'))
+
+    def test_results_cached_per_query(self):
+        self.client.force_authenticate(user=self.finance)
+        params = {'year': 2026, 'rows': 'category,status'}
+        self.client.get('/api/reports/pivot/', params)
+        with self.assertNumQueries(0):
+            self.client.get('/api/reports/pivot/', params)
+
+    def test_invalid_dimension_and_measure(self):
+        self.client.force_authenticate(user=self.finance)
+        response = self.client.get('/api/reports/pivot/', {'year': 2026, 'rows': 'color'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get('/api/reports/pivot/', {'year': 2026, 'rows': 'area', 'measures': 'avg'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get('/api/reports/pivot/', {'year': 2026})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ItemSpendTests(ReportBaseTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.employee = self._create_user('emp@items.com', User.EMPLEADO)
+        self.item_toner = Item.objects.create(category=self.category, code='PAP-002', name='Toner', unit='Pieza')
+        self._create_dated_requests(self.employee)
+        jan = PurchaseRequest.objects.get(estimated_amount=Decimal('100.00'))
+        jan.lines.update(quantity=Decimal('4.00'), unit_price=Decimal('10.00'), total=Decimal('40.00'))
+        RequestLine.objects.create(request=jan, item=self.item_toner, quantity=Decimal('2.00'), unit_price=Decimal('30.00'))
+        self.client.force_authenticate(user=self.employee)
+
+    def test_spend_by_item(self):
+        response = self.client.get('/api/reports/item-spend/', {'year': 2026, 'quarter': 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = {row['item__code']: row for row in response.data['results']}
+        self.assertEqual(rows['PAP-002']['total'], Decimal('60.00'))
+        self.assertEqual(rows['PAP-001']['quantity'], Decimal('5.00'))
+        self.assertEqual(rows['PAP-001']['requests'], 2)
+
+    def test_spend_by_item_and_month(self):
+        response = self.client.get('/api/reports/item-spend/', {'year': 2026, 'bucket': 'month'})
+        self.assertEqual(
+            [(row['period'], row['item__code']) for row in response.data['results']],
+            [('2026-01', 'PAP-002'), ('2026-01', 'PAP-001'), ('2026-02', 'PAP-001'), ('2026-04', 'PAP-001')],
+        )
+
+    def test_requires_period(self):
+        response = self.client.get('/api/reports/item-spend/')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class SharedCacheTests(ReportBaseTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.calls = 0
+
+    def _build(self):
+        self.calls += 1
+        return {'value': self.calls}
+
+    def test_hits_and_misses(self):
+        api_cache.get_or_compute('test', ('a',), self._build)
+        api_cache.get_or_compute('test', ('a',), self._build)
+        api_cache.get_or_compute('test', ('b',), self._build)
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(api_cache.cache_stats(['test'])['test'], {'hits': 1, 'misses': 2, 'hit_rate': 0.333})
+
+    def test_invalidate_namespace(self):
+        api_cache.get_or_compute('test', ('a',), self._build)
+        api_cache.invalidate('test')
+        self.assertEqual(api_cache.get_or_compute('test', ('a',), self._build), {'value': 2})
+
+    def test_model_signals_invalidate_namespaces(self):
+        api_cache.get_or_compute('users', ('a',), self._build)
+        api_cache.get_or_compute('catalog', ('a',), self._build)
+        self.area.save()
+        api_cache.get_or_compute('users', ('a',), self._build)
+        api_cache.get_or_compute('catalog', ('a',), self._build)
+        self.assertEqual(self.calls, 4)
+
+    def test_report_invalidated_by_budget(self):
+        employee = self._create_user('emp@shared.com', User.EMPLEADO)
+        self._create_approved_request(employee)
+        self.client.force_authenticate(user=employee)
+        self.client.get('/api/reports/item-spend/', {'year': 2026})
+        Budget.objects.create(
+            cost_center=self.cost_center, category=self.category, year=2026, month=1, amount=Decimal('10.00'),
+        )
+        self.client.get('/api/reports/item-spend/', {'year': 2026})
+        self.assertEqual(api_cache.cache_stats(['reports'])['reports']['misses'], 2)
+
+    def test_catalog_list_served_from_cache(self):
+        employee = self._create_user('emp@catalog.com', User.EMPLEADO)
+        self.client.force_authenticate(user=employee)
+        self.client.get('/api/budgets/items/')
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/budgets/items/')
+        self.assertEqual(response.data['results'][0]['code'], 'PAP-001')
+
+
+@override_settings(
+    MIDDLEWARE=settings.MIDDLEWARE[:2] + ['autodis_compras.metrics.RequestMetricsMiddleware'] + settings.MIDDLEWARE[2:],
+    METRICS_ENABLED=True, METRICS_TOKEN='secreto',
+)
+class MetricsTests(ReportBaseTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.employee = self._create_user('emp@metrics.com', User.EMPLEADO)
+        self._create_approved_request(self.employee)
+        self.client.force_authenticate(user=self.employee)
+
+    def test_server_timing_header(self):
+        response = self.client.get('/api/reports/item-spend/', {'year': 2026})
+        self.assertRegex(response['Server-Timing'], r'db;dur=[\d.]+;desc="\d+ queries"')
+        self.assertIn('cache;desc="0 hits, 1 misses"', response['Server-Timing'])
+        response = self.client.get('/api/reports/item-spend/', {'year': 2026})
+        self.assertIn('cache;desc="1 hits, 0 misses"', response['Server-Timing'])
+
+    def test_metrics_endpoint(self):
+        self.client.get('/api/reports/dashboard/')
+        self.client.get('/api/reports/dashboard/')
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secreto')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        body = response.content.decode()
+        self.assertIn('autodis_http_requests_total{view="reports:dashboard",method="GET"} 2', body)
+        self.assertIn('autodis_http_request_duration_seconds_bucket{view="reports:dashboard",method="GET",le="+Inf"} 2', body)
+        self.assertRegex(body, r'autodis_db_queries_total\{view="reports:dashboard",method="GET"\} [1-9]')
+
+    def test_metrics_lists_views_without_registry(self):
+        # Dos workers que registran vistas nuevas a la vez: ambas aparecen en el scrape
+        queries = metrics.QueryRecorder()
+        counts = {'hits': 0, 'misses': 0}
+        metrics.record_request('reports:trend', 'GET', 200, 0.01, queries, counts)
+        metrics.record_request('reports:pivot', 'GET', 200, 0.01, queries, counts)
+        body = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secreto').content.decode()
+        self.assertIn('autodis_http_requests_total{view="reports:trend",method="GET"} 1', body)
+        self.assertIn('autodis_http_requests_total{view="reports:pivot",method="GET"} 1', body)
+
+    async def test_server_timing_under_asgi(self):
+        token = AccessToken.for_user(self.employee)
+        response = await self.async_client.get(
+            '/api/reports/dashboard/', headers={'Authorization': f'Bearer {token}'},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertRegex(response['Server-Timing'], r'db;dur=[\d.]+;desc="[1-9]\d* queries"')
+
+    @override_settings(METRICS_SLOW_QUERY_COUNT=1)
+    def test_slow_request_logged(self):
+        with self.assertLogs('autodis_compras.metrics', level='WARNING') as logs:
+            self.client.get('/api/reports/dashboard/')
+        self.assertIn('Petición lenta: GET /api/reports/dashboard/', logs.output[0])
+
+    def test_metrics_token_required(self):
+        self.assertEqual(self.client.get('/metrics').status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secreto')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(METRICS_TOKEN='')
+    def test_metrics_without_token_only_in_debug(self):
+        self.assertEqual(self.client.get('/metrics').status_code, status.HTTP_403_FORBIDDEN)
+        with self.settings(DEBUG=True):
+            self.assertEqual(self.client.get('/metrics').status_code, status.HTTP_200_OK)
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_metrics_disabled(self):
+        self.assertEqual(self.client.get('/metrics').status_code, status.HTTP_404_NOT_FOUND)
@@ -8,6 +8,9 @@ from .views import (
     BudgetComparisonView,
     ExpensesByEmployeeView,
     TopSuppliersView,
+    ItemSpendView,
+    TrendView,
+    PivotView,
     DashboardSummaryView,
 )
 
@@ -18,5 +21,8 @@ urlpatterns = [
     path('budget-comparison/', BudgetComparisonView.as_view(), name='budget-comparison'),
     path('expenses-by-employee/', ExpensesByEmployeeView.as_view(), name='expenses-by-employee'),
     path('top-suppliers/', TopSuppliersView.as_view(), name='top-suppliers'),
+    path('item-spend/', ItemSpendView.as_view(), name='item-spend'),
+    path('trend/', TrendView.as_view(), name='trend'),
+    path('pivot/', PivotView.as_view(), name='pivot'),
     path('dashboard/', DashboardSummaryView.as_view(), name='dashboard'),
 ]
@@ -1,99 +1,113 @@
 """
 Views para el modulo de reportes.
 Genera reportes dinamicos desde los datos de solicitudes y presupuestos.
-Soporta exportacion a Excel (.xlsx) y PDF.
+Soporta exportacion a Excel (.xlsx) y PDF. Todas las vistas leen de la base
+de reportes (ver autodis_compras/routers.py).
 """
 
 import io
-from decimal import Decimal
 from django.db.models import Sum, Count
 from django.http import HttpResponse
-from django.utils import timezone
 from rest_framework import permissions, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from drf_spectacular.utils import extend_schema, inline_serializer
+from drf_spectacular.utils import extend_schema, inline_serializer, OpenApiParameter
 from rest_framework import serializers as ser
 
+from autodis_compras.apps.requests.inbox import inbox_counts
 from autodis_compras.apps.requests.models import PurchaseRequest
 from autodis_compras.apps.budgets.models import Budget
+from autodis_compras.periods import Period
+from autodis_compras.routers import ReportsDatabaseMixin
+from .queries import (
+    BUCKETS, TREND_BUCKETS, TREND_DIMENSIONS, PIVOT_DIMENSIONS, PIVOT_MEASURES,
+    ITEM_PIVOT_MEASURES, SpendQuery, build_trend, build_pivot, build_item_spend,
+)
+from .dashboard import dashboard_scope, get_dashboard_summary
+from .rollup import APPROVED_STATUSES
+from .cache import cached_report
+
+PERIOD_REQUIRED_ERROR = (
+    'Debe indicar un periodo: year (con month o quarter opcionales), '
+    'start y end (AAAA-MM-DD) o rolling (meses).'
+)
+
+PERIOD_PARAMETERS = [
+    OpenApiParameter('year', int, description='Año del periodo'),
+    OpenApiParameter('month', int, description='Mes (1-12), requiere year'),
+    OpenApiParameter('quarter', int, description='Trimestre (1-4), requiere year'),
+    OpenApiParameter('start', str, description='Fecha inicial AAAA-MM-DD (inclusive)'),
+    OpenApiParameter('end', str, description='Fecha final AAAA-MM-DD (inclusive)'),
+    OpenApiParameter('rolling', int, description='Ultimos N meses incluyendo el actual'),
+]
 
 
-APPROVED_STATUSES = [
-    PurchaseRequest.APROBADA,
-    PurchaseRequest.EN_PROCESO,
-    PurchaseRequest.COMPRADA,
-    PurchaseRequest.COMPLETADA,
-]
+def _period_from_request(request, required=True):
+    """Devuelve (periodo, None) o (None, respuesta de error 400)."""
+    try:
+        period = Period.from_params(request.query_params)
+    except ValueError as e:
+        return None, Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    if period is None and required:
+        return None, Response({'error': PERIOD_REQUIRED_ERROR}, status=status.HTTP_400_BAD_REQUEST)
+    return period, None
 
 
-def _build_expenses_queryset(year, month=None, area_id=None, cost_center_id=None, category_id=None):
-    """Construye queryset filtrado de solicitudes aprobadas."""
-    qs = PurchaseRequest.objects.filter(
-        status__in=APPROVED_STATUSES,
-        created_at__year=year,
-    )
-    if month:
-        qs = qs.filter(created_at__month=month)
-    if area_id:
-        qs = qs.filter(cost_center__area_id=area_id)
-    if cost_center_id:
-        qs = qs.filter(cost_center_id=cost_center_id)
-    if category_id:
-        qs = qs.filter(category_id=category_id)
-    return qs
-
-
-class ExpensesByPeriodView(APIView):
-    """Reporte de gastos por periodo (mes/trimestre/anio)."""
+class ExpensesByPeriodView(ReportsDatabaseMixin, APIView):
+    """Reporte de gastos por periodo (mes/trimestre/anio/rango/ultimos N meses)."""
     permission_classes = [permissions.IsAuthenticated]
 
-    @extend_schema(tags=['Reportes'], responses=inline_serializer('ExpensesByPeriodResponse', fields={
+    @extend_schema(tags=['Reportes'], parameters=PERIOD_PARAMETERS + [
+        OpenApiParameter('bucket', str, enum=BUCKETS, description='Agrupacion temporal de by_period (default month)'),
+    ], responses=inline_serializer('ExpensesByPeriodResponse', fields={
         'filters': ser.DictField(), 'totals': ser.DictField(),
         'by_category': ser.ListField(), 'by_cost_center': ser.ListField(),
+        'by_period': ser.ListField(),
     }))
     def get(self, request):
-        year = request.query_params.get('year')
-        month = request.query_params.get('month')
         area_id = request.query_params.get('area')
         cost_center_id = request.query_params.get('cost_center')
         category_id = request.query_params.get('category')
+        bucket = request.query_params.get('bucket', Period.MONTH)
         export = request.query_params.get('export')
 
-        if not year:
-            return Response({'error': 'El parametro year es obligatorio.'}, status=status.HTTP_400_BAD_REQUEST)
-
-        qs = _build_expenses_queryset(year, month, area_id, cost_center_id, category_id)
-
-        by_category = list(qs.values('category__name').annotate(
-            total=Sum('estimated_amount'), count=Count('id'),
-        ).order_by('-total'))
-
-        by_cost_center = list(qs.values(
-            'cost_center__code', 'cost_center__name'
-        ).annotate(
-            total=Sum('estimated_amount'), count=Count('id'),
-        ).order_by('-total'))
-
-        totals = qs.aggregate(
-            total_estimated=Sum('estimated_amount'),
-            total_actual=Sum('actual_amount'),
-            total_count=Count('id'),
-        )
+        period, error = _period_from_request(request)
+        if error:
+            return error
+        if bucket not in BUCKETS:
+            return Response({'error': f'bucket debe ser uno de: {", ".join(BUCKETS)}.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        query = SpendQuery(period)
+        if area_id:
+            query.filter(cost_center__area_id=area_id)
+        if cost_center_id:
+            query.filter(cost_center_id=cost_center_id)
+        if category_id:
+            query.filter(category_id=category_id)
+
+        by_category = query.grouped('category__name')
+        by_cost_center = query.grouped('cost_center__code', 'cost_center__name')
+        by_period = query.by_bucket(bucket)
+        totals = query.totals()
 
         if export == 'excel':
-            return self._export_excel(by_category, by_cost_center, totals, year, month)
+            return self._export_excel(by_category, by_cost_center, by_period, totals, period)
         if export == 'pdf':
-            return self._export_pdf(by_category, by_cost_center, totals, year, month)
+            return self._export_pdf(by_category, by_cost_center, totals, period)
 
         return Response({
-            'filters': {'year': year, 'month': month, 'area': area_id, 'cost_center': cost_center_id, 'category': category_id},
+            'filters': {
+                'year': request.query_params.get('year'), 'month': request.query_params.get('month'),
+                'period': period.as_dict(), 'bucket': bucket,
+                'area': area_id, 'cost_center': cost_center_id, 'category': category_id,
+            },
             'totals': totals,
             'by_category': by_category,
             'by_cost_center': by_cost_center,
+            'by_period': by_period,
         })
 
-    def _export_excel(self, by_category, by_cost_center, totals, year, month):
+    def _export_excel(self, by_category, by_cost_center, by_period, totals, period):
         import openpyxl
         from openpyxl.styles import Font, Alignment
 
@@ -115,16 +129,23 @@ class ExpensesByPeriodView(APIView):
         for row in by_cost_center:
             ws2.append([row['cost_center__code'], row['cost_center__name'], float(row['total'] or 0), row['count']])
 
+        # Hoja: Por Periodo
+        ws3 = wb.create_sheet('Por Periodo')
+        ws3.append(['Periodo', 'Total', 'Cantidad'])
+        for cell in ws3[1]:
+            cell.font = Font(bold=True)
+        for row in by_period:
+            ws3.append([row['period'], float(row['total'] or 0), row['count']])
+
         buf = io.BytesIO()
         wb.save(buf)
         buf.seek(0)
 
-        period = f'{year}-{month:0>2}' if month else year
         response = HttpResponse(buf.read(), content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        response['Content-Disposition'] = f'attachment; filename="gastos_periodo_{period}.xlsx"'
+        response['Content-Disposition'] = f'attachment; filename="gastos_periodo_{period.label}.xlsx"'
         return response
 
-    def _export_pdf(self, by_category, by_cost_center, totals, year, month):
+    def _export_pdf(self, by_category, by_cost_center, totals, period):
         from reportlab.lib import colors
         from reportlab.lib.pagesizes import letter
         from reportlab.lib.units import inch
@@ -136,8 +157,7 @@ class ExpensesByPeriodView(APIView):
         styles = getSampleStyleSheet()
         elements = []
 
-        period = f'{year}/{month:0>2}' if month else year
-        elements.append(Paragraph(f'Reporte de Gastos - {period}', styles['Title']))
+        elements.append(Paragraph(f'Reporte de Gastos - {period.label}', styles['Title']))
         elements.append(Spacer(1, 0.3 * inch))
 
         total_est = totals.get('total_estimated') or 0
@@ -165,28 +185,25 @@ class ExpensesByPeriodView(APIView):
         buf.seek(0)
 
         response = HttpResponse(buf.read(), content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="gastos_periodo_{period}.pdf"'
+        response['Content-Disposition'] = f'attachment; filename="gastos_periodo_{period.label}.pdf"'
         return response
 
 
-class BudgetComparisonView(APIView):
+class BudgetComparisonView(ReportsDatabaseMixin, APIView):
     """Reporte de comparacion presupuesto vs gasto real."""
     permission_classes = [permissions.IsAuthenticated]
 
-    @extend_schema(tags=['Reportes'], responses=inline_serializer('BudgetComparisonResponse', fields={
+    @extend_schema(tags=['Reportes'], parameters=PERIOD_PARAMETERS, responses=inline_serializer('BudgetComparisonResponse', fields={
         'filters': ser.DictField(), 'results': ser.ListField(),
     }))
     def get(self, request):
-        year = request.query_params.get('year')
-        month = request.query_params.get('month')
         export = request.query_params.get('export')
 
-        if not year:
-            return Response({'error': 'El parametro year es obligatorio.'}, status=status.HTTP_400_BAD_REQUEST)
+        period, error = _period_from_request(request)
+        if error:
+            return error
 
-        budgets_qs = Budget.objects.select_related('cost_center', 'category').filter(year=year)
-        if month:
-            budgets_qs = budgets_qs.filter(month=month)
+        budgets_qs = Budget.objects.select_related('cost_center', 'category').filter(period.month_q())
 
         results = []
         for budget in budgets_qs:
@@ -205,13 +222,19 @@ class BudgetComparisonView(APIView):
             })
 
         if export == 'excel':
-            return self._export_excel(results, year, month)
+            return self._export_excel(results, period)
         if export == 'pdf':
-            return self._export_pdf(results, year, month)
+            return self._export_pdf(results, period)
 
-        return Response({'filters': {'year': year, 'month': month}, 'results': results})
+        return Response({
+            'filters': {
+                'year': request.query_params.get('year'), 'month': request.query_params.get('month'),
+                'period': period.as_dict(),
+            },
+            'results': results,
+        })
 
-    def _export_excel(self, results, year, month):
+    def _export_excel(self, results, period):
         import openpyxl
         from openpyxl.styles import Font, PatternFill
 
@@ -238,12 +261,11 @@ class BudgetComparisonView(APIView):
         wb.save(buf)
         buf.seek(0)
 
-        period = f'{year}-{month:0>2}' if month else year
         response = HttpResponse(buf.read(), content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        response['Content-Disposition'] = f'attachment; filename="comparativo_presupuesto_{period}.xlsx"'
+        response['Content-Disposition'] = f'attachment; filename="comparativo_presupuesto_{period.label}.xlsx"'
         return response
 
-    def _export_pdf(self, results, year, month):
+    def _export_pdf(self, results, period):
         from reportlab.lib import colors
         from reportlab.lib.pagesizes import letter, landscape
         from reportlab.lib.units import inch
@@ -255,8 +277,7 @@ class BudgetComparisonView(APIView):
         styles = getSampleStyleSheet()
         elements = []
 
-        period = f'{year}/{month:0>2}' if month else year
-        elements.append(Paragraph(f'Comparativo de Presupuesto - {period}', styles['Title']))
+        elements.append(Paragraph(f'Comparativo de Presupuesto - {period.label}', styles['Title']))
         elements.append(Spacer(1, 0.3 * inch))
 
         data = [['Centro', 'Categoria', 'Mes', 'Presupuestado', 'Gastado', 'Disponible', '% Uso']]
@@ -287,44 +308,41 @@ class BudgetComparisonView(APIView):
         buf.seek(0)
 
         response = HttpResponse(buf.read(), content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="comparativo_presupuesto_{period}.pdf"'
+        response['Content-Disposition'] = f'attachment; filename="comparativo_presupuesto_{period.label}.pdf"'
         return response
 
 
-class ExpensesByEmployeeView(APIView):
+class ExpensesByEmployeeView(ReportsDatabaseMixin, APIView):
     """Reporte de gastos por empleado."""
     permission_classes = [permissions.IsAuthenticated]
 
-    @extend_schema(tags=['Reportes'], responses=inline_serializer('ExpensesByEmployeeResponse', fields={
+    @extend_schema(tags=['Reportes'], parameters=PERIOD_PARAMETERS, responses=inline_serializer('ExpensesByEmployeeResponse', fields={
         'filters': ser.DictField(), 'results': ser.ListField(),
     }))
     def get(self, request):
-        year = request.query_params.get('year')
-        month = request.query_params.get('month')
         export = request.query_params.get('export')
 
-        if not year:
-            return Response({'error': 'El parametro year es obligatorio.'}, status=status.HTTP_400_BAD_REQUEST)
-
-        qs = PurchaseRequest.objects.filter(
-            status__in=APPROVED_STATUSES, created_at__year=year,
-        )
-        if month:
-            qs = qs.filter(created_at__month=month)
+        period, error = _period_from_request(request)
+        if error:
+            return error
 
-        by_employee = list(qs.values(
+        by_employee = SpendQuery(period).grouped(
             'requester__first_name', 'requester__last_name', 'requester__email',
             'requester__area__name',
-        ).annotate(
-            total=Sum('estimated_amount'), count=Count('id'),
-        ).order_by('-total'))
+        )
 
         if export == 'excel':
-            return self._export_excel(by_employee, year, month)
+            return self._export_excel(by_employee, period)
 
-        return Response({'filters': {'year': year, 'month': month}, 'results': by_employee})
+        return Response({
+            'filters': {
+                'year': request.query_params.get('year'), 'month': request.query_params.get('month'),
+                'period': period.as_dict(),
+            },
+            'results': by_employee,
+        })
 
-    def _export_excel(self, results, year, month):
+    def _export_excel(self, results, period):
         import openpyxl
         from openpyxl.styles import Font
 
@@ -346,40 +364,46 @@ class ExpensesByEmployeeView(APIView):
         wb.save(buf)
         buf.seek(0)
 
-        period = f'{year}-{month:0>2}' if month else year
         response = HttpResponse(buf.read(), content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        response['Content-Disposition'] = f'attachment; filename="gastos_empleado_{period}.xlsx"'
+        response['Content-Disposition'] = f'attachment; filename="gastos_empleado_{period.label}.xlsx"'
         return response
 
 
-class TopSuppliersView(APIView):
+class TopSuppliersView(ReportsDatabaseMixin, APIView):
     """Reporte de proveedores mas utilizados."""
     permission_classes = [permissions.IsAuthenticated]
 
-    @extend_schema(tags=['Reportes'], responses=inline_serializer('TopSuppliersResponse', fields={
+    @extend_schema(tags=['Reportes'], parameters=PERIOD_PARAMETERS, responses=inline_serializer('TopSuppliersResponse', fields={
         'filters': ser.DictField(), 'results': ser.ListField(),
     }))
     def get(self, request):
         year = request.query_params.get('year')
         export = request.query_params.get('export')
 
+        period, error = _period_from_request(request, required=False)
+        if error:
+            return error
+
         qs = PurchaseRequest.objects.filter(
             status__in=[PurchaseRequest.COMPRADA, PurchaseRequest.COMPLETADA],
         ).exclude(actual_supplier='')
 
-        if year:
-            qs = qs.filter(created_at__year=year)
+        if period:
+            qs = qs.filter(**period.range_filter())
 
         by_supplier = list(qs.values('actual_supplier').annotate(
             total=Sum('actual_amount'), count=Count('id'),
         ).order_by('-total')[:20])
 
         if export == 'excel':
-            return self._export_excel(by_supplier, year)
+            return self._export_excel(by_supplier, period)
 
-        return Response({'filters': {'year': year}, 'results': by_supplier})
+        return Response({
+            'filters': {'year': year, 'period': period.as_dict() if period else None},
+            'results': by_supplier,
+        })
 
-    def _export_excel(self, results, year):
+    def _export_excel(self, results, period):
         import openpyxl
         from openpyxl.styles import Font
 
@@ -398,11 +422,140 @@ class TopSuppliersView(APIView):
         buf.seek(0)
 
         response = HttpResponse(buf.read(), content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        response['Content-Disposition'] = f'attachment; filename="proveedores_{year or "todos"}.xlsx"'
+        response['Content-Disposition'] = f'attachment; filename="proveedores_{period.label if period else "todos"}.xlsx"'
         return response
 
 
-class DashboardSummaryView(APIView):
+class ItemSpendView(ReportsDatabaseMixin, APIView):
+    """Reporte de gasto por item (cantidad, monto y solicitudes) desde las lineas de solicitud."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(tags=['Reportes'], parameters=PERIOD_PARAMETERS + [
+        OpenApiParameter('bucket', str, enum=BUCKETS, description='Agrupacion temporal opcional'),
+        OpenApiParameter('category', int, description='Filtrar por categoria'),
+        OpenApiParameter('cost_center', int, description='Filtrar por centro de costos'),
+    ], responses=inline_serializer('ItemSpendResponse', fields={
+        'filters': ser.DictField(), 'results': ser.ListField(),
+    }))
+    def get(self, request):
+        bucket = request.query_params.get('bucket') or None
+        category_id = request.query_params.get('category')
+        cost_center_id = request.query_params.get('cost_center')
+
+        period, error = _period_from_request(request)
+        if error:
+            return error
+        if bucket and bucket not in BUCKETS:
+            return Response({'error': f'bucket debe ser uno de: {", ".join(BUCKETS)}.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        query_filters = {}
+        if category_id:
+            query_filters['item__category_id'] = category_id
+        if cost_center_id:
+            query_filters['request__cost_center_id'] = cost_center_id
+
+        filters = {'period': period.as_dict(), 'bucket': bucket, 'category': category_id, 'cost_center': cost_center_id}
+        results = cached_report('item-spend', filters, lambda: build_item_spend(period, bucket, **query_filters))
+        return Response({'filters': filters, 'results': results})
+
+
+class TrendView(ReportsDatabaseMixin, APIView):
+    """Serie de tiempo de gasto, solicitudes y presupuesto por semana/mes/trimestre."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(tags=['Reportes'], parameters=PERIOD_PARAMETERS + [
+        OpenApiParameter('bucket', str, enum=TREND_BUCKETS, description='Agrupacion temporal (default month)'),
+        OpenApiParameter('dimension', str, enum=list(TREND_DIMENSIONS), description='Desglose opcional'),
+    ], responses=inline_serializer('TrendResponse', fields={
+        'filters': ser.DictField(), 'results': ser.ListField(),
+    }))
+    def get(self, request):
+        bucket = request.query_params.get('bucket', Period.MONTH)
+        dimension = request.query_params.get('dimension') or None
+
+        if bucket not in TREND_BUCKETS:
+            return Response({'error': f'bucket debe ser uno de: {", ".join(TREND_BUCKETS)}.'}, status=status.HTTP_400_BAD_REQUEST)
+        if dimension and dimension not in TREND_DIMENSIONS:
+            return Response({'error': f'dimension debe ser una de: {", ".join(TREND_DIMENSIONS)}.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        period, error = _period_from_request(request, required=False)
+        if error:
+            return error
+        period = period or Period.rolling(12)
+
+        filters = {'period': period.as_dict(), 'bucket': bucket, 'dimension': dimension}
+        results = cached_report('trend', filters, lambda: build_trend(period, bucket, dimension))
+        return Response({'filters': filters, 'results': results})
+
+
+MAX_PIVOT_DIMENSIONS = 4
+
+
+def _list_param(request, name, default=()):
+    value = request.query_params.get(name)
+    if not value:
+        return list(default)
+    return [part.strip() for part in value.split(',') if part.strip()]
+
+
+class PivotView(ReportsDatabaseMixin, APIView):
+    """
+    Tabla dinamica de solicitudes: agrupa por hasta cuatro dimensiones y
+    calcula las medidas pedidas. Gerentes ven su area y empleados sus propias
+    solicitudes; Finanzas y Direccion General ven todo.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(tags=['Reportes'], parameters=PERIOD_PARAMETERS + [
+        OpenApiParameter('rows', str, description=f'Dimensiones separadas por coma: {", ".join(PIVOT_DIMENSIONS)}'),
+        OpenApiParameter('measures', str, description=f'Medidas separadas por coma (default count,sum_estimated): {", ".join(PIVOT_MEASURES)}'),
+        OpenApiParameter('status', str, description='Estados separados por coma (default estados aprobados)'),
+    ], responses=inline_serializer('PivotResponse', fields={
+        'filters': ser.DictField(), 'results': ser.ListField(),
+    }))
+    def get(self, request):
+        dimensions = _list_param(request, 'rows')
+        measures = _list_param(request, 'measures', ['count', 'sum_estimated'])
+        statuses = _list_param(request, 'status', APPROVED_STATUSES)
+
+        if not dimensions:
+            return Response({'error': 'Debe indicar al menos una dimension en rows.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(dimensions) > MAX_PIVOT_DIMENSIONS or len(set(dimensions)) != len(dimensions):
+            return Response({'error': f'rows admite hasta {MAX_PIVOT_DIMENSIONS} dimensiones sin repetir.'}, status=status.HTTP_400_BAD_REQUEST)
+        invalid = [d for d in dimensions if d not in PIVOT_DIMENSIONS]
+        if invalid:
+            return Response({'error': f'Dimensiones no validas: {", ".join(invalid)}. Opciones: {", ".join(PIVOT_DIMENSIONS)}.'}, status=status.HTTP_400_BAD_REQUEST)
+        invalid = [m for m in measures if m not in PIVOT_MEASURES]
+        if invalid:
+            return Response({'error': f'Medidas no validas: {", ".join(invalid)}. Opciones: {", ".join(PIVOT_MEASURES)}.'}, status=status.HTTP_400_BAD_REQUEST)
+        if ITEM_PIVOT_MEASURES & set(measures) and 'item' not in dimensions:
+            return Response({'error': f'Las medidas {", ".join(sorted(ITEM_PIVOT_MEASURES))} requieren la dimension item.'}, status=status.HTTP_400_BAD_REQUEST)
+        valid_statuses = dict(PurchaseRequest.STATUS_CHOICES)
+        invalid = [s for s in statuses if s not in valid_statuses]
+        if invalid:
+            return Response({'error': f'Estados no validos: {", ".join(invalid)}.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        period, error = _period_from_request(request, required=False)
+        if error:
+            return error
+        period = period or Period.rolling(12)
+
+        scope = dashboard_scope(request.user)
+
+        filters = {
+            'period': period.as_dict(),
+            'rows': dimensions,
+            'measures': sorted(set(measures), key=PIVOT_MEASURES.index),
+            'status': sorted(set(statuses)),
+        }
+        results = cached_report(
+            'pivot', {**filters, 'scope': list(scope)},
+            lambda: build_pivot(period, dimensions, filters['measures'], filters['status'], scope),
+        )
+        return Response({'filters': filters, 'results': results})
+
+
+class DashboardSummaryView(ReportsDatabaseMixin, APIView):
     """Resumen general para el dashboard."""
     permission_classes = [permissions.IsAuthenticated]
 
@@ -412,35 +565,8 @@ class DashboardSummaryView(APIView):
         'in_process': ser.IntegerField(),
         'completed_this_month': ser.IntegerField(),
         'monthly_spend': ser.DecimalField(max_digits=12, decimal_places=2),
+        'inbox': ser.DictField(),
     }))
     def get(self, request):
-        user = request.user
-        now = timezone.now()
-
-        base_qs = PurchaseRequest.objects.all()
-        if not (user.is_finance() or user.is_general_director()):
-            if user.is_manager():
-                base_qs = base_qs.filter(requester__area=user.area)
-            else:
-                base_qs = base_qs.filter(requester=user)
-
-        pending_manager = base_qs.filter(status=PurchaseRequest.PENDIENTE_GERENTE).count()
-        pending_finance = base_qs.filter(status=PurchaseRequest.APROBADA_POR_GERENTE).count()
-        in_process = base_qs.filter(status=PurchaseRequest.EN_PROCESO).count()
-        completed_this_month = base_qs.filter(
-            status=PurchaseRequest.COMPLETADA,
-            created_at__year=now.year, created_at__month=now.month,
-        ).count()
-
-        monthly_spend = base_qs.filter(
-            status__in=APPROVED_STATUSES,
-            created_at__year=now.year, created_at__month=now.month,
-        ).aggregate(total=Sum('estimated_amount'))['total'] or Decimal('0.00')
-
-        return Response({
-            'pending_manager_approval': pending_manager,
-            'pending_finance_approval': pending_finance,
-            'in_process': in_process,
-            'completed_this_month': completed_this_month,
-            'monthly_spend': monthly_spend,
-        })
+        summary = get_dashboard_summary(request.user)
+        return Response({**summary, 'inbox': inbox_counts(request.user)})
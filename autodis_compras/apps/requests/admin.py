@@ -4,7 +4,14 @@ Configuración del panel de administración para solicitudes.
 
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import PurchaseRequest, RequestComment, RequestAttachment, RequestStatusHistory
+from .models import PurchaseRequest, RequestLine, RequestComment, RequestAttachment, RequestStatusHistory
+
+
+class RequestLineInline(admin.TabularInline):
+    model = RequestLine
+    extra = 0
+    autocomplete_fields = ['item']
+    readonly_fields = ['total']
 
 
 class RequestCommentInline(admin.TabularInline):
@@ -71,13 +78,13 @@ class PurchaseRequestAdmin(admin.ModelAdmin):
         'final_approved_at',
         'rejected_at'
     ]
-    autocomplete_fields = ['requester', 'cost_center', 'category', 'items']
+    autocomplete_fields = ['requester', 'cost_center', 'category']
     date_hierarchy = 'created_at'
-    inlines = [RequestCommentInline, RequestAttachmentInline, RequestStatusHistoryInline]
+    inlines = [RequestLineInline, RequestCommentInline, RequestAttachmentInline, RequestStatusHistoryInline]
 
     fieldsets = (
         ('Información Básica', {
-            'fields': ('request_number', 'requester', 'cost_center', 'category', 'items', 'status')
+            'fields': ('request_number', 'requester', 'cost_center', 'category', 'status')
         }),
         ('Detalles de la Solicitud', {
             'fields': (
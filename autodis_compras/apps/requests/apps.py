@@ -5,3 +5,6 @@ class RequestsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'autodis_compras.apps.requests'
     verbose_name = 'Solicitudes'
+
+    def ready(self):
+        import autodis_compras.apps.requests.signals  # noqa: F401
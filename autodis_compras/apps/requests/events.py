@@ -0,0 +1,129 @@
+"""
+Eventos de solicitudes para el stream SSE (/api/requests/events/).
+Cada cambio de estado del flujo se publica una sola vez por canal:
+
+- user:<id>      el solicitante
+- area:<id>      gerentes y delegados que aprueban en el área
+- approvers      Finanzas y Dirección General
+
+Cada conexión se suscribe a su canal de usuario, a los de las áreas que
+aprueba y, según el rol, al de aprobadores. Después de cada cambio de estado
+la conexión envía además los conteos de la bandeja del usuario, que salen
+de la caché compartida.
+"""
+
+import time
+from collections import deque
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+
+from autodis_compras.apps.users.delegation import approval_areas
+from autodis_compras.events import format_event, get_broker, publish
+from .inbox import inbox_counts, inbox_queues
+
+STATUS_EVENT = 'request.status'
+INBOX_EVENT = 'inbox'
+
+
+def user_channels(user):
+    """Canales a los que se suscribe el stream del usuario."""
+    channels = [f'user:{user.pk}']
+    channels += [f'area:{area_id}' for area_id in sorted(approval_areas(user))]
+    if user.is_finance() or user.is_general_director():
+        channels.append('approvers')
+    return channels
+
+
+def publish_status_change(history):
+    """Publica el cambio de estado al confirmar la transacción."""
+    purchase_request = history.request
+    message = {
+        'id': f'status-{history.pk}',
+        'event': STATUS_EVENT,
+        'data': {
+            'id': purchase_request.pk,
+            'request_number': purchase_request.request_number,
+            'previous_status': history.previous_status,
+            'status': history.new_status,
+            'changed_by': history.changed_by_id,
+            'changed_at': history.created_at,
+        },
+    }
+    channels = [f'user:{purchase_request.requester_id}', f'area:{purchase_request.area_id}', 'approvers']
+    transaction.on_commit(lambda: publish(channels, message))
+
+
+def event_stream(user, duration=None):
+    """
+    Generador del stream SSE del usuario. Envía los conteos de la bandeja al
+    conectarse, cada evento de sus canales y un comentario cada
+    EVENTS_HEARTBEAT segundos para mantener viva la conexión. Termina a los
+    `duration` segundos (EVENTS_STREAM_TIMEOUT) para liberar el worker; el
+    navegador se reconecta solo después de `retry` milisegundos.
+    """
+    duration = settings.EVENTS_STREAM_TIMEOUT if duration is None else duration
+    heartbeat = settings.EVENTS_HEARTBEAT
+    has_inbox = bool(inbox_queues(user))
+    subscription = get_broker().subscribe(user_channels(user))
+    deadline = time.monotonic() + duration
+    seen = deque(maxlen=100)
+    try:
+        yield 'retry: 3000\n\n'
+        if has_inbox:
+            yield format_event(INBOX_EVENT, inbox_counts(user))
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            message = subscription.get(timeout=min(heartbeat, remaining))
+            if message is None:
+                yield ': keepalive\n\n'
+                continue
+            if message['id'] in seen:
+                # Llega una vez por cada canal suscrito que lo recibió
+                continue
+            seen.append(message['id'])
+            yield format_event(message['event'], message['data'], message['id'])
+            if has_inbox and message['event'] == STATUS_EVENT:
+                yield format_event(INBOX_EVENT, inbox_counts(user))
+    finally:
+        subscription.close()
+
+
+async def aevent_stream(user, duration=None):
+    """
+    event_stream para el servidor ASGI. Los mensajes del broker se esperan en
+    el event loop (broker.asubscribe), así que una conexión abierta no ocupa
+    un hilo; solo las consultas de los canales y de los conteos de la bandeja
+    corren en un hilo con sync_to_async, al conectarse y después de cada
+    cambio de estado.
+    """
+    duration = settings.EVENTS_STREAM_TIMEOUT if duration is None else duration
+    heartbeat = settings.EVENTS_HEARTBEAT
+    channels, has_inbox = await sync_to_async(lambda: (user_channels(user), bool(inbox_queues(user))))()
+    counts = sync_to_async(inbox_counts)
+    subscription = await get_broker().asubscribe(channels)
+    deadline = time.monotonic() + duration
+    seen = deque(maxlen=100)
+    try:
+        yield 'retry: 3000\n\n'
+        if has_inbox:
+            yield format_event(INBOX_EVENT, await counts(user))
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            message = await subscription.get(timeout=min(heartbeat, remaining))
+            if message is None:
+                yield ': keepalive\n\n'
+                continue
+            if message['id'] in seen:
+                continue
+            seen.append(message['id'])
+            yield format_event(message['event'], message['data'], message['id'])
+            if has_inbox and message['event'] == STATUS_EVENT:
+                yield format_event(INBOX_EVENT, await counts(user))
+    finally:
+        await subscription.close()
@@ -0,0 +1,77 @@
+"""
+Bandeja de aprobación: las solicitudes sobre las que el usuario puede actuar.
+Cada rol tiene colas fijas definidas por estado (y área para los gerentes y
+sus delegados, ver users/delegation.py), cubiertas por índices parciales
+sobre status. Los conteos por cola se guardan en el espacio 'inbox' de la
+caché compartida por la base de la que se leyeron (ver
+autodis_compras/routers.py), que se invalida con cada cambio de una
+solicitud o delegación.
+"""
+
+from django.db.models import Count, Q
+
+from autodis_compras import cache as api_cache
+from autodis_compras.apps.users.delegation import approval_areas
+from autodis_compras.routers import cacheable_reads, current_read_alias
+from .models import PurchaseRequest
+
+MANAGER_APPROVAL = 'manager_approval'
+FINAL_APPROVAL = 'final_approval'
+PURCHASING = 'purchasing'
+
+QUEUE_STATUSES = {
+    MANAGER_APPROVAL: [PurchaseRequest.PENDIENTE_GERENTE],
+    FINAL_APPROVAL: [PurchaseRequest.APROBADA_POR_GERENTE],
+    PURCHASING: [PurchaseRequest.APROBADA, PurchaseRequest.EN_PROCESO, PurchaseRequest.COMPRADA],
+}
+
+
+def inbox_queues(user):
+    """Colas del usuario: diccionario cola -> Q con el filtro de la cola."""
+    queues = {}
+    areas = approval_areas(user)
+    if areas:
+        queues[MANAGER_APPROVAL] = Q(status__in=QUEUE_STATUSES[MANAGER_APPROVAL], area_id__in=sorted(areas))
+    if user.is_finance() or user.is_general_director():
+        queues[FINAL_APPROVAL] = Q(status__in=QUEUE_STATUSES[FINAL_APPROVAL])
+        queues[PURCHASING] = Q(status__in=QUEUE_STATUSES[PURCHASING])
+    return queues
+
+
+def inbox_filter(user, queue=None):
+    """Filtro de todas las colas del usuario o de una sola; None si no tiene esa cola."""
+    queues = inbox_queues(user)
+    if queue is not None:
+        return queues.get(queue)
+    return _any_queue(queues)
+
+
+def _inbox_cache_scope(user):
+    # Los usuarios con el mismo rol y las mismas áreas a aprobar comparten colas y conteos
+    finance = user.is_finance() or user.is_general_director()
+    return ('finance' if finance else 'areas', sorted(approval_areas(user)), current_read_alias())
+
+
+def _any_queue(queues):
+    condition = Q(pk__in=[])
+    for queue_filter in queues.values():
+        condition |= queue_filter
+    return condition
+
+
+def _count_queues(queues):
+    if not queues:
+        return {}
+    return PurchaseRequest.objects.filter(_any_queue(queues)).aggregate(**{
+        queue: Count('pk', filter=queue_filter) for queue, queue_filter in queues.items()
+    })
+
+
+def inbox_counts(user):
+    """Número de solicitudes por cola del usuario (una consulta por fallo de caché)."""
+    queues = inbox_queues(user)
+    if cacheable_reads():
+        counts = api_cache.get_or_compute('inbox', _inbox_cache_scope(user), lambda: _count_queues(queues))
+    else:
+        counts = _count_queues(queues)
+    return {'total': sum(counts.values()), 'queues': counts}
@@ -0,0 +1,140 @@
+# Generated by Django 4.2.9 on 2026-10-19 09:38
+
+from collections import defaultdict
+from decimal import Decimal, ROUND_DOWN
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def copy_items_to_lines(apps, schema_editor):
+    """
+    Crea una línea por cada relación solicitud-item existente. Las
+    solicitudes anteriores no tienen precio por item: el monto estimado se
+    reparte en partes iguales entre sus items, con cantidad 1.
+    """
+    PurchaseRequest = apps.get_model("requests", "PurchaseRequest")
+    RequestLine = apps.get_model("requests", "RequestLine")
+    Through = PurchaseRequest.items.through
+    db_alias = schema_editor.connection.alias
+
+    items_by_request = defaultdict(list)
+    for request_id, item_id in (
+        Through.objects.using(db_alias)
+        .order_by("purchaserequest_id", "id")
+        .values_list("purchaserequest_id", "item_id")
+        .iterator()
+    ):
+        items_by_request[request_id].append(item_id)
+
+    amounts = dict(
+        PurchaseRequest.objects.using(db_alias)
+        .filter(pk__in=items_by_request)
+        .values_list("id", "estimated_amount")
+    )
+    lines = []
+    for request_id, item_ids in items_by_request.items():
+        amount = amounts[request_id]
+        share = (amount / len(item_ids)).quantize(Decimal("0.01"), rounding=ROUND_DOWN)
+        prices = [amount - share * (len(item_ids) - 1)] + [share] * (len(item_ids) - 1)
+        for item_id, price in zip(item_ids, prices):
+            lines.append(
+                RequestLine(
+                    request_id=request_id,
+                    item_id=item_id,
+                    quantity=Decimal("1.00"),
+                    unit_price=price,
+                    total=price,
+                )
+            )
+    RequestLine.objects.using(db_alias).bulk_create(lines, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("budgets", "0002_initial"),
+        ("requests", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RequestLine",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "quantity",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=Decimal("1.00"),
+                        max_digits=10,
+                        validators=[
+                            django.core.validators.MinValueValidator(Decimal("0.01"))
+                        ],
+                        verbose_name="Cantidad",
+                    ),
+                ),
+                (
+                    "unit_price",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=Decimal("0.00"),
+                        max_digits=12,
+                        validators=[
+                            django.core.validators.MinValueValidator(Decimal("0.00"))
+                        ],
+                        verbose_name="Precio unitario (MXN)",
+                    ),
+                ),
+                (
+                    "total",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=Decimal("0.00"),
+                        editable=False,
+                        max_digits=12,
+                        verbose_name="Total (MXN)",
+                    ),
+                ),
+                (
+                    "item",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="request_lines",
+                        to="budgets.item",
+                        verbose_name="Item",
+                    ),
+                ),
+                (
+                    "request",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="lines",
+                        to="requests.purchaserequest",
+                        verbose_name="Solicitud",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Línea de Solicitud",
+                "verbose_name_plural": "Líneas de Solicitud",
+                "ordering": ["id"],
+                "unique_together": {("request", "item")},
+                "indexes": [
+                    models.Index(
+                        fields=["item", "request"],
+                        name="requests_re_item_id_bb0223_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(copy_items_to_lines, migrations.RunPython.noop),
+    ]
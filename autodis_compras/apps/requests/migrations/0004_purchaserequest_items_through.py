@@ -0,0 +1,28 @@
+# Generated by Django 4.2.9 on 2026-10-19 09:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("budgets", "0002_initial"),
+        ("requests", "0003_requestline"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="purchaserequest",
+            name="items",
+        ),
+        migrations.AddField(
+            model_name="purchaserequest",
+            name="items",
+            field=models.ManyToManyField(
+                related_name="purchase_requests",
+                through="requests.RequestLine",
+                to="budgets.item",
+                verbose_name="Items",
+            ),
+        ),
+    ]
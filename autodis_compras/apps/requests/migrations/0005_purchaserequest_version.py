@@ -0,0 +1,20 @@
+# Generated by Django 4.2.9 on 2026-10-19 09:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("requests", "0004_purchaserequest_items_through"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="purchaserequest",
+            name="version",
+            field=models.PositiveIntegerField(
+                default=1, editable=False, verbose_name="Versión"
+            ),
+        ),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 4.2.9 on 2026-10-19 09:58
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.db.models.deletion
+
+
+def copy_requester_area(apps, schema_editor):
+    """Copia el área y la ubicación del solicitante en cada solicitud existente."""
+    PurchaseRequest = apps.get_model("requests", "PurchaseRequest")
+    User = apps.get_model("users", "User")
+    db_alias = schema_editor.connection.alias
+    requester = User.objects.using(db_alias).filter(pk=OuterRef("requester_id"))
+    PurchaseRequest.objects.using(db_alias).update(
+        area_id=Subquery(requester.values("area_id")[:1]),
+        location_id=Subquery(requester.values("location_id")[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0002_userprincipal"),
+        ("requests", "0005_purchaserequest_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="purchaserequest",
+            name="area",
+            field=models.ForeignKey(
+                db_index=False,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="purchase_requests",
+                to="users.area",
+                verbose_name="Área",
+            ),
+        ),
+        migrations.AddField(
+            model_name="purchaserequest",
+            name="location",
+            field=models.ForeignKey(
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="purchase_requests",
+                to="users.location",
+                verbose_name="Ubicación",
+            ),
+        ),
+        migrations.RunPython(copy_requester_area, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="purchaserequest",
+            name="area",
+            field=models.ForeignKey(
+                db_index=False,
+                editable=False,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="purchase_requests",
+                to="users.area",
+                verbose_name="Área",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="purchaserequest",
+            name="location",
+            field=models.ForeignKey(
+                editable=False,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="purchase_requests",
+                to="users.location",
+                verbose_name="Ubicación",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="purchaserequest",
+            index=models.Index(
+                fields=["area", "status", "created_at"],
+                name="requests_pu_area_id_b69eb3_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.9 on 2026-10-19 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("requests", "0006_purchaserequest_area"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="purchaserequest",
+            index=models.Index(
+                condition=models.Q(("status", "PENDIENTE_GERENTE")),
+                fields=["area", "created_at"],
+                name="request_inbox_manager_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="purchaserequest",
+            index=models.Index(
+                condition=models.Q(
+                    (
+                        "status__in",
+                        ["APROBADA_POR_GERENTE", "APROBADA", "EN_PROCESO", "COMPRADA"],
+                    )
+                ),
+                fields=["status", "created_at"],
+                name="request_inbox_finance_idx",
+            ),
+        ),
+    ]
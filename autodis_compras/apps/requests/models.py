@@ -5,9 +5,13 @@ Modelos para la gestión de solicitudes de compra.
 from django.db import models
 from django.core.validators import MinValueValidator, FileExtensionValidator
 from django.core.exceptions import ValidationError
-from decimal import Decimal
-from autodis_compras.apps.users.models import User, CostCenter
+from django.utils import timezone
+from decimal import Decimal, ROUND_DOWN
+from autodis_compras.apps.users.models import User, Area, Location, CostCenter
+from autodis_compras.apps.users.delegation import approval_areas
 from autodis_compras.apps.budgets.models import Category, Item
+from autodis_compras.concurrency import VersionedModel
+from autodis_compras.periods import month_range, range_filter
 import os
 
 
@@ -16,11 +20,12 @@ def request_attachment_path(instance, filename):
     return f'requests/{instance.request.id}/attachments/{filename}'
 
 
-class PurchaseRequest(models.Model):
+class PurchaseRequest(VersionedModel):
     """
     Solicitud de compra con flujo de aprobación en cascada.
     10 estados: Borrador, Pendiente gerente, Aprobada gerente, Aprobada,
     En proceso, Comprada, Completada, Rechazada gerente, Rechazada Finanzas, Cancelada.
+    Usa control de concurrencia optimista por versión.
     """
     # Estados de solicitud
     BORRADOR = 'BORRADOR'
@@ -62,8 +67,13 @@ class PurchaseRequest(models.Model):
     cost_center = models.ForeignKey(CostCenter, on_delete=models.PROTECT, related_name='purchase_requests', verbose_name='Centro de Costos')
     category = models.ForeignKey(Category, on_delete=models.PROTECT, related_name='purchase_requests', verbose_name='Categoría')
 
-    # Items (puede ser uno o varios)
-    items = models.ManyToManyField(Item, related_name='purchase_requests', verbose_name='Items')
+    # Área y ubicación del solicitante, copiadas para filtrar por alcance sin unir con User.
+    # El índice (area, status, created_at) cubre también los filtros solo por área.
+    area = models.ForeignKey(Area, on_delete=models.PROTECT, related_name='purchase_requests', verbose_name='Área', db_index=False, editable=False)
+    location = models.ForeignKey(Location, on_delete=models.PROTECT, related_name='purchase_requests', verbose_name='Ubicación', editable=False)
+
+    # Items (puede ser uno o varios), con cantidad y precio en RequestLine
+    items = models.ManyToManyField(Item, through='RequestLine', related_name='purchase_requests', verbose_name='Items')
 
     # Detalles de la solicitud
     description = models.TextField('Descripción detallada')
@@ -110,6 +120,17 @@ class PurchaseRequest(models.Model):
             models.Index(fields=['status', 'created_at']),
             models.Index(fields=['requester', 'status']),
             models.Index(fields=['cost_center', 'category', 'created_at']),
+            models.Index(fields=['area', 'status', 'created_at']),
+            # Índices parciales de la bandeja de aprobación (inbox.py)
+            models.Index(
+                fields=['area', 'created_at'], condition=models.Q(status='PENDIENTE_GERENTE'),
+                name='request_inbox_manager_idx',
+            ),
+            models.Index(
+                fields=['status', 'created_at'],
+                condition=models.Q(status__in=['APROBADA_POR_GERENTE', 'APROBADA', 'EN_PROCESO', 'COMPRADA']),
+                name='request_inbox_finance_idx',
+            ),
         ]
 
     def __str__(self):
@@ -118,17 +139,19 @@ class PurchaseRequest(models.Model):
     def save(self, *args, **kwargs):
         # Generar número de solicitud si es nuevo
         if not self.request_number:
-            import datetime
-            today = datetime.date.today()
+            today = timezone.localdate()
             count = PurchaseRequest.objects.filter(
-                created_at__year=today.year,
-                created_at__month=today.month
+                **range_filter(*month_range(today.year, today.month))
             ).count() + 1
             self.request_number = f"SOL-{today.year}{today.month:02d}-{count:04d}"
 
-        # Auto-asignar centro de costos del solicitante
-        if not self.cost_center_id:
-            self.cost_center = self.requester.cost_center
+        # Auto-asignar centro de costos, área y ubicación del solicitante
+        if not self.cost_center_id or not self.area_id or not self.location_id:
+            requester = self.requester
+            if not self.cost_center_id:
+                self.cost_center_id = requester.cost_center_id
+            self.area_id = self.area_id or requester.area_id
+            self.location_id = self.location_id or requester.location_id
 
         super().save(*args, **kwargs)
 
@@ -136,12 +159,13 @@ class PurchaseRequest(models.Model):
         """Verifica si la solicitud excede el presupuesto disponible."""
         from autodis_compras.apps.budgets.models import Budget
 
+        created = timezone.localtime(self.created_at)
         try:
             budget = Budget.objects.get(
                 cost_center=self.cost_center,
                 category=self.category,
-                year=self.created_at.year,
-                month=self.created_at.month
+                year=created.year,
+                month=created.month
             )
             available = budget.get_available_amount()
             self.exceeds_budget = self.estimated_amount > available
@@ -159,9 +183,9 @@ class PurchaseRequest(models.Model):
         return self.status == self.PENDIENTE_GERENTE
 
     def can_be_approved_by_manager(self, user):
-        """Verifica si un gerente puede aprobar esta solicitud."""
-        # Debe ser gerente del área
-        if not user.is_manager() or user.area != self.requester.area:
+        """Verifica si un gerente (o su delegado vigente) puede aprobar esta solicitud."""
+        # Debe ser gerente del área o tener delegadas sus aprobaciones
+        if self.area_id not in approval_areas(user):
             return False
         # Debe estar en estado pendiente
         return self.status == self.PENDIENTE_GERENTE
@@ -175,6 +199,63 @@ class PurchaseRequest(models.Model):
         return self.status == self.APROBADA_POR_GERENTE
 
 
+def split_amount(amount, parts):
+    """Reparte un monto en `parts` partes iguales; los centavos sobrantes van a la primera."""
+    share = (amount / parts).quantize(Decimal('0.01'), rounding=ROUND_DOWN)
+    return [amount - share * (parts - 1)] + [share] * (parts - 1)
+
+
+class RequestLine(models.Model):
+    """
+    Línea de una solicitud: item, cantidad y precio unitario.
+    El total de la línea se guarda para agregar gasto por item sin
+    recalcularlo en cada consulta.
+    """
+    request = models.ForeignKey(PurchaseRequest, on_delete=models.CASCADE, related_name='lines', verbose_name='Solicitud')
+    item = models.ForeignKey(Item, on_delete=models.PROTECT, related_name='request_lines', verbose_name='Item')
+    quantity = models.DecimalField('Cantidad', max_digits=10, decimal_places=2, default=Decimal('1.00'), validators=[MinValueValidator(Decimal('0.01'))])
+    unit_price = models.DecimalField('Precio unitario (MXN)', max_digits=12, decimal_places=2, default=Decimal('0.00'), validators=[MinValueValidator(Decimal('0.00'))])
+    total = models.DecimalField('Total (MXN)', max_digits=12, decimal_places=2, default=Decimal('0.00'), editable=False)
+
+    class Meta:
+        verbose_name = 'Línea de Solicitud'
+        verbose_name_plural = 'Líneas de Solicitud'
+        ordering = ['id']
+        unique_together = [['request', 'item']]
+        indexes = [
+            models.Index(fields=['item', 'request']),
+        ]
+
+    def __str__(self):
+        return f"{self.request.request_number}: {self.quantity} x {self.item.code}"
+
+    def save(self, *args, **kwargs):
+        self.total = (self.quantity * self.unit_price).quantize(Decimal('0.01'))
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def build_lines(cls, purchase_request, lines):
+        """
+        Construye las líneas de una solicitud a partir de diccionarios con
+        item, quantity y unit_price. Las líneas sin precio reparten el monto
+        estimado de la solicitud en partes iguales.
+        """
+        unpriced = [line for line in lines if line.get('unit_price') is None]
+        if unpriced:
+            for line, amount in zip(unpriced, split_amount(purchase_request.estimated_amount, len(unpriced))):
+                quantity = line.get('quantity') or Decimal('1.00')
+                line['unit_price'] = (amount / quantity).quantize(Decimal('0.01'))
+        result = []
+        for line in lines:
+            quantity = line.get('quantity') or Decimal('1.00')
+            result.append(cls(
+                request=purchase_request, item=line['item'],
+                quantity=quantity, unit_price=line['unit_price'],
+                total=(quantity * line['unit_price']).quantize(Decimal('0.01')),
+            ))
+        return result
+
+
 class RequestComment(models.Model):
     """
     Comentarios en solicitudes de compra.
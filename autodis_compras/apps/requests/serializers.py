@@ -2,8 +2,23 @@
 Serializers para el módulo de solicitudes de compra.
 """
 
+from django.db import transaction
 from rest_framework import serializers
-from .models import PurchaseRequest, RequestComment, RequestAttachment, RequestStatusHistory
+from autodis_compras.apps.budgets.models import Category, Item
+from autodis_compras.apps.budgets.serializers import CatalogCategoryField, CatalogItemField
+from .models import PurchaseRequest, RequestLine, RequestComment, RequestAttachment, RequestStatusHistory
+
+
+class RequestLineSerializer(serializers.ModelSerializer):
+    item = CatalogItemField(queryset=Item.objects.all())
+    item_code = serializers.CharField(source='item.code', read_only=True)
+    item_name = serializers.CharField(source='item.name', read_only=True)
+    unit_price = serializers.DecimalField(max_digits=12, decimal_places=2, min_value=0, required=False)
+
+    class Meta:
+        model = RequestLine
+        fields = ['id', 'item', 'item_code', 'item_name', 'quantity', 'unit_price', 'total']
+        read_only_fields = ['total']
 
 
 class RequestStatusHistorySerializer(serializers.ModelSerializer):
@@ -43,6 +58,21 @@ class RequestAttachmentSerializer(serializers.ModelSerializer):
         read_only_fields = ['uploaded_by', 'original_filename', 'file_size', 'created_at']
 
 
+def resolve_lines(attrs):
+    """
+    Líneas de la solicitud desde `lines` o, si no se enviaron, desde la lista
+    de `items` (sin precio); valida que ningún item se repita.
+    """
+    lines = attrs.get('lines')
+    if lines is None:
+        lines = [{'item': item} for item in attrs.get('items', [])]
+    item_ids = [line['item'].pk for line in lines]
+    if len(item_ids) != len(set(item_ids)):
+        raise serializers.ValidationError({'lines': 'Un item no puede repetirse en la misma solicitud.'})
+    attrs['lines'] = lines
+    return attrs
+
+
 class PurchaseRequestListSerializer(serializers.ModelSerializer):
     """Serializer ligero para listados."""
     requester_name = serializers.CharField(source='requester.get_full_name', read_only=True)
@@ -64,7 +94,13 @@ class PurchaseRequestListSerializer(serializers.ModelSerializer):
 
 
 class PurchaseRequestDetailSerializer(serializers.ModelSerializer):
-    """Serializer completo para vista de detalle."""
+    """
+    Serializer completo para vista de detalle.
+    Al editar, `lines` o `items` reemplazan todas las líneas de la solicitud
+    (solo en borrador o pendiente de gerente).
+    """
+    LINE_EDITABLE_STATUSES = [PurchaseRequest.BORRADOR, PurchaseRequest.PENDIENTE_GERENTE]
+
     requester_name = serializers.CharField(source='requester.get_full_name', read_only=True)
     cost_center_name = serializers.CharField(source='cost_center.__str__', read_only=True)
     category_name = serializers.CharField(source='category.name', read_only=True)
@@ -79,6 +115,8 @@ class PurchaseRequestDetailSerializer(serializers.ModelSerializer):
     rejected_by_name = serializers.CharField(
         source='rejected_by.get_full_name', read_only=True, default=None
     )
+    items = CatalogItemField(many=True, queryset=Item.objects.all(), required=False)
+    lines = RequestLineSerializer(many=True, required=False)
     comments = RequestCommentSerializer(many=True, read_only=True)
     attachments = RequestAttachmentSerializer(many=True, read_only=True)
     status_history = RequestStatusHistorySerializer(many=True, read_only=True)
@@ -88,7 +126,7 @@ class PurchaseRequestDetailSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'request_number', 'requester', 'requester_name',
             'cost_center', 'cost_center_name', 'category', 'category_name',
-            'items', 'description', 'suggested_supplier',
+            'items', 'lines', 'description', 'suggested_supplier',
             'estimated_amount', 'required_date', 'justification',
             'budget_excess_justification', 'urgency', 'urgency_display',
             'status', 'status_display', 'exceeds_budget',
@@ -97,38 +135,71 @@ class PurchaseRequestDetailSerializer(serializers.ModelSerializer):
             'rejection_reason', 'rejected_at', 'rejected_by', 'rejected_by_name',
             'purchase_date', 'actual_supplier', 'actual_amount', 'invoice_number',
             'comments', 'attachments', 'status_history',
-            'created_at', 'updated_at',
+            'version', 'created_at', 'updated_at',
         ]
         read_only_fields = [
-            'request_number', 'exceeds_budget',
+            'request_number', 'exceeds_budget', 'version',
             'manager_approved_at', 'manager_approved_by',
             'final_approved_at', 'final_approved_by',
             'rejected_at', 'rejected_by',
             'created_at', 'updated_at',
         ]
 
+    def validate(self, attrs):
+        if 'lines' not in attrs and 'items' not in attrs:
+            return attrs
+        if self.instance is not None and self.instance.status not in self.LINE_EDITABLE_STATUSES:
+            raise serializers.ValidationError({
+                'lines': 'Los items solo pueden cambiarse en borrador o pendiente de aprobación del gerente.',
+            })
+        return resolve_lines(attrs)
+
+    def update(self, instance, validated_data):
+        validated_data.pop('items', None)
+        lines = validated_data.pop('lines', None)
+        with transaction.atomic():
+            if lines is not None:
+                # Las líneas sin precio reparten el monto estimado nuevo
+                instance.estimated_amount = validated_data.get('estimated_amount', instance.estimated_amount)
+                instance.lines.all().delete()
+                RequestLine.objects.bulk_create(RequestLine.build_lines(instance, lines))
+                instance.check_budget_excess()
+            return super().update(instance, validated_data)
+
 
 class PurchaseRequestCreateSerializer(serializers.ModelSerializer):
-    """Serializer para crear/editar solicitudes."""
+    """
+    Serializer para crear/editar solicitudes.
+    Los items se indican como `lines` (item, cantidad y precio unitario) o,
+    sin detalle, como lista de ids en `items`; en ese caso el monto estimado
+    se reparte en partes iguales.
+    """
+    category = CatalogCategoryField(queryset=Category.objects.all())
+    items = CatalogItemField(many=True, queryset=Item.objects.all(), required=False)
+    lines = RequestLineSerializer(many=True, required=False)
 
     class Meta:
         model = PurchaseRequest
         fields = [
-            'id', 'request_number', 'category', 'items', 'description',
+            'id', 'request_number', 'category', 'items', 'lines', 'description',
             'suggested_supplier', 'estimated_amount', 'required_date',
             'justification', 'budget_excess_justification', 'urgency',
         ]
         read_only_fields = ['request_number']
 
+    def validate(self, attrs):
+        return resolve_lines(attrs)
+
     def create(self, validated_data):
-        items = validated_data.pop('items', [])
+        validated_data.pop('items', None)
+        lines = validated_data.pop('lines', [])
         user = self.context['request'].user
         validated_data['requester'] = user
-        validated_data['cost_center'] = user.cost_center
+        validated_data['cost_center_id'] = user.cost_center_id
         validated_data['status'] = PurchaseRequest.PENDIENTE_GERENTE
         purchase_request = PurchaseRequest.objects.create(**validated_data)
-        if items:
-            purchase_request.items.set(items)
+        if lines:
+            RequestLine.objects.bulk_create(RequestLine.build_lines(purchase_request, lines))
         purchase_request.check_budget_excess()
         purchase_request.save()
         return purchase_request
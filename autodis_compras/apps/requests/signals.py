@@ -0,0 +1,49 @@
+"""
+Signals para mantener al día el área y la ubicación copiadas en las
+solicitudes cuando cambian las del solicitante, invalidar los conteos de
+la bandeja de aprobación y publicar los cambios de estado en el stream de
+eventos.
+"""
+
+from django.db.models import F, Q
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from autodis_compras.apps.users.models import User
+from autodis_compras.cache import invalidate, invalidate_on
+from autodis_compras.routers import mark_primary_reads
+from .events import publish_status_change
+from .models import PurchaseRequest, RequestStatusHistory
+
+invalidate_on(PurchaseRequest, 'inbox')
+
+
+@receiver(post_save, sender=User)
+def sync_requester_area(sender, instance, created, **kwargs):
+    """Mueve las solicitudes del usuario a su nueva área o ubicación."""
+    if created:
+        return
+    updated = PurchaseRequest.objects.filter(requester=instance).filter(
+        ~Q(area_id=instance.area_id) | ~Q(location_id=instance.location_id),
+    ).update(area_id=instance.area_id, location_id=instance.location_id, version=F('version') + 1)
+    if updated:
+        # update() no envía post_save: se invalidan aquí la bandeja y los reportes en caché
+        from autodis_compras.apps.reports.cache import invalidate_reports
+        invalidate('inbox')
+        invalidate_reports()
+
+
+@receiver(post_save, sender=RequestStatusHistory)
+def on_status_history_created(sender, instance, created, **kwargs):
+    """Publica cada cambio de estado del flujo a los suscriptores del stream."""
+    if created:
+        publish_status_change(instance)
+        # Quien hizo el cambio debe verlo en sus reportes aunque la réplica vaya atrás
+        mark_primary_reads(instance.changed_by_id)
+
+
+@receiver(post_save, sender=PurchaseRequest)
+def on_request_created(sender, instance, created, **kwargs):
+    """El solicitante lee sus reportes de la principal justo después de crear una solicitud."""
+    if created:
+        mark_primary_reads(instance.requester_id)
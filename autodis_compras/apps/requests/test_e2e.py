@@ -411,22 +411,23 @@ class FullSystemE2ETest(TestCase):
         """
         now = timezone.now()
 
-        # Crear solicitud aprobada
-        self.client.force_authenticate(user=self.emp_ops)
-        response = self.client.post('/api/requests/purchase-requests/', {
-            'category': self.cat_pap.id, 'items': [self.item_hojas.id],
-            'description': 'Para reporte', 'estimated_amount': '10000.00',
-            'required_date': '2026-03-01', 'justification': 'Test reportes',
-        })
-        pr_id = response.data['id']
+        # Crear solicitud aprobada (el resumen mensual se refresca al confirmar)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.force_authenticate(user=self.emp_ops)
+            response = self.client.post('/api/requests/purchase-requests/', {
+                'category': self.cat_pap.id, 'items': [self.item_hojas.id],
+                'description': 'Para reporte', 'estimated_amount': '10000.00',
+                'required_date': '2026-03-01', 'justification': 'Test reportes',
+            })
+            pr_id = response.data['id']
 
-        # Aprobar gerente
-        self.client.force_authenticate(user=self.mgr_ops)
-        self.client.post(f'/api/requests/purchase-requests/{pr_id}/approve_manager/')
+            # Aprobar gerente
+            self.client.force_authenticate(user=self.mgr_ops)
+            self.client.post(f'/api/requests/purchase-requests/{pr_id}/approve_manager/')
 
-        # Aprobar finanzas
-        self.client.force_authenticate(user=self.finance)
-        self.client.post(f'/api/requests/purchase-requests/{pr_id}/approve_final/')
+            # Aprobar finanzas
+            self.client.force_authenticate(user=self.finance)
+            self.client.post(f'/api/requests/purchase-requests/{pr_id}/approve_final/')
 
         # Verificar reporte de gastos por periodo
         response = self.client.get('/api/reports/expenses-by-period/', {
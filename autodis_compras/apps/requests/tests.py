@@ -4,14 +4,22 @@ Tests para el módulo de solicitudes de compra.
 
 import datetime
 from decimal import Decimal
-from django.test import TestCase
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from rest_framework.test import APIClient
 from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
 
-from autodis_compras.apps.users.models import Area, Location, CostCenter, User
+from autodis_compras.apps.users.models import Area, Location, CostCenter, Delegation, User
 from autodis_compras.apps.budgets.models import Category, Item
-from .models import PurchaseRequest, RequestComment, RequestStatusHistory
+from autodis_compras.concurrency import ConcurrentUpdateError
+from autodis_compras.events import get_broker, publish
+from .events import aevent_stream, event_stream
+from .models import PurchaseRequest, RequestLine, RequestComment, RequestStatusHistory, split_amount
 
 
 class RequestBaseTestCase(TestCase):
@@ -329,6 +337,117 @@ class PurchaseRequestWorkflowAPITests(RequestBaseTestCase):
         self.assertEqual(pr.status_history.count(), 5)
 
 
+class RequestLineTests(RequestBaseTestCase):
+    """Tests de las líneas de solicitud (item, cantidad y precio)."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.employee = self._create_user('emp@lines.com', User.EMPLEADO)
+        self.item_toner = Item.objects.create(
+            category=self.category, code='PAP-002', name='Toner', unit='Pieza',
+        )
+        self.client.force_authenticate(user=self.employee)
+
+    def _post(self, **data):
+        return self.client.post('/api/requests/purchase-requests/', {
+            'category': self.category.id,
+            'description': 'Compra con lineas',
+            'estimated_amount': '1000.00',
+            'required_date': '2026-03-15',
+            'justification': 'Test',
+            **data,
+        }, format='json')
+
+    def test_split_amount(self):
+        self.assertEqual(split_amount(Decimal('100.00'), 3), [Decimal('33.34'), Decimal('33.33'), Decimal('33.33')])
+
+    def test_create_with_lines(self):
+        response = self._post(lines=[
+            {'item': self.item.id, 'quantity': '10', 'unit_price': '50.00'},
+            {'item': self.item_toner.id, 'quantity': '2', 'unit_price': '250.00'},
+        ])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        lines = RequestLine.objects.filter(request_id=response.data['id'])
+        self.assertEqual(sorted(line.total for line in lines), [Decimal('500.00'), Decimal('500.00')])
+        self.assertEqual(len(response.data['lines']), 2)
+
+    def test_update_replaces_lines(self):
+        pr_id = self._post(items=[self.item.id]).data['id']
+        response = self.client.patch(f'/api/requests/purchase-requests/{pr_id}/', {
+            'estimated_amount': '1200.00',
+            'lines': [
+                {'item': self.item_toner.id, 'quantity': '2', 'unit_price': '300.00'},
+                {'item': self.item.id, 'quantity': '3'},
+            ],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(line['item'], line['total']) for line in response.data['lines']],
+            [(self.item_toner.id, '600.00'), (self.item.id, '1200.00')],
+        )
+        pr = PurchaseRequest.objects.get(id=pr_id)
+        self.assertEqual(set(pr.items.all()), {self.item, self.item_toner})
+
+    def test_update_lines_rejected_after_approval(self):
+        pr_id = self._post(items=[self.item.id]).data['id']
+        PurchaseRequest.objects.filter(id=pr_id).update(status=PurchaseRequest.APROBADA)
+        response = self.client.patch(
+            f'/api/requests/purchase-requests/{pr_id}/', {'items': [self.item_toner.id]}, format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(list(PurchaseRequest.objects.get(id=pr_id).items.all()), [self.item])
+
+    def test_items_without_prices_split_estimated_amount(self):
+        response = self._post(items=[self.item.id, self.item_toner.id])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        pr = PurchaseRequest.objects.get(id=response.data['id'])
+        self.assertEqual(set(pr.items.all()), {self.item, self.item_toner})
+        self.assertEqual([line.total for line in pr.lines.all()], [Decimal('500.00'), Decimal('500.00')])
+
+    def test_unknown_item_rejected(self):
+        response = self._post(items=[self.item.id, 9999])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('items', response.data)
+
+    def test_repeated_item_rejected(self):
+        response = self._post(lines=[{'item': self.item.id}, {'item': self.item.id}])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_detail_includes_lines(self):
+        pr = self._create_request(self.employee)
+        response = self.client.get(f'/api/requests/purchase-requests/{pr.id}/')
+        self.assertEqual(response.data['lines'][0]['item_code'], 'PAP-001')
+
+
+class RequestConcurrencyTests(RequestBaseTestCase):
+    """Tests del control de concurrencia optimista en solicitudes."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.employee = self._create_user('emp@lock.com', User.EMPLEADO)
+        self.client.force_authenticate(user=self.employee)
+        self.pr = self._create_request(self.employee)
+        self.url = f'/api/requests/purchase-requests/{self.pr.id}/'
+
+    def test_stale_instance_rejected(self):
+        stale = PurchaseRequest.objects.get(pk=self.pr.pk)
+        self.pr.description = 'Primera edicion'
+        self.pr.save()
+        stale.status = PurchaseRequest.CANCELADA
+        with self.assertRaises(ConcurrentUpdateError), transaction.atomic():
+            stale.save()
+        self.pr.refresh_from_db()
+        self.assertEqual(self.pr.status, PurchaseRequest.BORRADOR)
+
+    def test_action_with_stale_if_match(self):
+        etag = self.client.get(self.url)['ETag']
+        self.client.patch(self.url, {'description': 'Editada'}, HTTP_IF_MATCH=etag)
+        response = self.client.post(f'{self.url}submit/', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.pr.refresh_from_db()
+        self.assertEqual(self.pr.status, PurchaseRequest.BORRADOR)
+
+
 class RequestQuerysetFilterTests(RequestBaseTestCase):
     """Tests de filtros de queryset por rol."""
 
@@ -359,6 +478,203 @@ class RequestQuerysetFilterTests(RequestBaseTestCase):
         response = self.client.get('/api/requests/purchase-requests/')
         self.assertEqual(response.data['count'], 2)
 
+    def test_request_copies_requester_area(self):
+        self.assertEqual((self.pr1.area, self.pr1.location), (self.area_ops, self.location))
+
+    def test_manager_scope_without_user_join(self):
+        self.client.force_authenticate(user=self.manager)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/requests/purchase-requests/', {'status': PurchaseRequest.PENDIENTE_GERENTE})
+        count_sql = next(q['sql'] for q in queries.captured_queries if 'COUNT(' in q['sql'])
+        self.assertNotIn('users_user', count_sql)
+
+    def test_area_change_moves_requests(self):
+        self.employee2.area = self.area_fin
+        self.employee2.save()
+        self.pr2.refresh_from_db()
+        self.assertEqual((self.pr2.area, self.pr2.version), (self.area_fin, 2))
+        self.client.force_authenticate(user=self.manager)
+        response = self.client.get('/api/requests/purchase-requests/')
+        self.assertEqual(response.data['count'], 1)
+
+
+class InboxTests(RequestBaseTestCase):
+    """Tests de la bandeja de aprobación."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.employee = self._create_user('emp@inbox.com', User.EMPLEADO)
+        self.manager = self._create_user('mgr@inbox.com', User.GERENTE)
+        self.manager_fin = self._create_user(
+            'mgrfin@inbox.com', User.GERENTE, area=self.area_fin, cost_center=self.cost_center_fin,
+        )
+        self.finance = self._create_user(
+            'fin@inbox.com', User.FINANZAS, area=self.area_fin, cost_center=self.cost_center_fin,
+        )
+        self.pending = self._create_request(self.employee, status=PurchaseRequest.PENDIENTE_GERENTE)
+        self.approved_manager = self._create_request(self.employee, status=PurchaseRequest.APROBADA_POR_GERENTE)
+        self.in_process = self._create_request(self.employee, status=PurchaseRequest.EN_PROCESO)
+        self._create_request(self.employee, status=PurchaseRequest.BORRADOR)
+
+    def _inbox(self, user, **params):
+        self.client.force_authenticate(user=user)
+        return self.client.get('/api/requests/purchase-requests/inbox/', params)
+
+    def test_manager_inbox(self):
+        response = self._inbox(self.manager)
+        self.assertEqual([row['id'] for row in response.data['results']], [self.pending.id])
+        self.assertEqual(response.data['counts'], {'total': 1, 'queues': {'manager_approval': 1}})
+        self.assertEqual(self._inbox(self.manager_fin).data['count'], 0)
+
+    def test_finance_inbox_by_queue(self):
+        response = self._inbox(self.finance)
+        self.assertEqual(response.data['counts']['queues'], {'final_approval': 1, 'purchasing': 1})
+        response = self._inbox(self.finance, queue='purchasing')
+        self.assertEqual([row['id'] for row in response.data['results']], [self.in_process.id])
+
+    def test_queue_not_available_for_role(self):
+        response = self._inbox(self.manager, queue='purchasing')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self._inbox(self.employee).data['counts']['total'], 0)
+
+    def test_counts_cached_and_invalidated(self):
+        self._inbox(self.manager)
+        with CaptureQueriesContext(connection) as queries:
+            response = self._inbox(self.manager)
+        # Los conteos por cola salen de la caché
+        self.assertFalse([q for q in queries.captured_queries if '"manager_approval"' in q['sql']])
+        self.assertEqual(response.data['counts']['total'], 1)
+        self.pending.status = PurchaseRequest.APROBADA_POR_GERENTE
+        self.pending.save()
+        self.assertEqual(self._inbox(self.manager).data['counts']['total'], 0)
+
+    def test_dashboard_includes_inbox(self):
+        self.client.force_authenticate(user=self.finance)
+        response = self.client.get('/api/reports/dashboard/')
+        self.assertEqual(response.data['inbox']['total'], 2)
+
+
+class DelegatedApprovalTests(RequestBaseTestCase):
+    """Tests de aprobación por el delegado de un gerente fuera de oficina."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.employee = self._create_user('emp@deleg.com', User.EMPLEADO)
+        self.manager = self._create_user('mgr@deleg.com', User.GERENTE)
+        self.delegate = self._create_user(
+            'mgrfin@deleg.com', User.GERENTE, area=self.area_fin, cost_center=self.cost_center_fin,
+        )
+        self.pr = self._create_request(self.employee, status=PurchaseRequest.PENDIENTE_GERENTE)
+        Delegation.objects.create(
+            delegator=self.manager, delegate=self.delegate,
+            start_date=timezone.localdate(), end_date=timezone.localdate(),
+        )
+
+    def test_delegate_can_approve(self):
+        self.assertTrue(self.pr.can_be_approved_by_manager(self.delegate))
+        self.assertTrue(self.pr.can_be_approved_by_manager(self.manager))
+        self.client.force_authenticate(user=self.delegate)
+        response = self.client.post(f'/api/requests/purchase-requests/{self.pr.id}/approve_manager/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], PurchaseRequest.APROBADA_POR_GERENTE)
+
+    def test_delegate_inbox(self):
+        self.client.force_authenticate(user=self.delegate)
+        response = self.client.get('/api/requests/purchase-requests/inbox/')
+        self.assertEqual([row['id'] for row in response.data['results']], [self.pr.id])
+
+    def test_expired_delegation_removes_access(self):
+        Delegation.objects.update(start_date=datetime.date(2020, 1, 1), end_date=datetime.date(2020, 1, 2))
+        cache.clear()
+        self.assertFalse(self.pr.can_be_approved_by_manager(self.delegate))
+
+    def test_creation_notifies_delegate(self):
+        from autodis_compras.apps.notifications.models import EmailNotification
+        from autodis_compras.apps.notifications.tasks import notify_request_created
+        notify_request_created(self.pr.id)
+        recipients = EmailNotification.objects.filter(
+            notification_type=EmailNotification.SOLICITUD_CREADA, request=self.pr,
+        ).values_list('recipient_id', flat=True)
+        self.assertIn(self.delegate.pk, recipients)
+        self.assertNotIn(self.manager.pk, recipients)
+
+
+class RequestEventsTests(RequestBaseTestCase):
+    """Tests del stream de eventos de solicitudes."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.employee = self._create_user('emp@events.com', User.EMPLEADO)
+        self.manager = self._create_user('mgr@events.com', User.GERENTE)
+        self.pr = self._create_request(self.employee, status=PurchaseRequest.PENDIENTE_GERENTE)
+
+    def test_transition_published_to_requester(self):
+        subscription = get_broker().subscribe([f'user:{self.employee.pk}'])
+        self.addCleanup(subscription.close)
+        self.client.force_authenticate(user=self.manager)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/api/requests/purchase-requests/{self.pr.id}/approve_manager/')
+        message = subscription.get(timeout=0)
+        self.assertEqual(message['event'], 'request.status')
+        self.assertEqual(message['data']['id'], self.pr.id)
+        self.assertEqual(message['data']['status'], PurchaseRequest.APROBADA_POR_GERENTE)
+
+    def test_stream_sends_inbox_and_events_once(self):
+        stream = event_stream(self.manager, duration=1)
+        self.assertEqual(next(stream), 'retry: 3000\n\n')
+        self.assertIn('"manager_approval": 1', next(stream))
+        message = {'id': 'status-1', 'event': 'request.status', 'data': {'id': self.pr.id}}
+        # El gerente está suscrito a su canal y al de su área: el evento se envía una vez
+        publish([f'area:{self.area_ops.pk}', f'user:{self.manager.pk}'], message)
+        self.assertTrue(next(stream).startswith('id: status-1\nevent: request.status\n'))
+        self.assertTrue(next(stream).startswith('event: inbox\n'))
+        self.assertEqual(next(stream), ': keepalive\n\n')
+        stream.close()
+
+    async def test_async_stream_waits_on_event_loop(self):
+        stream = aevent_stream(self.manager, duration=1)
+        self.assertEqual(await anext(stream), 'retry: 3000\n\n')
+        self.assertIn('"manager_approval": 1', await anext(stream))
+        message = {'id': 'status-1', 'event': 'request.status', 'data': {'id': self.pr.id}}
+        # Se publica desde otro hilo, como lo hace la petición que cambia el estado
+        await sync_to_async(publish)([f'area:{self.area_ops.pk}', f'user:{self.manager.pk}'], message)
+        self.assertTrue((await anext(stream)).startswith('id: status-1\nevent: request.status\n'))
+        self.assertTrue((await anext(stream)).startswith('event: inbox\n'))
+        self.assertEqual(await anext(stream), ': keepalive\n\n')
+        await stream.aclose()
+
+    @override_settings(EVENTS_STREAM_TIMEOUT=0, EVENTS_WSGI_STREAMS=True)
+    def test_events_endpoint(self):
+        self.client.force_authenticate(user=self.employee)
+        response = self.client.get('/api/requests/events/', HTTP_ACCEPT='text/event-stream')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(b''.join(response.streaming_content), b'retry: 3000\n\n')
+
+    @override_settings(EVENTS_STREAM_TIMEOUT=0)
+    async def test_events_endpoint_asgi(self):
+        token = AccessToken.for_user(self.employee)
+        response = await self.async_client.get(
+            '/api/requests/events/', headers={'Accept': 'text/event-stream', 'Authorization': f'Bearer {token}'},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.is_async)
+        chunks = [chunk async for chunk in response.streaming_content]
+        self.assertEqual(chunks, [b'retry: 3000\n\n'])
+
+    def test_events_endpoint_refused_under_wsgi(self):
+        # Sin modo ASGI no se ocupa un worker síncrono: el cliente vuelve al polling
+        self.client.force_authenticate(user=self.employee)
+        response = self.client.get('/api/requests/events/', HTTP_ACCEPT='text/event-stream')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+    def test_events_endpoint_requires_auth(self):
+        response = self.client.get('/api/requests/events/', HTTP_ACCEPT='text/event-stream')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
 
 class CommentAPITests(RequestBaseTestCase):
     """Tests de comentarios."""
@@ -4,7 +4,7 @@ URLs para el módulo de solicitudes.
 
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import PurchaseRequestViewSet, RequestCommentViewSet, RequestAttachmentViewSet
+from .views import PurchaseRequestViewSet, RequestCommentViewSet, RequestAttachmentViewSet, RequestEventsView
 
 app_name = 'requests'
 
@@ -14,5 +14,6 @@ router.register(r'comments', RequestCommentViewSet)
 router.register(r'attachments', RequestAttachmentViewSet)
 
 urlpatterns = [
+    path('events/', RequestEventsView.as_view(), name='events'),
     path('', include(router.urls)),
 ]
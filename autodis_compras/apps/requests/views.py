@@ -2,15 +2,25 @@
 ViewSets para el módulo de solicitudes de compra.
 """
 
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
 from django.utils import timezone
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
-from drf_spectacular.utils import extend_schema, extend_schema_view
+from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
 
+from autodis_compras.apps.users.delegation import approval_areas
+from autodis_compras.concurrency import OptimisticLockMixin
+from autodis_compras.async_views import is_asgi_request
+from autodis_compras.events import EventStreamRenderer
+from .events import aevent_stream, event_stream
+from .inbox import QUEUE_STATUSES, inbox_counts, inbox_filter
 from .models import PurchaseRequest, RequestComment, RequestAttachment, RequestStatusHistory
 from .serializers import (
     PurchaseRequestListSerializer,
@@ -31,11 +41,11 @@ from .serializers import (
     cancel=extend_schema(tags=['Solicitudes']), mark_in_process=extend_schema(tags=['Solicitudes']),
     mark_purchased=extend_schema(tags=['Solicitudes']), mark_completed=extend_schema(tags=['Solicitudes']),
 )
-class PurchaseRequestViewSet(viewsets.ModelViewSet):
+class PurchaseRequestViewSet(OptimisticLockMixin, viewsets.ModelViewSet):
     queryset = PurchaseRequest.objects.select_related(
         'requester', 'cost_center', 'category',
         'manager_approved_by', 'final_approved_by', 'rejected_by',
-    ).prefetch_related('items', 'comments', 'attachments', 'status_history').all()
+    ).prefetch_related('items', 'lines__item', 'comments', 'attachments', 'status_history').all()
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ['status', 'urgency', 'category', 'cost_center', 'requester', 'exceeds_budget']
@@ -45,7 +55,7 @@ class PurchaseRequestViewSet(viewsets.ModelViewSet):
     def get_serializer_class(self):
         if self.action == 'create':
             return PurchaseRequestCreateSerializer
-        if self.action == 'list':
+        if self.action in ('list', 'inbox'):
             return PurchaseRequestListSerializer
         return PurchaseRequestDetailSerializer
 
@@ -54,9 +64,31 @@ class PurchaseRequestViewSet(viewsets.ModelViewSet):
         if user.is_finance() or user.is_general_director():
             return self.queryset
         if user.is_manager():
-            return self.queryset.filter(requester__area=user.area)
+            return self.queryset.filter(area_id__in=approval_areas(user))
         return self.queryset.filter(requester=user)
 
+    @extend_schema(tags=['Solicitudes'], parameters=[
+        OpenApiParameter('queue', str, enum=list(QUEUE_STATUSES), description='Solo una cola de la bandeja'),
+    ])
+    @action(detail=False, methods=['get'])
+    def inbox(self, request):
+        """
+        Bandeja de aprobación: solicitudes sobre las que el usuario puede
+        actuar, de la más antigua a la más reciente, con el conteo por cola.
+        """
+        queue = request.query_params.get('queue')
+        condition = inbox_filter(request.user, queue)
+        if condition is None:
+            return Response(
+                {'error': f'Cola no valida para su rol: {queue}.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        queryset = self.filter_queryset(self.get_queryset().filter(condition).order_by('created_at'))
+        page = self.paginate_queryset(queryset)
+        response = self.get_paginated_response(self.get_serializer(page, many=True).data)
+        response.data['counts'] = inbox_counts(request.user)
+        return response
+
     @action(detail=True, methods=['post'])
     def submit(self, request, pk=None):
         """Enviar borrador a aprobación de gerente."""
@@ -292,3 +324,33 @@ class RequestAttachmentViewSet(viewsets.ModelViewSet):
             from rest_framework.exceptions import ValidationError
             raise ValidationError({'file': 'No se pueden adjuntar más de 10 archivos por solicitud.'})
         serializer.save(uploaded_by=self.request.user)
+
+
+class RequestEventsView(APIView):
+    """
+    Stream SSE con los cambios de estado de las solicitudes visibles para el
+    usuario y los conteos de su bandeja; reemplaza el polling de la lista y
+    del dashboard.
+
+    Requiere el modo ASGI: bajo gunicorn síncrono cada stream ocuparía un
+    worker durante EVENTS_STREAM_TIMEOUT (más que su timeout), así que se
+    responde 204, que detiene la reconexión del cliente SSE, y el frontend
+    sigue con el polling.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    renderer_classes = [EventStreamRenderer, JSONRenderer]
+
+    @extend_schema(tags=['Solicitudes'], responses={(200, 'text/event-stream'): str})
+    def get(self, request):
+        # Bajo ASGI el stream debe ser asíncrono; bajo WSGI, un iterador normal
+        if is_asgi_request(request):
+            stream = aevent_stream(request.user)
+        elif settings.EVENTS_WSGI_STREAMS:
+            stream = event_stream(request.user)
+        else:
+            return HttpResponse(status=status.HTTP_204_NO_CONTENT)
+        response = StreamingHttpResponse(stream, content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # Evita que nginx acumule el stream en su buffer
+        response['X-Accel-Buffering'] = 'no'
+        return response
@@ -4,7 +4,7 @@ Configuración del panel de administración para usuarios.
 
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User, Area, Location, CostCenter
+from .models import User, Area, Location, CostCenter, Delegation
 
 
 @admin.register(Area)
@@ -56,3 +56,12 @@ class UserAdmin(BaseUserAdmin):
     )
 
     autocomplete_fields = ['area', 'location', 'cost_center']
+
+
+@admin.register(Delegation)
+class DelegationAdmin(admin.ModelAdmin):
+    list_display = ['delegator', 'delegate', 'start_date', 'end_date', 'reason']
+    list_filter = ['start_date', 'end_date']
+    search_fields = ['delegator__email', 'delegate__email', 'reason']
+    readonly_fields = ['created_at', 'updated_at']
+    autocomplete_fields = ['delegator', 'delegate']
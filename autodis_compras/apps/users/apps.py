@@ -5,3 +5,6 @@ class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'autodis_compras.apps.users'
     verbose_name = 'Usuarios'
+
+    def ready(self):
+        import autodis_compras.apps.users.signals  # noqa: F401
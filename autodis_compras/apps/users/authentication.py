@@ -0,0 +1,112 @@
+"""
+Autenticación JWT con el contexto de permisos del usuario en el token.
+El token lleva como claims el rol, el área y el centro de costos. En las
+peticiones de solo lectura el usuario se arma con esos claims (UserPrincipal)
+sin consultar la base; en las escrituras se usa el usuario completo desde la
+caché compartida ('users').
+
+Para detectar claims desactualizados (cambio de rol, área o centro de
+costos, o usuario dado de baja) cada usuario tiene en caché su estado de
+autorización, que se borra al guardarlo o eliminarlo. Si los claims del
+token no coinciden con ese estado se usa el usuario completo.
+"""
+
+from django.core.cache import cache
+from django.db import transaction
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework import permissions
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer as BaseTokenObtainPairSerializer
+from rest_framework_simplejwt.settings import api_settings
+
+from autodis_compras import cache as api_cache
+from .models import User, UserPrincipal
+
+CLAIMS = ('role', 'area_id', 'cost_center_id')
+
+
+def user_claims(user):
+    return {claim: getattr(user, claim) for claim in CLAIMS}
+
+
+def _auth_state_key(user_id):
+    return f'users:auth:{user_id}'
+
+
+def auth_state(user_id):
+    """Claims vigentes e is_active del usuario, o None si no existe."""
+    key = _auth_state_key(user_id)
+    state = cache.get(key)
+    if state is None:
+        state = User.objects.filter(pk=user_id).values(*CLAIMS, 'is_active').first()
+        if state is not None:
+            cache.set(key, state, None)
+    return state
+
+
+def get_cached_user(user_id):
+    """
+    Usuario completo (con área, ubicación y centro de costos) desde la caché
+    compartida. El hash de la contraseña no se guarda en Redis: el campo se
+    difiere y check_password lo lee de la base.
+    """
+    return api_cache.get_or_compute(
+        'users', ('user', user_id),
+        lambda: User.objects.select_related('area', 'location', 'cost_center').defer('password').filter(pk=user_id).first(),
+    )
+
+
+def clear_auth_state(user_id):
+    """Borra el estado de autorización del usuario ahora y otra vez al confirmar la transacción."""
+    key = _auth_state_key(user_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+class TokenObtainPairSerializer(BaseTokenObtainPairSerializer):
+    """Login JWT que agrega rol, área y centro de costos a los claims del token."""
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        for claim, value in user_claims(user).items():
+            token[claim] = value
+        return token
+
+
+class JWTPrincipalAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication que evita consultar el usuario: UserPrincipal en
+    lecturas con claims vigentes y usuario en caché en los demás casos.
+    """
+
+    def authenticate(self, request):
+        self.read_only = request.method in permissions.SAFE_METHODS
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('El token no contiene la identificación del usuario.')
+
+        state = auth_state(user_id)
+        if state is None:
+            raise AuthenticationFailed('Usuario no encontrado.', code='user_not_found')
+        if not state['is_active']:
+            raise AuthenticationFailed('Usuario inactivo.', code='user_inactive')
+
+        claims = {claim: validated_token.get(claim) for claim in CLAIMS}
+        if self.read_only and claims == {claim: state[claim] for claim in CLAIMS}:
+            return UserPrincipal.from_claims(user_id, **claims)
+
+        user = get_cached_user(user_id)
+        if user is None:
+            raise AuthenticationFailed('Usuario no encontrado.', code='user_not_found')
+        return user
+
+
+class JWTPrincipalScheme(SimpleJWTScheme):
+    """Documenta JWTPrincipalAuthentication en el esquema OpenAPI igual que el JWT de simplejwt."""
+    target_class = 'autodis_compras.apps.users.authentication.JWTPrincipalAuthentication'
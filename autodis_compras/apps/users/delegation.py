@@ -0,0 +1,66 @@
+"""
+Ruteo de aprobaciones de gerente con delegaciones.
+El aprobador efectivo de cada área se calcula una vez por día para todas las
+áreas: el delegado vigente de cada gerente, o el gerente si no delegó y no
+está fuera de oficina. El resultado vive en el espacio 'delegation' de la
+caché compartida, con la fecha en la llave, y se invalida al guardar una
+delegación o un usuario (rol, área, fuera de oficina), así que permisos,
+bandeja y notificaciones lo consultan sin ir a la base.
+"""
+
+from django.utils import timezone
+
+from autodis_compras import cache as api_cache
+from .models import Delegation, User
+
+NAMESPACE = 'delegation'
+APPROVER_ROLES = [User.GERENTE, User.FINANZAS, User.DIRECCION_GENERAL]
+
+
+def _build_routing(today):
+    delegates = dict(
+        Delegation.objects.filter(
+            start_date__lte=today, end_date__gte=today,
+            delegate__is_active=True, delegate__role__in=APPROVER_ROLES,
+        )
+        .order_by('created_at')
+        .values_list('delegator_id', 'delegate_id')
+    )
+    managers = User.objects.filter(role=User.GERENTE, is_active=True).values_list(
+        'pk', 'area_id', 'is_out_of_office',
+    )
+    approvers = {}
+    delegated = {}
+    for manager_id, area_id, out_of_office in managers:
+        area_approvers = approvers.setdefault(area_id, [])
+        delegate_id = delegates.get(manager_id)
+        if delegate_id is not None:
+            area_approvers.append(delegate_id)
+            delegated.setdefault(delegate_id, []).append(area_id)
+        elif not out_of_office:
+            area_approvers.append(manager_id)
+    return {'approvers': approvers, 'delegated': delegated}
+
+
+def approval_routing():
+    """Aprobadores efectivos por área y áreas delegadas por usuario, del día."""
+    today = timezone.localdate()
+    return api_cache.get_or_compute(NAMESPACE, ('routing', today.isoformat()), lambda: _build_routing(today))
+
+
+def effective_approvers(area_id):
+    """Ids de quienes aprueban hoy las solicitudes del área; vacío si nadie (pasan a Finanzas/DG)."""
+    return approval_routing()['approvers'].get(area_id, [])
+
+
+def delegated_areas(user_id):
+    """Áreas cuyas aprobaciones de gerente tiene delegadas hoy el usuario."""
+    return approval_routing()['delegated'].get(user_id, [])
+
+
+def approval_areas(user):
+    """Áreas en las que el usuario puede aprobar como gerente: la suya y las delegadas."""
+    areas = set(delegated_areas(user.pk))
+    if user.is_manager():
+        areas.add(user.area_id)
+    return areas
@@ -0,0 +1,72 @@
+# Generated by Django 4.2.9 on 2026-10-19 10:03
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0002_userprincipal"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Delegation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("start_date", models.DateField(verbose_name="Desde")),
+                ("end_date", models.DateField(verbose_name="Hasta")),
+                (
+                    "reason",
+                    models.CharField(blank=True, max_length=200, verbose_name="Motivo"),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Creado"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Actualizado"),
+                ),
+                (
+                    "delegate",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="delegations_received",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Delegado",
+                    ),
+                ),
+                (
+                    "delegator",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="delegations_given",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Gerente",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Delegación",
+                "verbose_name_plural": "Delegaciones",
+                "ordering": ["-start_date"],
+                "indexes": [
+                    models.Index(
+                        fields=["end_date", "start_date"],
+                        name="users_deleg_end_dat_88c865_idx",
+                    )
+                ],
+            },
+        ),
+    ]
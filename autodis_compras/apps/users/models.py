@@ -161,3 +161,83 @@ class User(AbstractUser):
     def can_manage_budgets(self):
         """Verifica si el usuario puede gestionar presupuestos."""
         return self.role in [self.FINANZAS, self.DIRECCION_GENERAL]
+
+
+class UserPrincipal(User):
+    """
+    Usuario armado con los claims del token JWT (id, rol, área y centro de
+    costos) sin consultar la base. Se usa en peticiones de solo lectura; los
+    demás campos se cargan juntos desde la caché de usuarios la primera vez
+    que se leen.
+    """
+
+    class Meta:
+        proxy = True
+
+    @classmethod
+    def from_claims(cls, user_id, role, area_id, cost_center_id):
+        values = {
+            'id': user_id, 'role': role, 'area_id': area_id,
+            'cost_center_id': cost_center_id, 'is_active': True,
+        }
+        # from_db espera los valores en el orden de los campos del modelo
+        field_names = [field.attname for field in cls._meta.concrete_fields if field.attname in values]
+        return cls.from_db(None, field_names, [values[name] for name in field_names])
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        deferred = self.get_deferred_fields()
+        if fields is None or not set(fields) <= deferred:
+            return super().refresh_from_db(using, fields, **kwargs)
+        from .authentication import get_cached_user
+        user = get_cached_user(self.pk)
+        if user is None:
+            raise User.DoesNotExist('El usuario ya no existe.')
+        for attname in deferred:
+            setattr(self, attname, getattr(user, attname))
+
+
+class Delegation(models.Model):
+    """
+    Delegación de las aprobaciones de un gerente a otro aprobador durante un
+    rango de fechas (vacaciones, viajes). Mientras está vigente, el delegado
+    aprueba o rechaza las solicitudes del área del gerente y recibe sus
+    notificaciones.
+    """
+    delegator = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='delegations_given', verbose_name='Gerente',
+    )
+    delegate = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='delegations_received', verbose_name='Delegado',
+    )
+    start_date = models.DateField('Desde')
+    end_date = models.DateField('Hasta')
+    reason = models.CharField('Motivo', max_length=200, blank=True)
+    created_at = models.DateTimeField('Creado', auto_now_add=True)
+    updated_at = models.DateTimeField('Actualizado', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Delegación'
+        verbose_name_plural = 'Delegaciones'
+        ordering = ['-start_date']
+        indexes = [models.Index(fields=['end_date', 'start_date'])]
+
+    def __str__(self):
+        return f"{self.delegator} → {self.delegate} ({self.start_date} a {self.end_date})"
+
+    def clean(self):
+        if self.start_date and self.end_date and self.end_date < self.start_date:
+            raise ValidationError({'end_date': 'La fecha final no puede ser anterior a la inicial.'})
+        if self.delegator_id and self.delegator_id == self.delegate_id:
+            raise ValidationError({'delegate': 'Un gerente no puede delegarse a sí mismo.'})
+        if self.delegator_id and not self.delegator.is_manager():
+            raise ValidationError({'delegator': 'Solo los gerentes pueden delegar aprobaciones.'})
+        if self.delegate_id and not (self.delegate.is_approver() and self.delegate.is_active):
+            raise ValidationError({'delegate': 'El delegado debe ser un gerente, Finanzas o Dirección General activo.'})
+        if self.delegator_id and self.start_date and self.end_date:
+            overlapping = Delegation.objects.filter(
+                delegator_id=self.delegator_id,
+                start_date__lte=self.end_date,
+                end_date__gte=self.start_date,
+            ).exclude(pk=self.pk)
+            if overlapping.exists():
+                raise ValidationError('El gerente ya tiene una delegación en esas fechas.')
@@ -2,8 +2,9 @@
 Serializers para el módulo de usuarios.
 """
 
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
-from .models import Area, Location, CostCenter, User
+from .models import Area, Location, CostCenter, Delegation, User
 
 
 class AreaSerializer(serializers.ModelSerializer):
@@ -96,3 +97,40 @@ class UserProfileSerializer(serializers.ModelSerializer):
             'email', 'username', 'role', 'area', 'location', 'cost_center',
             'is_active', 'created_at', 'updated_at',
         ]
+
+
+class DelegationSerializer(serializers.ModelSerializer):
+    """
+    Delegación de aprobaciones. Un gerente solo delega las suyas (delegator
+    es siempre él mismo); Finanzas y Dirección General pueden registrarlas
+    para cualquier gerente.
+    """
+    delegator = serializers.PrimaryKeyRelatedField(queryset=User.objects.all(), required=False)
+    delegator_name = serializers.CharField(source='delegator.get_full_name', read_only=True)
+    delegate_name = serializers.CharField(source='delegate.get_full_name', read_only=True)
+
+    class Meta:
+        model = Delegation
+        fields = [
+            'id', 'delegator', 'delegator_name', 'delegate', 'delegate_name',
+            'start_date', 'end_date', 'reason', 'created_at', 'updated_at',
+        ]
+        read_only_fields = ['created_at', 'updated_at']
+
+    def validate(self, attrs):
+        user = self.context['request'].user
+        if not user.can_manage_budgets():
+            attrs['delegator'] = user
+        elif 'delegator' not in attrs and self.instance is None:
+            raise serializers.ValidationError({'delegator': 'Indique el gerente que delega.'})
+        delegation = Delegation(pk=self.instance.pk if self.instance else None)
+        if self.instance is not None:
+            for field in ('delegator', 'delegate', 'start_date', 'end_date'):
+                setattr(delegation, field, getattr(self.instance, field))
+        for field, value in attrs.items():
+            setattr(delegation, field, value)
+        try:
+            delegation.clean()
+        except DjangoValidationError as exc:
+            raise serializers.ValidationError(exc.message_dict if hasattr(exc, 'error_dict') else exc.messages)
+        return attrs
@@ -0,0 +1,25 @@
+"""
+Invalidación de la caché compartida cuando cambian usuarios o la estructura
+organizacional.
+"""
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from autodis_compras.cache import invalidate_on
+from .authentication import clear_auth_state
+from .models import Area, Location, CostCenter, Delegation, User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def on_user_changed(sender, instance, **kwargs):
+    """Obliga a revalidar los claims de los tokens del usuario."""
+    clear_auth_state(instance.pk)
+
+
+invalidate_on(User, 'users')
+for model in (Area, Location, CostCenter):
+    invalidate_on(model, 'catalog', 'users')
+invalidate_on(Delegation, 'delegation', 'inbox')
+invalidate_on(User, 'delegation')
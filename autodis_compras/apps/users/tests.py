@@ -4,12 +4,17 @@ Tests para el módulo de usuarios.
 
 import datetime
 from decimal import Decimal
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
-from rest_framework.test import APIClient
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient, APIRequestFactory
 from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
 
-from .models import Area, Location, CostCenter, User
+from .authentication import JWTPrincipalAuthentication
+from .delegation import approval_areas, effective_approvers
+from .models import Area, Location, CostCenter, Delegation, User, UserPrincipal
 
 
 class BaseTestCase(TestCase):
@@ -210,7 +215,162 @@ class UserAPITests(BaseTestCase):
         self.assertEqual(response.data['count'], 2)
 
 
+class CatalogConditionalTests(BaseTestCase):
+    """Tests de ETag / Last-Modified en los catálogos."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self._create_user('emp@etag.com', User.EMPLEADO))
+
+    def test_not_modified_without_serializing(self):
+        response = self.client.get('/api/users/areas/')
+        self.assertIn('Last-Modified', response)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/users/areas/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_related_change_invalidates_cost_centers(self):
+        etag = self.client.get('/api/users/cost-centers/')['ETag']
+        self.location.save()
+        response = self.client.get('/api/users/cost-centers/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+class JWTPrincipalTests(BaseTestCase):
+    """Tests de la autenticación JWT con claims de rol, área y centro de costos."""
+
+    def setUp(self):
+        cache.clear()
+        self.manager = self._create_user('mgr@jwt.com', User.GERENTE)
+        response = APIClient().post('/api/auth/login/', {'email': 'mgr@jwt.com', 'password': 'testpass123'})
+        self.token = response.data['access']
+        self.factory = APIRequestFactory()
+
+    def _authenticate(self, method='get'):
+        request = getattr(self.factory, method)('/api/users/me/', HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        user, _ = JWTPrincipalAuthentication().authenticate(request)
+        return user
+
+    def test_token_claims(self):
+        token = AccessToken(self.token)
+        self.assertEqual(
+            (token['role'], token['area_id'], token['cost_center_id']),
+            (User.GERENTE, self.area_ops.pk, self.cost_center.pk),
+        )
+
+    def test_read_uses_principal_without_queries(self):
+        self._authenticate()
+        with self.assertNumQueries(0):
+            user = self._authenticate()
+            self.assertIsInstance(user, UserPrincipal)
+            self.assertTrue(user.is_manager())
+            self.assertEqual(user, self.manager)
+        self.assertEqual(user.email, 'mgr@jwt.com')
+
+    def test_write_uses_cached_user(self):
+        self._authenticate('post')
+        with self.assertNumQueries(0):
+            user = self._authenticate('post')
+        self.assertNotIsInstance(user, UserPrincipal)
+        self.assertEqual(user.cost_center.code, 'CC-OPS-GDL')
+
+    def test_cached_user_without_password_hash(self):
+        user = self._authenticate('post')
+        self.assertIn('password', user.get_deferred_fields())
+        self.assertTrue(user.check_password('testpass123'))
+
+    def test_role_change_ignores_stale_claims(self):
+        self._authenticate()
+        self.manager.role = User.EMPLEADO
+        self.manager.save()
+        user = self._authenticate()
+        self.assertNotIsInstance(user, UserPrincipal)
+        self.assertFalse(user.is_manager())
+
+    def test_inactive_user_rejected(self):
+        self._authenticate()
+        self.manager.is_active = False
+        self.manager.save()
+        with self.assertRaises(AuthenticationFailed):
+            self._authenticate()
+
+    def test_profile_with_token(self):
+        response = APIClient().get('/api/users/users/me/', HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['email'], 'mgr@jwt.com')
+
 
 # NOTE: JWT auth tests are skipped in this environment due to a cryptography
 # library incompatibility (pyo3_runtime.PanicException). They should be run
 # in a properly configured environment with PyJWT and cryptography installed.
+
+
+class DelegationTests(BaseTestCase):
+    """Tests de delegación de aprobaciones y su resolución en caché."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.manager = self._create_user('mgr@deleg.com', User.GERENTE)
+        self.manager_fin = self._create_user(
+            'mgrfin@deleg.com', User.GERENTE, area=self.area_fin, cost_center=self.cost_center_fin,
+        )
+        self.employee = self._create_user('emp@deleg.com', User.EMPLEADO)
+        self.today = datetime.date.today()
+
+    def _delegate(self, delegate, start=0, end=5):
+        return Delegation.objects.create(
+            delegator=self.manager, delegate=delegate,
+            start_date=self.today + datetime.timedelta(days=start),
+            end_date=self.today + datetime.timedelta(days=end),
+        )
+
+    def test_routing_without_delegation(self):
+        self.assertEqual(effective_approvers(self.area_ops.pk), [self.manager.pk])
+        self.manager.is_out_of_office = True
+        self.manager.save()
+        self.assertEqual(effective_approvers(self.area_ops.pk), [])
+
+    def test_current_delegation_reroutes_area(self):
+        self._delegate(self.manager_fin)
+        self.assertEqual(effective_approvers(self.area_ops.pk), [self.manager_fin.pk])
+        self.assertEqual(approval_areas(self.manager_fin), {self.area_ops.pk, self.area_fin.pk})
+        self.assertEqual(approval_areas(self.manager), {self.area_ops.pk})
+
+    def test_future_delegation_ignored(self):
+        self._delegate(self.manager_fin, start=2, end=4)
+        self.assertEqual(approval_areas(self.manager_fin), {self.area_fin.pk})
+
+    def test_routing_cached(self):
+        effective_approvers(self.area_ops.pk)
+        with self.assertNumQueries(0):
+            approval_areas(self.manager_fin)
+
+    def test_manager_creates_own_delegation(self):
+        self.client.force_authenticate(user=self.manager)
+        response = self.client.post('/api/users/delegations/', {
+            'delegator': self.manager_fin.pk, 'delegate': self.manager_fin.pk,
+            'start_date': self.today, 'end_date': self.today,
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['delegator'], self.manager.pk)
+        self.assertEqual(effective_approvers(self.area_ops.pk), [self.manager_fin.pk])
+
+    def test_invalid_delegations_rejected(self):
+        self.client.force_authenticate(user=self.manager)
+        url = '/api/users/delegations/'
+        data = {'delegate': self.employee.pk, 'start_date': self.today, 'end_date': self.today}
+        self.assertEqual(self.client.post(url, data).status_code, status.HTTP_400_BAD_REQUEST)
+        data['delegate'] = self.manager.pk
+        self.assertEqual(self.client.post(url, data).status_code, status.HTTP_400_BAD_REQUEST)
+        self._delegate(self.manager_fin)
+        data['delegate'] = self.manager_fin.pk
+        self.assertEqual(self.client.post(url, data).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_employee_cannot_delegate(self):
+        self.client.force_authenticate(user=self.employee)
+        response = self.client.post('/api/users/delegations/', {
+            'delegate': self.manager.pk, 'start_date': self.today, 'end_date': self.today,
+        })
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
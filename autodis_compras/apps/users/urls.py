@@ -4,7 +4,7 @@ URLs para el módulo de usuarios.
 
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import AreaViewSet, LocationViewSet, CostCenterViewSet, UserViewSet
+from .views import AreaViewSet, LocationViewSet, CostCenterViewSet, UserViewSet, DelegationViewSet
 
 app_name = 'users'
 
@@ -13,6 +13,7 @@ router.register(r'areas', AreaViewSet)
 router.register(r'locations', LocationViewSet)
 router.register(r'cost-centers', CostCenterViewSet)
 router.register(r'users', UserViewSet)
+router.register(r'delegations', DelegationViewSet)
 
 urlpatterns = [
     path('', include(router.urls)),
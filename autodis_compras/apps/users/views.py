@@ -9,10 +9,14 @@ from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 from drf_spectacular.utils import extend_schema, extend_schema_view
 
-from .models import Area, Location, CostCenter, User
+from autodis_compras.conditional import ConditionalCatalogMixin
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Area, Location, CostCenter, Delegation, User
 from .serializers import (
     AreaSerializer, LocationSerializer, CostCenterSerializer,
-    UserSerializer, UserCreateSerializer, UserProfileSerializer,
+    UserSerializer, UserCreateSerializer, UserProfileSerializer, DelegationSerializer,
 )
 
 
@@ -24,6 +28,14 @@ class IsFinanceOrDirector(permissions.BasePermission):
         return request.user.can_manage_budgets()
 
 
+class IsApprover(permissions.BasePermission):
+    """Gerentes, Finanzas o Dirección General pueden registrar delegaciones."""
+    def has_permission(self, request, view):
+        if request.method in permissions.SAFE_METHODS:
+            return True
+        return request.user.is_approver()
+
+
 class IsManagerOrAbove(permissions.BasePermission):
     """Gerentes, Finanzas o Dirección General pueden gestionar usuarios."""
     def has_permission(self, request, view):
@@ -35,7 +47,7 @@ class IsManagerOrAbove(permissions.BasePermission):
 @extend_schema_view(list=extend_schema(tags=['Áreas']), retrieve=extend_schema(tags=['Áreas']),
                      create=extend_schema(tags=['Áreas']), update=extend_schema(tags=['Áreas']),
                      partial_update=extend_schema(tags=['Áreas']), destroy=extend_schema(tags=['Áreas']))
-class AreaViewSet(viewsets.ModelViewSet):
+class AreaViewSet(ConditionalCatalogMixin, viewsets.ModelViewSet):
     queryset = Area.objects.all()
     serializer_class = AreaSerializer
     permission_classes = [permissions.IsAuthenticated, IsFinanceOrDirector]
@@ -47,7 +59,7 @@ class AreaViewSet(viewsets.ModelViewSet):
 @extend_schema_view(list=extend_schema(tags=['Ubicaciones']), retrieve=extend_schema(tags=['Ubicaciones']),
                      create=extend_schema(tags=['Ubicaciones']), update=extend_schema(tags=['Ubicaciones']),
                      partial_update=extend_schema(tags=['Ubicaciones']), destroy=extend_schema(tags=['Ubicaciones']))
-class LocationViewSet(viewsets.ModelViewSet):
+class LocationViewSet(ConditionalCatalogMixin, viewsets.ModelViewSet):
     queryset = Location.objects.all()
     serializer_class = LocationSerializer
     permission_classes = [permissions.IsAuthenticated, IsFinanceOrDirector]
@@ -59,9 +71,10 @@ class LocationViewSet(viewsets.ModelViewSet):
 @extend_schema_view(list=extend_schema(tags=['Centros de Costos']), retrieve=extend_schema(tags=['Centros de Costos']),
                      create=extend_schema(tags=['Centros de Costos']), update=extend_schema(tags=['Centros de Costos']),
                      partial_update=extend_schema(tags=['Centros de Costos']), destroy=extend_schema(tags=['Centros de Costos']))
-class CostCenterViewSet(viewsets.ModelViewSet):
+class CostCenterViewSet(ConditionalCatalogMixin, viewsets.ModelViewSet):
     queryset = CostCenter.objects.select_related('area', 'location').all()
     serializer_class = CostCenterSerializer
+    conditional_models = [CostCenter, Area, Location]
     permission_classes = [permissions.IsAuthenticated, IsFinanceOrDirector]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ['area', 'location', 'is_active']
@@ -94,7 +107,7 @@ class UserViewSet(viewsets.ModelViewSet):
         if user.is_finance() or user.is_general_director():
             return self.queryset
         if user.is_manager():
-            return self.queryset.filter(area=user.area)
+            return self.queryset.filter(area_id=user.area_id)
         return self.queryset.filter(pk=user.pk)
 
     @action(detail=False, methods=['get', 'patch'], permission_classes=[permissions.IsAuthenticated])
@@ -158,3 +171,34 @@ class UserViewSet(viewsets.ModelViewSet):
         user.save(update_fields=['is_out_of_office'])
         serializer = UserProfileSerializer(user)
         return Response(serializer.data)
+
+
+@extend_schema_view(list=extend_schema(tags=['Delegaciones']), retrieve=extend_schema(tags=['Delegaciones']),
+                     create=extend_schema(tags=['Delegaciones']), update=extend_schema(tags=['Delegaciones']),
+                     partial_update=extend_schema(tags=['Delegaciones']), destroy=extend_schema(tags=['Delegaciones']))
+class DelegationViewSet(viewsets.ModelViewSet):
+    """Delegaciones de aprobación de gerentes (fuera de oficina)."""
+    queryset = Delegation.objects.select_related('delegator', 'delegate').all()
+    serializer_class = DelegationSerializer
+    permission_classes = [permissions.IsAuthenticated, IsApprover]
+    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    filterset_fields = ['delegator', 'delegate']
+    ordering_fields = ['start_date', 'end_date']
+
+    def get_queryset(self):
+        user = self.request.user
+        queryset = self.queryset
+        if not user.can_manage_budgets():
+            queryset = queryset.filter(Q(delegator_id=user.pk) | Q(delegate_id=user.pk))
+        if self.request.query_params.get('current') in ('1', 'true'):
+            today = timezone.localdate()
+            queryset = queryset.filter(start_date__lte=today, end_date__gte=today)
+        return queryset
+
+    def check_object_permissions(self, request, obj):
+        super().check_object_permissions(request, obj)
+        # El delegado puede consultar la delegación pero no modificarla
+        if request.method not in permissions.SAFE_METHODS and not (
+            request.user.can_manage_budgets() or obj.delegator_id == request.user.pk
+        ):
+            self.permission_denied(request, message='Solo el gerente que delega puede modificarla.')
@@ -1,5 +1,7 @@
 """
 ASGI config for autodis_compras project.
+Se sirve con workers de uvicorn:
+    gunicorn autodis_compras.asgi:application -k uvicorn.workers.UvicornWorker
 """
 
 import os
@@ -0,0 +1,16 @@
+"""
+Utilidades para el despliegue ASGI (uvicorn).
+Todas las vistas de la API son síncronas: bajo ASGI Django corre cada una en
+un hilo con sync_to_async, así que ocupan un hilo igual que bajo WSGI. En
+Django 4.2 la caché (aget/aset/aincr) y aaggregate también son envoltorios
+de sync_to_async, de modo que una vista asíncrona no liberaría el hilo y
+sumaría saltos entre hilos por cada llamada. Solo el stream de eventos
+(requests/events.py) distingue el modo ASGI.
+"""
+
+from django.core.handlers.asgi import ASGIRequest
+
+
+def is_asgi_request(request):
+    """True si la petición llegó por el servidor ASGI."""
+    return isinstance(getattr(request, '_request', request), ASGIRequest)
@@ -0,0 +1,161 @@
+"""
+Capa de caché compartida de la API.
+Las entradas se agrupan en espacios de nombres (reports, catalog, users...)
+y cada espacio tiene una generación en la caché compartida que forma parte de
+las llaves: incrementar la generación invalida de una vez todas las entradas
+del espacio en todos los workers y en Celery. invalidate_on() conecta esa
+invalidación a las señales post_save / post_delete de los modelos de los que
+depende cada espacio.
+
+Cada consulta suma un acierto o un fallo al contador del espacio
+(cache_stats()), compartido igual que las entradas, y al de la petición en
+curso si el middleware de métricas lo está registrando (request_counts).
+"""
+
+import contextvars
+import functools
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from rest_framework.response import Response
+
+_namespaces = set()
+
+# Aciertos y fallos de la petición en curso ({'hits': n, 'misses': n}), ver metrics.py
+request_counts = contextvars.ContextVar('cache_request_counts', default=None)
+
+
+def _generation_key(namespace):
+    return f'{namespace}:generation'
+
+
+def _generation(namespace):
+    return cache.get_or_set(_generation_key(namespace), 1, None)
+
+
+def make_key(namespace, *parts):
+    """Llave de caché del espacio para las partes dadas (serializables a JSON)."""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    digest = hashlib.md5(payload.encode(), usedforsecurity=False).hexdigest()
+    return f'{namespace}:g{_generation(namespace)}:{digest}'
+
+
+def _count_request(outcome):
+    counts = request_counts.get()
+    if counts is not None:
+        counts[outcome] += 1
+
+
+def _count(namespace, outcome):
+    _count_request(outcome)
+    key = f'stats:{namespace}:{outcome}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def get_or_compute(namespace, parts, builder, timeout=DEFAULT_TIMEOUT):
+    """Devuelve el valor en caché para (namespace, parts) o lo calcula con builder()."""
+    _namespaces.add(namespace)
+    key = make_key(namespace, *parts)
+    value = cache.get(key)
+    if value is None:
+        _count(namespace, 'misses')
+        value = builder()
+        if value is not None:
+            cache.set(key, value, timeout)
+    else:
+        _count(namespace, 'hits')
+    return value
+
+
+def cached(namespace, timeout=DEFAULT_TIMEOUT):
+    """Decorador de funciones: la llave son el nombre de la función y sus argumentos."""
+    def decorator(func):
+        name = f'{func.__module__}.{func.__qualname__}'
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return get_or_compute(namespace, (name, args, kwargs), lambda: func(*args, **kwargs), timeout)
+        return wrapper
+    return decorator
+
+
+def cached_queryset(namespace, queryset, timeout=DEFAULT_TIMEOUT):
+    """Lista de resultados en caché de un queryset; la llave es su SQL."""
+    return get_or_compute(
+        namespace, (queryset.model._meta.label, str(queryset.query)), lambda: list(queryset), timeout,
+    )
+
+
+def cache_response(namespace, timeout=DEFAULT_TIMEOUT, vary_on_user=False):
+    """
+    Decorador de métodos de vista (list, retrieve o acciones GET): guarda
+    response.data de las respuestas 200 por URL completa y, si vary_on_user,
+    por usuario.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            parts = (type(view).__name__, request.build_absolute_uri())
+            if vary_on_user:
+                parts += (request.user.pk,)
+            response = None
+
+            def build():
+                nonlocal response
+                response = method(view, request, *args, **kwargs)
+                return response.data if response.status_code == 200 else None
+
+            data = get_or_compute(namespace, parts, build, timeout)
+            return response if response is not None else Response(data)
+        return wrapper
+    return decorator
+
+
+def invalidate(*namespaces):
+    """Invalida todas las entradas de los espacios indicados."""
+    for namespace in namespaces:
+        try:
+            cache.incr(_generation_key(namespace))
+        except ValueError:
+            cache.set(_generation_key(namespace), 1, None)
+
+
+def invalidate_on(model, *namespaces):
+    """
+    Invalida los espacios cada vez que se guarda o elimina una instancia del
+    modelo, al guardar y otra vez al confirmar la transacción: un worker que
+    recalcule entre ambos momentos guardaría datos sin confirmar.
+    """
+    _namespaces.update(namespaces)
+
+    def receiver(sender, **kwargs):
+        invalidate(*namespaces)
+        transaction.on_commit(lambda: invalidate(*namespaces))
+
+    uid = f'api-cache:{model._meta.label}:{",".join(namespaces)}'
+    post_save.connect(receiver, sender=model, weak=False, dispatch_uid=uid)
+    post_delete.connect(receiver, sender=model, weak=False, dispatch_uid=uid)
+
+
+def cache_stats(namespaces=None):
+    """Aciertos, fallos y tasa de aciertos por espacio de nombres."""
+    namespaces = sorted(namespaces or _namespaces)
+    keys = [f'stats:{namespace}:{outcome}' for namespace in namespaces for outcome in ('hits', 'misses')]
+    values = cache.get_many(keys)
+    stats = {}
+    for namespace in namespaces:
+        hits = values.get(f'stats:{namespace}:hits', 0)
+        misses = values.get(f'stats:{namespace}:misses', 0)
+        stats[namespace] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / (hits + misses), 3) if hits + misses else None,
+        }
+    return stats
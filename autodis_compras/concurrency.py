@@ -0,0 +1,99 @@
+"""
+Control de concurrencia optimista.
+Los modelos con VersionedModel llevan un número de versión que se incrementa
+en cada guardado; el UPDATE se condiciona a la versión leída
+(UPDATE ... WHERE id = %s AND version = %s), de modo que si otro usuario
+guardó antes, la escritura falla con ConcurrentUpdateError en lugar de
+sobrescribir sus cambios.
+
+OptimisticLockMixin expone la versión como ETag en las vistas de detalle,
+valida el encabezado If-Match en las operaciones de escritura (412 si no
+coincide) y responde 409 cuando el UPDATE condicional no encuentra la fila.
+"""
+
+from django.db import models
+from rest_framework import permissions, status
+from rest_framework.response import Response
+
+
+class ConcurrentUpdateError(Exception):
+    """El registro fue modificado por otro usuario desde que se leyó."""
+
+
+class PreconditionFailed(Exception):
+    """El encabezado If-Match no coincide con la versión actual."""
+
+
+class VersionedModel(models.Model):
+    version = models.PositiveIntegerField('Versión', default=1, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            return super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'version'}
+        self._expected_version = self.version
+        self.version += 1
+        try:
+            super().save(*args, **kwargs)
+        except ConcurrentUpdateError:
+            self.version = self._expected_version
+            raise
+        finally:
+            del self._expected_version
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        expected = getattr(self, '_expected_version', None)
+        if expected is None:
+            return super()._do_update(base_qs, using, pk_val, values, update_fields, forced_update)
+        updated = super()._do_update(
+            base_qs.filter(version=expected), using, pk_val, values, update_fields, forced_update,
+        )
+        if not updated and base_qs.filter(pk=pk_val).exists():
+            raise ConcurrentUpdateError(
+                f'{self._meta.verbose_name} fue modificado por otro usuario. Recargue e intente de nuevo.'
+            )
+        return updated
+
+    @property
+    def etag(self):
+        return f'"{self.pk}-{self.version}"'
+
+
+class OptimisticLockMixin:
+    """
+    Mixin para ViewSets de modelos VersionedModel: ETag en respuestas de
+    detalle, If-Match en escrituras (412) y 409 ante escrituras concurrentes.
+    """
+
+    def get_object(self):
+        obj = super().get_object()
+        self._etag_object = obj
+        if self.request.method not in permissions.SAFE_METHODS:
+            if_match = self.request.headers.get('If-Match')
+            if if_match and if_match.strip() != '*':
+                # If-Match usa comparación fuerte (RFC 9110): un ETag débil (W/) nunca coincide
+                tags = [tag.strip() for tag in if_match.split(',')]
+                if obj.etag not in tags:
+                    raise PreconditionFailed(
+                        'La version enviada en If-Match no coincide con la actual. Recargue e intente de nuevo.'
+                    )
+        return obj
+
+    def handle_exception(self, exc):
+        if isinstance(exc, PreconditionFailed):
+            return Response({'error': str(exc)}, status=status.HTTP_412_PRECONDITION_FAILED)
+        if isinstance(exc, ConcurrentUpdateError):
+            return Response({'error': str(exc)}, status=status.HTTP_409_CONFLICT)
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        obj = getattr(self, '_etag_object', None)
+        if obj is not None and response.status_code < 300 and obj.pk is not None:
+            response['ETag'] = obj.etag
+        return response
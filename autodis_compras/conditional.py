@@ -0,0 +1,73 @@
+"""
+GET condicional para catálogos.
+Los catálogos (categorías, items, áreas, ubicaciones y centros de costos)
+cambian poco pero el frontend los recarga en casi cada pantalla. La huella
+de cada catálogo es MAX(updated_at) y COUNT(*) de sus tablas: un alta o
+cambio mueve el máximo y una baja cambia el conteo. Con esa huella se
+responde ETag y Last-Modified, y 304 sin consultar ni serializar los
+registros cuando el cliente ya tiene la versión actual.
+
+Si el cliente no tiene la versión actual, el listado se sirve del espacio
+'catalog' de la caché compartida, que se invalida al guardar cualquier
+catálogo.
+
+Las escrituras con QuerySet.update() no tocan updated_at ni envían señales;
+en los catálogos se modifican siempre con save().
+"""
+
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from autodis_compras.cache import cache_response
+
+
+class ConditionalCatalogMixin:
+    """
+    Mixin para ViewSets de catálogos: ETag / Last-Modified en list y
+    retrieve, y 304 si coinciden If-None-Match o If-Modified-Since.
+    `conditional_models` lista los modelos cuya huella afecta la respuesta
+    (por ejemplo la categoría cuyo nombre se incluye en cada item).
+    """
+
+    conditional_models = None
+
+    def get_conditional_models(self):
+        return self.conditional_models or [self.queryset.model]
+
+    def catalog_fingerprint(self):
+        """ETag y Last-Modified (timestamp) de los catálogos de la vista."""
+        parts = [self.action, sorted(self.kwargs.items())]
+        last_modified = None
+        for model in self.get_conditional_models():
+            stats = model.objects.aggregate(last=Max('updated_at'), count=Count('pk'))
+            parts.append((model._meta.label, stats['count'], stats['last']))
+            if stats['last'] and (last_modified is None or stats['last'] > last_modified):
+                last_modified = stats['last']
+        etag = '"%s"' % hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+        return etag, int(last_modified.timestamp()) if last_modified else None
+
+    def _conditional(self, request, handler, *args, **kwargs):
+        etag, last_modified = self.catalog_fingerprint()
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+            # El cliente debe revalidar siempre: los catálogos pueden cambiar en cualquier momento
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional(request, self._cached_list, *args, **kwargs)
+
+    @cache_response('catalog')
+    def _cached_list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional(request, super().retrieve, *args, **kwargs)
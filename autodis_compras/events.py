@@ -0,0 +1,211 @@
+"""
+Eventos en vivo para el frontend (server-sent events).
+Los cambios se publican en canales del broker (Redis pub/sub, o un broker en
+memoria del proceso con EVENTS_BROKER_URL = 'memory://' en pruebas y
+desarrollo) y cada conexión SSE se suscribe a los canales que le tocan en
+lugar de consultar la API periódicamente.
+
+Los mensajes son diccionarios serializables a JSON con las llaves 'id',
+'event' (nombre del evento SSE) y 'data'.
+
+subscribe() devuelve una suscripción que espera mensajes bloqueando el hilo
+(streams bajo WSGI); asubscribe(), una que los espera en el event loop
+(redis.asyncio bajo ASGI), para no ocupar un hilo por conexión abierta.
+"""
+
+import asyncio
+import json
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+
+import redis
+import redis.asyncio
+from django.conf import settings
+from rest_framework.renderers import BaseRenderer
+
+logger = logging.getLogger(__name__)
+
+
+def format_event(event, data, event_id=None):
+    """Mensaje SSE con nombre de evento, datos en JSON e id opcional."""
+    lines = f'id: {event_id}\n' if event_id is not None else ''
+    return f'{lines}event: {event}\ndata: {json.dumps(data, default=str)}\n\n'
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Renderer para que la negociación de contenido de DRF acepte text/event-stream."""
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # Las respuestas de error (401, 403) se envían como un evento 'error'
+        return format_event('error', data).encode(self.charset)
+
+
+class MemorySubscription:
+    def __init__(self, broker, channels):
+        self.broker = broker
+        self.channels = channels
+        self.queue = queue.Queue()
+
+    def get(self, timeout):
+        """Siguiente mensaje, o None si no llega ninguno en timeout segundos."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def put(self, message):
+        self.queue.put(message)
+
+    def close(self):
+        self.broker._unsubscribe(self)
+
+
+class AsyncMemorySubscription:
+    def __init__(self, broker, channels):
+        self.broker = broker
+        self.channels = channels
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue()
+
+    async def get(self, timeout):
+        """Siguiente mensaje, o None si no llega ninguno en timeout segundos."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def put(self, message):
+        # publish() corre en el hilo de la petición que hizo el cambio
+        try:
+            self.loop.call_soon_threadsafe(self.queue.put_nowait, message)
+        except RuntimeError:
+            # El event loop ya terminó; la suscripción se cerró con él
+            pass
+
+    async def close(self):
+        self.broker._unsubscribe(self)
+
+
+class MemoryBroker:
+    """Broker en memoria: solo entrega a suscriptores del mismo proceso."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = defaultdict(set)
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscriptions = list(self._subscriptions[channel])
+        for subscription in subscriptions:
+            subscription.put(message)
+
+    def subscribe(self, channels):
+        return self._register(MemorySubscription(self, channels))
+
+    async def asubscribe(self, channels):
+        return self._register(AsyncMemorySubscription(self, channels))
+
+    def _register(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscriptions[channel].add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscriptions[channel].discard(subscription)
+
+
+class RedisSubscription:
+    def __init__(self, pubsub):
+        self.pubsub = pubsub
+
+    def get(self, timeout):
+        """Siguiente mensaje, o None si no llega ninguno en timeout segundos."""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            message = self.pubsub.get_message(ignore_subscribe_messages=True, timeout=remaining)
+            if message is not None:
+                return json.loads(message['data'])
+
+    def close(self):
+        self.pubsub.close()
+
+
+class AsyncRedisSubscription:
+    def __init__(self, client, pubsub):
+        self.client = client
+        self.pubsub = pubsub
+
+    async def get(self, timeout):
+        """Siguiente mensaje, o None si no llega ninguno en timeout segundos."""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            message = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=remaining)
+            if message is not None:
+                return json.loads(message['data'])
+
+    async def close(self):
+        await self.pubsub.aclose()
+        await self.client.aclose()
+
+
+class RedisBroker:
+    """Broker sobre Redis pub/sub: entrega a los suscriptores de todos los workers."""
+
+    def __init__(self, url):
+        self.url = url
+        self.client = redis.Redis.from_url(url)
+
+    def publish(self, channel, message):
+        self.client.publish(channel, json.dumps(message, default=str))
+
+    def subscribe(self, channels):
+        pubsub = self.client.pubsub()
+        pubsub.subscribe(*channels)
+        return RedisSubscription(pubsub)
+
+    async def asubscribe(self, channels):
+        # Un cliente por suscripción: sus conexiones quedan ligadas al event loop que lo usa
+        client = redis.asyncio.Redis.from_url(self.url)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(*channels)
+        return AsyncRedisSubscription(client, pubsub)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """Broker del proceso según EVENTS_BROKER_URL."""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                url = settings.EVENTS_BROKER_URL
+                _broker = MemoryBroker() if url.startswith('memory://') else RedisBroker(url)
+    return _broker
+
+
+def publish(channels, message):
+    """Publica el mensaje en cada canal; un broker caído no interrumpe la petición."""
+    broker = get_broker()
+    for channel in channels:
+        try:
+            broker.publish(channel, message)
+        except Exception:
+            logger.exception('No se pudo publicar el evento en %s', channel)
@@ -0,0 +1,294 @@
+"""
+Métricas por petición (opcional, METRICS_ENABLED).
+RequestMetricsMiddleware mide en cada petición el número y el tiempo de las
+consultas SQL, los aciertos y fallos de la caché compartida y el tiempo
+total, y los devuelve en el encabezado Server-Timing (visible en las
+herramientas del navegador).
+
+Los acumulados por vista y método viven en la caché compartida, igual que
+cache_stats(), para que /metrics (formato Prometheus) reporte a todos los
+workers sin importar cuál atiende el scrape. Con Redis, los contadores de
+una petición se suman en un solo pipeline. Las vistas se toman de las URLs
+del proyecto en cada scrape, sin una lista compartida que mantener. Las
+peticiones que pasan de
+METRICS_SLOW_REQUEST_MS o de METRICS_SLOW_QUERY_COUNT consultas se
+registran en el log con sus consultas más repetidas.
+
+El middleware funciona en modo síncrono (WSGI) y asíncrono (ASGI), así que
+bajo ASGI no interrumpe el stream de eventos asíncrono.
+"""
+
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.redis import RedisCache
+from django.db import connections
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+from django.urls import URLResolver, get_resolver
+
+from autodis_compras import cache as api_cache
+
+logger = logging.getLogger(__name__)
+
+METHODS = ('GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS')
+# Peticiones sin ruta y rutas sin nombre
+UNMATCHED = 'unmatched'
+UNNAMED = 'unnamed'
+# Límites superiores (segundos) del histograma de duración
+DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+COUNTERS = ('requests', 'errors', 'duration_us', 'db_queries', 'db_time_us', 'cache_hits', 'cache_misses')
+
+
+class QueryRecorder:
+    """execute_wrapper que cuenta las consultas, su tiempo y las repetidas."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.statements[sql] += 1
+
+
+def _key(view, method, name):
+    return f'metrics:{view}:{method}:{name}'
+
+
+def _incr(key, delta=1):
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        cache.add(key, 0, None)
+        return cache.incr(key, delta)
+
+
+def _incr_many(deltas):
+    """Suma cada delta a su contador: en Redis con un solo pipeline (INCRBY crea los que faltan)."""
+    backend = caches['default']
+    if not isinstance(backend, RedisCache):
+        for key, delta in deltas.items():
+            _incr(key, delta)
+        return
+    pipeline = backend._cache.get_client(write=True).pipeline(transaction=False)
+    for key, delta in deltas.items():
+        pipeline.incrby(backend.make_and_validate_key(key), delta)
+    pipeline.execute()
+
+
+def _bucket(duration):
+    for bound in DURATION_BUCKETS:
+        if duration <= bound:
+            return str(bound)
+    return '+Inf'
+
+
+def record_request(view, method, status_code, duration, queries, cache_counts):
+    """Suma la petición a los acumulados de la vista en la caché compartida."""
+    deltas = {
+        'requests': 1,
+        'duration_us': int(duration * 1_000_000),
+        f'bucket:{_bucket(duration)}': 1,
+    }
+    if status_code >= 500:
+        deltas['errors'] = 1
+    if queries.count:
+        deltas['db_queries'] = queries.count
+        deltas['db_time_us'] = int(queries.duration * 1_000_000)
+    for outcome in ('hits', 'misses'):
+        if cache_counts[outcome]:
+            deltas[f'cache_{outcome}'] = cache_counts[outcome]
+    _incr_many({_key(view, method, name): delta for name, delta in deltas.items()})
+
+
+def server_timing(duration, queries, cache_counts):
+    return ', '.join([
+        f'db;dur={queries.duration * 1000:.1f};desc="{queries.count} queries"',
+        f'cache;desc="{cache_counts["hits"]} hits, {cache_counts["misses"]} misses"',
+        f'total;dur={duration * 1000:.1f}',
+    ])
+
+
+def _wrap_connections(stack, queries):
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(queries))
+
+
+def _view_label(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return UNMATCHED
+    return match.view_name if match.url_name else UNNAMED
+
+
+class RequestMetricsMiddleware:
+    """Mide SQL, caché y tiempo de cada petición (ver el docstring del módulo)."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        queries = QueryRecorder()
+        cache_counts = {'hits': 0, 'misses': 0}
+        token = api_cache.request_counts.set(cache_counts)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                _wrap_connections(stack, queries)
+                response = self.get_response(request)
+        finally:
+            api_cache.request_counts.reset(token)
+        return self.process(request, response, time.perf_counter() - start, queries, cache_counts)
+
+    async def __acall__(self, request):
+        queries = QueryRecorder()
+        cache_counts = {'hits': 0, 'misses': 0}
+        token = api_cache.request_counts.set(cache_counts)
+        start = time.perf_counter()
+        # Las conexiones son por hilo: los wrappers se instalan en el hilo en
+        # el que sync_to_async corre el ORM durante esta petición
+        stack = ExitStack()
+        try:
+            await sync_to_async(_wrap_connections)(stack, queries)
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+            api_cache.request_counts.reset(token)
+        duration = time.perf_counter() - start
+        return await sync_to_async(self.process)(request, response, duration, queries, cache_counts)
+
+    def process(self, request, response, duration, queries, cache_counts):
+        response['Server-Timing'] = server_timing(duration, queries, cache_counts)
+        view = _view_label(request)
+        if view != 'metrics':
+            method = request.method if request.method in METHODS else 'OTHER'
+            record_request(view, method, response.status_code, duration, queries, cache_counts)
+        if duration * 1000 > settings.METRICS_SLOW_REQUEST_MS or queries.count > settings.METRICS_SLOW_QUERY_COUNT:
+            self.log_slow_request(request, response, duration, queries)
+        return response
+
+    def log_slow_request(self, request, response, duration, queries):
+        repeated = [
+            f'  {count}x {sql[:300]}' for sql, count in queries.statements.most_common(5) if count > 1
+        ]
+        logger.warning(
+            'Petición lenta: %s %s -> %s en %.0f ms, %d consultas SQL (%.0f ms)%s',
+            request.method, request.get_full_path(), response.status_code,
+            duration * 1000, queries.count, queries.duration * 1000,
+            ('\nConsultas repetidas:\n' + '\n'.join(repeated)) if repeated else '',
+        )
+
+
+def _view_names(patterns, namespace=None):
+    """Nombres de vista (namespace:nombre) de todas las URLs con nombre."""
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            inner = pattern.namespace
+            if namespace and inner:
+                inner = f'{namespace}:{inner}'
+            yield from _view_names(pattern.url_patterns, inner or namespace)
+        elif pattern.name:
+            yield f'{namespace}:{pattern.name}' if namespace else pattern.name
+
+
+def _labels():
+    """
+    Vistas y métodos con peticiones registradas. Se buscan entre todas las
+    URLs del proyecto en cada scrape, así que ninguna vista se pierde aunque
+    la caché se vacíe o dos workers la vean por primera vez a la vez.
+    """
+    views = sorted(set(_view_names(get_resolver().url_patterns)) - {'metrics'}) + [UNNAMED, UNMATCHED]
+    candidates = [(view, method) for view in views for method in METHODS + ('OTHER',)]
+    counts = cache.get_many([_key(view, method, 'requests') for view, method in candidates])
+    return [(view, method) for view, method in candidates if counts.get(_key(view, method, 'requests'))]
+
+
+def _format_labels(**labels):
+    return ','.join(f'{name}="{value}"' for name, value in labels.items())
+
+
+def render_metrics():
+    """Acumulados de todas las vistas y de la caché en formato de texto de Prometheus."""
+    labels = _labels()
+    names = list(COUNTERS) + [f'bucket:{bound}' for bound in DURATION_BUCKETS] + ['bucket:+Inf']
+    keys = [_key(view, method, name) for view, method in labels for name in names]
+    values = cache.get_many(keys)
+
+    lines = [
+        '# HELP autodis_http_requests_total Peticiones atendidas por vista y método.',
+        '# TYPE autodis_http_requests_total counter',
+        '# HELP autodis_http_request_errors_total Respuestas 5xx por vista y método.',
+        '# TYPE autodis_http_request_errors_total counter',
+        '# HELP autodis_http_request_duration_seconds Duración de las peticiones.',
+        '# TYPE autodis_http_request_duration_seconds histogram',
+        '# HELP autodis_db_queries_total Consultas SQL por vista y método.',
+        '# TYPE autodis_db_queries_total counter',
+        '# HELP autodis_db_query_seconds_total Tiempo en consultas SQL por vista y método.',
+        '# TYPE autodis_db_query_seconds_total counter',
+        '# HELP autodis_cache_requests_total Consultas a la caché compartida por vista, método y resultado.',
+        '# TYPE autodis_cache_requests_total counter',
+    ]
+    for view, method in labels:
+        def value(name):
+            return values.get(_key(view, method, name), 0)
+        label = _format_labels(view=view, method=method)
+        lines.append(f'autodis_http_requests_total{{{label}}} {value("requests")}')
+        lines.append(f'autodis_http_request_errors_total{{{label}}} {value("errors")}')
+        cumulative = 0
+        for bound in [str(bound) for bound in DURATION_BUCKETS] + ['+Inf']:
+            cumulative += value(f'bucket:{bound}')
+            lines.append(f'autodis_http_request_duration_seconds_bucket{{{label},le="{bound}"}} {cumulative}')
+        lines.append(f'autodis_http_request_duration_seconds_sum{{{label}}} {value("duration_us") / 1_000_000}')
+        lines.append(f'autodis_http_request_duration_seconds_count{{{label}}} {value("requests")}')
+        lines.append(f'autodis_db_queries_total{{{label}}} {value("db_queries")}')
+        lines.append(f'autodis_db_query_seconds_total{{{label}}} {value("db_time_us") / 1_000_000}')
+        for outcome in ('hits', 'misses'):
+            lines.append(
+                f'autodis_cache_requests_total{{{label},outcome="{outcome}"}} {value(f"cache_{outcome}")}'
+            )
+
+    lines += [
+        '# HELP autodis_cache_namespace_requests_total Consultas a la caché compartida por espacio de nombres.',
+        '# TYPE autodis_cache_namespace_requests_total counter',
+    ]
+    for namespace, stats in api_cache.cache_stats().items():
+        for outcome in ('hits', 'misses'):
+            lines.append(
+                f'autodis_cache_namespace_requests_total{{{_format_labels(namespace=namespace, outcome=outcome)}}} '
+                f'{stats[outcome]}'
+            )
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """
+    Endpoint /metrics para Prometheus; requiere METRICS_TOKEN como Bearer.
+    Sin token solo responde con DEBUG, para no exponer las rutas y el
+    tráfico de producción.
+    """
+    if not settings.METRICS_ENABLED:
+        raise Http404
+    if not settings.METRICS_TOKEN:
+        if not settings.DEBUG:
+            return HttpResponseForbidden()
+    elif request.headers.get('Authorization') != f'Bearer {settings.METRICS_TOKEN}':
+        return HttpResponseForbidden()
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
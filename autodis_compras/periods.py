@@ -0,0 +1,211 @@
+"""
+Periodos de reporte y utilidades para filtrar por fecha de creación.
+Filtrar con created_at__year / created_at__month genera expresiones EXTRACT
+con conversión de zona horaria que impiden usar los índices sobre
+created_at. Estas funciones devuelven rangos semiabiertos [inicio, fin) con
+datetimes conscientes de la zona horaria actual, para filtrar con
+created_at__gte / created_at__lt.
+"""
+
+import datetime
+
+from django.db.models import Q
+from django.utils import timezone
+
+
+def _aware(year, month, day=1):
+    return timezone.make_aware(datetime.datetime(year, month, day))
+
+
+def month_range(year, month):
+    """Rango [inicio, fin) del mes indicado en la zona horaria actual."""
+    year, month = int(year), int(month)
+    if month == 12:
+        return _aware(year, month), _aware(year + 1, 1)
+    return _aware(year, month), _aware(year, month + 1)
+
+
+def year_range(year):
+    """Rango [inicio, fin) del año indicado en la zona horaria actual."""
+    year = int(year)
+    return _aware(year, 1), _aware(year + 1, 1)
+
+
+def range_filter(start, end, field='created_at'):
+    """Argumentos de filtro para un rango semiabierto sobre un campo datetime."""
+    return {f'{field}__gte': start, f'{field}__lt': end}
+
+
+QUARTER_MONTHS = {1: 1, 2: 4, 3: 7, 4: 10}
+MAX_ROLLING_MONTHS = 60
+
+
+def _add_months(date, months):
+    """Primer día del mes que resulta de sumar `months` al mes de `date`."""
+    index = date.year * 12 + (date.month - 1) + months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def _parse_int(params, name, minimum, maximum):
+    value = params.get(name)
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'El parametro {name} debe ser un numero entero.')
+    if not minimum <= value <= maximum:
+        raise ValueError(f'El parametro {name} debe estar entre {minimum} y {maximum}.')
+    return value
+
+
+def _parse_date(params, name):
+    try:
+        return datetime.date.fromisoformat(params.get(name))
+    except (TypeError, ValueError):
+        raise ValueError(f'El parametro {name} debe tener formato AAAA-MM-DD.')
+
+
+class Period:
+    """
+    Periodo de reporte como rango de fechas semiabierto [start_date, end_date).
+    Se construye desde los parámetros de consulta de los reportes:
+    year, year+month, year+quarter, start+end (inclusive) o rolling=N meses.
+    """
+    WEEK = 'week'
+    MONTH = 'month'
+    QUARTER = 'quarter'
+    YEAR = 'year'
+    RANGE = 'range'
+    ROLLING = 'rolling'
+
+    def __init__(self, start_date, end_date, kind=RANGE):
+        if start_date >= end_date:
+            raise ValueError('La fecha inicial debe ser anterior a la final.')
+        self.start_date = start_date
+        self.end_date = end_date
+        self.kind = kind
+
+    @classmethod
+    def for_month(cls, year, month):
+        start = datetime.date(int(year), int(month), 1)
+        return cls(start, _add_months(start, 1), cls.MONTH)
+
+    @classmethod
+    def for_quarter(cls, year, quarter):
+        start = datetime.date(int(year), QUARTER_MONTHS[int(quarter)], 1)
+        return cls(start, _add_months(start, 3), cls.QUARTER)
+
+    @classmethod
+    def for_year(cls, year):
+        return cls(datetime.date(int(year), 1, 1), datetime.date(int(year) + 1, 1, 1), cls.YEAR)
+
+    @classmethod
+    def rolling(cls, months, today=None):
+        """Últimos `months` meses completos o en curso, incluyendo el actual."""
+        today = today or timezone.localdate()
+        end = _add_months(today, 1)
+        return cls(_add_months(end, -months), end, cls.ROLLING)
+
+    @classmethod
+    def from_params(cls, params, today=None):
+        """
+        Interpreta los parámetros de periodo de un reporte.
+        Devuelve None si no se indicó ningún periodo y lanza ValueError con un
+        mensaje para el usuario si los parámetros no son válidos.
+        """
+        if params.get('start') or params.get('end'):
+            start = _parse_date(params, 'start')
+            end = _parse_date(params, 'end')
+            if end < start:
+                raise ValueError('La fecha final no puede ser anterior a la inicial.')
+            return cls(start, end + datetime.timedelta(days=1), cls.RANGE)
+        if params.get('rolling'):
+            return cls.rolling(_parse_int(params, 'rolling', 1, MAX_ROLLING_MONTHS), today)
+        if params.get('year'):
+            year = _parse_int(params, 'year', 2000, 2100)
+            if params.get('month'):
+                return cls.for_month(year, _parse_int(params, 'month', 1, 12))
+            if params.get('quarter'):
+                return cls.for_quarter(year, _parse_int(params, 'quarter', 1, 4))
+            return cls.for_year(year)
+        return None
+
+    @property
+    def start(self):
+        return _aware(self.start_date.year, self.start_date.month, self.start_date.day)
+
+    @property
+    def end(self):
+        return _aware(self.end_date.year, self.end_date.month, self.end_date.day)
+
+    @property
+    def last_date(self):
+        """Último día incluido en el periodo."""
+        return self.end_date - datetime.timedelta(days=1)
+
+    @property
+    def is_month_aligned(self):
+        """True si el periodo abarca meses completos."""
+        return self.start_date.day == 1 and self.end_date.day == 1
+
+    def range_filter(self, field='created_at'):
+        return range_filter(self.start, self.end, field)
+
+    def months(self):
+        """Lista de (año, mes) que toca el periodo."""
+        result = []
+        current = self.start_date.replace(day=1)
+        while current < self.end_date:
+            result.append((current.year, current.month))
+            current = _add_months(current, 1)
+        return result
+
+    def month_q(self, year_field='year', month_field='month'):
+        """Q sobre campos año/mes enteros para los meses que toca el periodo."""
+        first_year, first_month = self.start_date.year, self.start_date.month
+        last_year, last_month = self.last_date.year, self.last_date.month
+        after_start = Q(**{f'{year_field}__gt': first_year}) | Q(
+            **{year_field: first_year, f'{month_field}__gte': first_month})
+        before_end = Q(**{f'{year_field}__lt': last_year}) | Q(
+            **{year_field: last_year, f'{month_field}__lte': last_month})
+        return after_start & before_end
+
+    @property
+    def label(self):
+        if self.kind == self.MONTH:
+            return f'{self.start_date.year}-{self.start_date.month:02d}'
+        if self.kind == self.QUARTER:
+            return f'{self.start_date.year}-T{(self.start_date.month + 2) // 3}'
+        if self.kind == self.YEAR:
+            return str(self.start_date.year)
+        return f'{self.start_date.isoformat()}_{self.last_date.isoformat()}'
+
+    def as_dict(self):
+        return {
+            'kind': self.kind,
+            'start': self.start_date.isoformat(),
+            'end': self.last_date.isoformat(),
+            'label': self.label,
+        }
+
+
+def bucket_start(date, bucket):
+    """Primer día del bucket (week/month/quarter/year) que contiene la fecha."""
+    if bucket == Period.WEEK:
+        return date - datetime.timedelta(days=date.weekday())
+    if bucket == Period.YEAR:
+        return datetime.date(date.year, 1, 1)
+    if bucket == Period.QUARTER:
+        return datetime.date(date.year, QUARTER_MONTHS[(date.month + 2) // 3], 1)
+    return datetime.date(date.year, date.month, 1)
+
+
+def bucket_label(start, bucket):
+    """Etiqueta de un bucket a partir de su primer día."""
+    if bucket == Period.WEEK:
+        iso_year, iso_week, _ = start.isocalendar()
+        return f'{iso_year}-S{iso_week:02d}'
+    if bucket == Period.YEAR:
+        return str(start.year)
+    if bucket == Period.QUARTER:
+        return f'{start.year}-T{(start.month + 2) // 3}'
+    return f'{start.year}-{start.month:02d}'
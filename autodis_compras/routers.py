@@ -0,0 +1,98 @@
+"""
+Ruteo de lecturas de reportes a la réplica.
+Los reportes, exportaciones y el dashboard leen de REPORTS_DB_ALIAS (una
+réplica de solo lectura si se configuró, o la base principal) para no
+competir con las aprobaciones en la principal a fin de mes. Las escrituras
+siempre van a la principal.
+
+La réplica va unos segundos atrás de la principal: después de que un
+usuario crea o cambia el estado de una solicitud, sus lecturas de reportes
+van a la principal durante REPORTS_DB_STICKY_SECONDS para que vea su propio
+cambio.
+
+Los resultados en caché llevan en la llave la base de la que se leyeron, y
+los leídos de la réplica no se guardan mientras pueda ir atrás de una
+escritura reciente: un resultado viejo no queda en caché para todos ni lo
+ve quien lee de la principal.
+"""
+
+import contextvars
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+_read_alias = contextvars.ContextVar('read_alias', default=None)
+RECENT_WRITES_KEY = 'db:recent-writes'
+
+
+def _sticky_key(user_id):
+    return f'db:primary-reads:{user_id}'
+
+
+def mark_primary_reads(user_id):
+    """Envía a la principal las lecturas de reportes del usuario por unos segundos."""
+    if settings.REPORTS_DB_ALIAS == DEFAULT_DB_ALIAS:
+        return
+    keys = {RECENT_WRITES_KEY: True}
+    if user_id is not None:
+        keys[_sticky_key(user_id)] = True
+    cache.set_many(keys, settings.REPORTS_DB_STICKY_SECONDS)
+
+
+def reports_alias(user):
+    """Base de la que leen los reportes del usuario."""
+    alias = settings.REPORTS_DB_ALIAS
+    if alias != DEFAULT_DB_ALIAS and user.is_authenticated and cache.get(_sticky_key(user.pk)):
+        return DEFAULT_DB_ALIAS
+    return alias
+
+
+def current_read_alias():
+    """Base de la que lee el contexto actual (la principal fuera de read_from() y de las vistas de reportes)."""
+    return _read_alias.get() or DEFAULT_DB_ALIAS
+
+
+def cacheable_reads():
+    """Si las lecturas actuales pueden guardarse en caché (ver el docstring del módulo)."""
+    return current_read_alias() == DEFAULT_DB_ALIAS or not cache.get(RECENT_WRITES_KEY)
+
+
+@contextmanager
+def read_from(alias):
+    """Dirige las lecturas del bloque a la base indicada."""
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+class ReportsRouter:
+    """Lecturas dentro de read_from() o de una vista de reportes a su base; el resto por defecto."""
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # La réplica tiene los mismos datos que la principal
+        return True
+
+
+class ReportsDatabaseMixin:
+    """
+    Mixin para vistas de DRF: las lecturas de la petición (después de
+    autenticar) van a la base de reportes del usuario.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        _read_alias.set(reports_alias(request.user))
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        _read_alias.set(None)
+        return super().finalize_response(request, response, *args, **kwargs)
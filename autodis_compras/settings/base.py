@@ -4,6 +4,7 @@ Base settings for AUTODIS Compras project.
 
 from pathlib import Path
 import os
+from celery.schedules import crontab
 from decouple import config
 
 # Build paths inside the project
@@ -49,6 +50,19 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Métricas por petición: Server-Timing, /metrics (Prometheus) y log de peticiones lentas
+METRICS_ENABLED = config('METRICS_ENABLED', default=False, cast=bool)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+METRICS_SLOW_REQUEST_MS = config('METRICS_SLOW_REQUEST_MS', default=1000, cast=int)
+METRICS_SLOW_QUERY_COUNT = config('METRICS_SLOW_QUERY_COUNT', default=50, cast=int)
+if METRICS_ENABLED:
+    # Después de WhiteNoise (solo síncrono): no mide archivos estáticos y bajo
+    # ASGI el resto de la cadena sigue siendo asíncrona
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index('whitenoise.middleware.WhiteNoiseMiddleware') + 1,
+        'autodis_compras.metrics.RequestMetricsMiddleware',
+    )
+
 ROOT_URLCONF = 'autodis_compras.urls'
 
 TEMPLATES = [
@@ -81,6 +95,18 @@ DATABASES = {
     }
 }
 
+# Réplica de solo lectura opcional para reportes, exportaciones y dashboard
+if config('REPLICA_DB_HOST', default=''):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': config('REPLICA_DB_HOST'),
+        'PORT': config('REPLICA_DB_PORT', default=DATABASES['default']['PORT']),
+    }
+DATABASE_ROUTERS = ['autodis_compras.routers.ReportsRouter']
+REPORTS_DB_ALIAS = config('REPORTS_DB_ALIAS', default='replica' if 'replica' in DATABASES else 'default')
+# Segundos que las lecturas de reportes de un usuario van a la principal después de un cambio suyo
+REPORTS_DB_STICKY_SECONDS = config('REPORTS_DB_STICKY_SECONDS', default=10, cast=int)
+
 # Custom User Model
 AUTH_USER_MODEL = 'users.User'
 
@@ -124,7 +150,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'autodis_compras.apps.users.authentication.JWTPrincipalAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -186,6 +212,7 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
     'USER_ID_FIELD': 'id',
     'USER_ID_CLAIM': 'user_id',
+    'TOKEN_OBTAIN_SERIALIZER': 'autodis_compras.apps.users.authentication.TokenObtainPairSerializer',
 }
 
 # Email Configuration
@@ -197,6 +224,24 @@ EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='compras@autodis.mx')
 
+# Cache compartida entre workers de gunicorn y Celery
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': config('CACHE_URL', default='redis://localhost:6379/1'),
+        'KEY_PREFIX': 'autodis',
+        'TIMEOUT': config('CACHE_DEFAULT_TIMEOUT', default=300, cast=int),  # segundos
+    }
+}
+
+# Eventos en vivo (SSE): Redis pub/sub, o 'memory://' para un solo proceso
+EVENTS_BROKER_URL = config('EVENTS_BROKER_URL', default='redis://localhost:6379/2')
+EVENTS_HEARTBEAT = config('EVENTS_HEARTBEAT', default=15, cast=int)  # segundos
+EVENTS_STREAM_TIMEOUT = config('EVENTS_STREAM_TIMEOUT', default=300, cast=int)  # segundos por conexión
+# Bajo WSGI cada stream ocupa un worker síncrono: el endpoint responde 204 y el
+# frontend vuelve al polling, salvo que se permita aquí (runserver en desarrollo)
+EVENTS_WSGI_STREAMS = config('EVENTS_WSGI_STREAMS', default=False, cast=bool)
+
 # Celery Configuration
 CELERY_BROKER_URL = config('REDIS_URL', default='redis://localhost:6379/0')
 CELERY_RESULT_BACKEND = 'django-db'
@@ -205,6 +250,19 @@ CELERY_ACCEPT_CONTENT = ['application/json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
+CELERY_BEAT_SCHEDULE = {
+    'alert-budget-overspend': {
+        'task': 'autodis_compras.apps.budgets.tasks.alert_budget_overspend',
+        'schedule': crontab(hour=22, minute=0),
+    },
+}
+
+# Reportes
+DASHBOARD_CACHE_TIMEOUT = config('DASHBOARD_CACHE_TIMEOUT', default=60, cast=int)  # segundos
+REPORTS_CACHE_TIMEOUT = config('REPORTS_CACHE_TIMEOUT', default=300, cast=int)  # segundos
+
+# Presupuestos: proporción del monto a partir de la cual un cierre proyectado se marca en riesgo
+BUDGET_BURN_RISK_RATIO = config('BUDGET_BURN_RISK_RATIO', default=0.9, cast=float)
 
 # File Upload Settings
 MAX_UPLOAD_SIZE = config('MAX_UPLOAD_SIZE', default=10485760, cast=int)  # 10MB
@@ -11,6 +11,9 @@ ALLOWED_HOSTS = ['localhost', '127.0.0.1', '[::1]']
 # CORS settings for development
 CORS_ALLOW_ALL_ORIGINS = True
 
+# runserver es WSGI: permite el stream de eventos en desarrollo
+EVENTS_WSGI_STREAMS = True
+
 # Email backend for development (prints to console)
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
@@ -17,5 +17,28 @@ SECURE_CONTENT_TYPE_NOSNIFF = True
 X_FRAME_OPTIONS = 'DENY'
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
 
+# Conexiones a PostgreSQL
+# Cada worker de gunicorn y de Celery reutiliza su conexión hasta
+# DB_CONN_MAX_AGE segundos (0 = una conexión por petición o tarea). Con
+# CONN_HEALTH_CHECKS la conexión reutilizada se valida al inicio de cada
+# petición y se reabre si el servidor la cerró.
+for database in DATABASES.values():
+    database['CONN_MAX_AGE'] = config('DB_CONN_MAX_AGE', default=60, cast=int)
+    database['CONN_HEALTH_CHECKS'] = config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool)
+    database['OPTIONS'] = {
+        'connect_timeout': config('DB_CONNECT_TIMEOUT', default=5, cast=int),
+        'application_name': config('DB_APPLICATION_NAME', default='autodis_compras'),
+    }
+
+# pgbouncer en modo transaction: cada transacción puede ir a una conexión
+# distinta del servidor, así que no se pueden usar cursores del lado del
+# servidor (QuerySet.iterator() los usa en PostgreSQL). Con ASGI use
+# DB_CONN_MAX_AGE=0 y deje el pooling a pgbouncer: las conexiones
+# persistentes de Django son por hilo y no se reutilizan entre peticiones
+# asíncronas.
+if config('DB_PGBOUNCER', default=False, cast=bool):
+    for database in DATABASES.values():
+        database['DISABLE_SERVER_SIDE_CURSORS'] = True
+
 # Static files
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""
+Mide el costo por petición de abrir conexiones a la base de datos.
+
+Simula N ciclos de petición (request_started, una consulta, request_finished,
+igual que gunicorn y Celery) con CONN_MAX_AGE=0 y con el valor configurado,
+y reporta el tiempo promedio y p95 por ciclo y cuántas conexiones se
+abrieron. Usa la base y los settings de DJANGO_SETTINGS_MODULE.
+
+Ejemplo:
+    DJANGO_SETTINGS_MODULE=autodis_compras.settings.production \\
+        python scripts/benchmark_db_connections.py --requests 500
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'autodis_compras.settings.production')
+
+
+def run(connection, signals, requests, conn_max_age):
+    connection.close()
+    connection.settings_dict['CONN_MAX_AGE'] = conn_max_age
+    timings = []
+    opened = 0
+    for _ in range(requests):
+        start = time.perf_counter()
+        signals.request_started.send(sender=None)
+        if connection.connection is None:
+            opened += 1
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+        signals.request_finished.send(sender=None)
+        timings.append((time.perf_counter() - start) * 1000)
+    connection.close()
+    timings.sort()
+    return {
+        'conn_max_age': conn_max_age,
+        'connections': opened,
+        'mean_ms': round(statistics.mean(timings), 3),
+        'p95_ms': round(timings[int(0.95 * (len(timings) - 1))], 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=200, help='Ciclos de petición por modo')
+    parser.add_argument('--database', default='default', help='Alias de la base de datos')
+    args = parser.parse_args()
+
+    import django
+    django.setup()
+    from django.core import signals
+    from django.db import connections
+
+    connection = connections[args.database]
+    configured = connection.settings_dict.get('CONN_MAX_AGE') or 60
+    print(f'Base: {connection.vendor} {connection.settings_dict.get("HOST") or ""}'.rstrip())
+    print(f'{"CONN_MAX_AGE":>13} {"Conexiones":>11} {"Promedio ms":>12} {"p95 ms":>9}')
+    for conn_max_age in (0, configured):
+        row = run(connection, signals, args.requests, conn_max_age)
+        print(f'{row["conn_max_age"]:>13} {row["connections"]:>11} {row["mean_ms"]:>12} {row["p95_ms"]:>9}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+"""
+Prueba de carga de los endpoints de lectura para comparar despliegues
+(gunicorn sync vs gunicorn con workers de uvicorn).
+
+Lanza peticiones concurrentes contra cada endpoint durante N segundos y
+reporta peticiones por segundo, p50, p95 y errores. Solo usa la biblioteca
+estándar para poder correrlo desde cualquier máquina con acceso a la API.
+
+Ejemplo:
+    python scripts/benchmark_server.py --base-url http://localhost:8000 \\
+        --email finanzas@autodis.mx --password ... --concurrency 30 --duration 30
+"""
+
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_ENDPOINTS = [
+    '/api/reports/dashboard/',
+    '/api/reports/trend/?bucket=month',
+    '/api/reports/pivot/?rows=category',
+    '/api/requests/purchase-requests/inbox/',
+    '/api/requests/purchase-requests/',
+]
+
+
+def login(base_url, email, password):
+    body = json.dumps({'email': email, 'password': password}).encode()
+    request = urllib.request.Request(
+        f'{base_url}/api/auth/login/', data=body, headers={'Content-Type': 'application/json'},
+    )
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return json.load(response)['access']
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_endpoint(base_url, token, path, concurrency, duration):
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def worker():
+        nonlocal errors
+        while time.monotonic() < deadline:
+            request = urllib.request.Request(base_url + path, headers={'Authorization': f'Bearer {token}'})
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=60) as response:
+                    response.read()
+                ok = True
+            except (urllib.error.URLError, TimeoutError):
+                ok = False
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                if ok:
+                    latencies.append(elapsed)
+                else:
+                    errors += 1
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    wall = time.monotonic() - started
+
+    return {
+        'endpoint': path,
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / wall, 1),
+        'p50_ms': round(statistics.median(latencies), 1) if latencies else None,
+        'p95_ms': round(percentile(latencies, 0.95), 1) if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://localhost:8000')
+    parser.add_argument('--email', required=True)
+    parser.add_argument('--password', required=True)
+    parser.add_argument('--concurrency', type=int, default=20, help='Clientes simultáneos por endpoint')
+    parser.add_argument('--duration', type=int, default=20, help='Segundos por endpoint')
+    parser.add_argument('--endpoint', action='append', dest='endpoints', help='Ruta a probar (repetible)')
+    parser.add_argument('--json', action='store_true', help='Imprime los resultados en JSON')
+    args = parser.parse_args()
+
+    base_url = args.base_url.rstrip('/')
+    token = login(base_url, args.email, args.password)
+    results = [
+        run_endpoint(base_url, token, path, args.concurrency, args.duration)
+        for path in args.endpoints or DEFAULT_ENDPOINTS
+    ]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f'{"Endpoint":<50} {"Req":>7} {"Err":>5} {"Req/s":>8} {"p50 ms":>9} {"p95 ms":>9}')
+    for row in results:
+        print(
+            f'{row["endpoint"]:<50} {row["requests"]:>7} {row["errors"]:>5} {row["rps"]:>8} '
+            f'{row["p50_ms"] if row["p50_ms"] is not None else "-":>9} '
+            f'{row["p95_ms"] if row["p95_ms"] is not None else "-":>9}'
+        )
+
+
+if __name__ == '__main__':
+    main()